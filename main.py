@@ -13,6 +13,7 @@ sys.path.insert(0, project_root)
 from python.util.Logger import logger
 from python.ui.GameWindow import GameWindow
 from python.server.McpServer import McpServer
+from python.core.GameActor import GameActor
 from python.core.GameLogic import GameLogic
 
 
@@ -21,16 +22,16 @@ def main():
     try:
         logger.info("启动五子棋游戏...")
 
-        # 创建游戏逻辑实例
-        game_logic = GameLogic()
+        # 创建游戏逻辑实例，界面和MCP服务器通过同一个执行器访问它
+        game_actor = GameActor(GameLogic())
         
         # 初始化MCP服务器并设置游戏逻辑
         mcp_server = McpServer()
-        mcp_server.set_game_logic(game_logic)
+        mcp_server.set_game_logic(game_actor)
         mcp_server.start()
         
         # 创建并运行游戏窗口，传入游戏逻辑和MCP服务器
-        GameWindow(game_logic, mcp_server)
+        GameWindow(game_actor, mcp_server)
         
         logger.info("游戏窗口创建成功，开始运行...")
         arcade.run()
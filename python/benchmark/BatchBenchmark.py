@@ -0,0 +1,84 @@
+"""
+批量模拟基准测试
+比较BatchSimulator与逐局循环Board完成随机自对弈的每秒对局数
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.BatchBenchmark
+"""
+import logging
+import random
+import time
+from typing import Dict
+
+from python.core.BatchSimulator import BatchSimulator
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings
+from python.util.Logger import logger
+
+
+class BatchBenchmark:
+    """批量模拟基准测试类"""
+    
+    def __init__(self, batch_games: int = 4096, loop_games: int = 200, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            batch_games: 批量模拟器同时推进的对局数
+            loop_games: 逐局循环的对局数
+            seed: 随机种子
+        """
+        self.batch_games = batch_games
+        self.loop_games = loop_games
+        self.seed = seed
+    
+    def run_board_loop(self, backend: str) -> float:
+        """逐局使用make_move随机对弈，返回每秒对局数"""
+        rng = random.Random(self.seed)
+        settings = GameSettings(board_backend=backend, max_undo_steps=0)
+        start = time.perf_counter()
+        for _ in range(self.loop_games):
+            board = BoardFactory.create_board(settings)
+            cells = list(range(board.size * board.size))
+            rng.shuffle(cells)
+            for cell in cells:
+                board.make_move(*divmod(cell, board.size))
+                if board.is_game_over:
+                    break
+        elapsed = time.perf_counter() - start
+        return self.loop_games / elapsed if elapsed > 0 else 0.0
+    
+    def run_batch(self, policy: str = "random") -> float:
+        """使用BatchSimulator对弈，返回每秒对局数"""
+        simulator = BatchSimulator(num_games=self.batch_games, policy=policy, seed=self.seed)
+        start = time.perf_counter()
+        simulator.run()
+        elapsed = time.perf_counter() - start
+        return self.batch_games / elapsed if elapsed > 0 else 0.0
+    
+    def run(self) -> Dict[str, float]:
+        """
+        执行基准测试
+        
+        Returns:
+            各方式的每秒对局数
+        """
+        results = {f"board_{backend}": self.run_board_loop(backend) for backend in GameSettings.BOARD_BACKENDS}
+        for policy in BatchSimulator.POLICIES:
+            results[f"batch_{policy}"] = self.run_batch(policy)
+        return results
+
+
+def main():
+    """基准测试入口"""
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    results = BatchBenchmark().run()
+    baseline = max(value for name, value in results.items() if name.startswith("board_"))
+    for name, games_per_second in results.items():
+        speedup = games_per_second / baseline if baseline else 0.0
+        print(f"{name:>16}: {games_per_second:.0f} 局/秒 ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+棋盘吞吐量基准测试
+比较不同棋盘后端在随机对局下的落子、悔棋、查询性能
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.BoardBenchmark
+"""
+import logging
+import random
+import time
+from typing import Dict
+
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings
+from python.util.Logger import logger
+
+
+class BoardBenchmark:
+    """棋盘吞吐量基准测试类"""
+    
+    def __init__(self, games: int = 200, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            games: 每个后端执行的随机对局数
+            seed: 随机种子，保证各后端走相同的对局
+        """
+        self.games = games
+        self.seed = seed
+    
+    def run_backend(self, backend: str) -> Dict[str, float]:
+        """
+        对指定后端执行基准测试
+        
+        每局预先打乱全部格子作为落子顺序，每一步依次执行 make_move、get_cell、get_game_result，
+        每局结束后悔棋回到一半，以覆盖undo_move路径。
+        
+        Args:
+            backend: 棋盘后端名称
+        
+        Returns:
+            统计结果字典
+        """
+        rng = random.Random(self.seed)
+        board = BoardFactory.create_board(GameSettings(board_backend=backend))
+        cells = [(row, col) for row in range(board.size) for col in range(board.size)]
+        moves = 0
+        undos = 0
+        
+        start = time.perf_counter()
+        for _ in range(self.games):
+            board.reset()
+            rng.shuffle(cells)
+            for row, col in cells:
+                board.make_move(row, col)
+                board.get_cell(row, col)
+                board.get_game_result()
+                moves += 1
+                if board.is_game_over:
+                    break
+            
+            for _ in range(len(board.move_history) // 2):
+                board.undo_move()
+                undos += 1
+        elapsed = time.perf_counter() - start
+        
+        return {
+            "moves": moves,
+            "undos": undos,
+            "seconds": elapsed,
+            "moves_per_second": moves / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def run(self) -> Dict[str, Dict[str, float]]:
+        """
+        对所有后端执行基准测试
+        
+        Returns:
+            后端名称到统计结果的映射
+        """
+        return {backend: self.run_backend(backend) for backend in GameSettings.BOARD_BACKENDS}
+
+
+def main():
+    """基准测试入口"""
+    # 关闭逐步日志，避免I/O干扰计时
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    results = BoardBenchmark().run()
+    baseline = results["list"]["moves_per_second"]
+    for backend, stats in results.items():
+        speedup = stats["moves_per_second"] / baseline if baseline else 0.0
+        print(f"{backend:>10}: {stats['moves']} 步, {stats['seconds']:.3f} 秒, "
+              f"{stats['moves_per_second']:.0f} 步/秒, 相对list后端 {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
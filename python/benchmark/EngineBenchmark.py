@@ -0,0 +1,81 @@
+"""
+引擎基准测试
+在固定的中局局面上测量AlphaBetaEngine每秒搜索的节点数，用于估算每局对弈占用的CPU
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.EngineBenchmark
+"""
+import logging
+import random
+from typing import Dict, List
+
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.models.GameModels import GameSettings
+from python.util.Logger import logger
+
+
+class EngineBenchmark:
+    """引擎基准测试类"""
+    
+    def __init__(self, positions: int = 5, opening_plies: int = 12, time_limit: float = 1.0, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            positions: 测试局面数
+            opening_plies: 每个局面在中心区域随机落下的棋子数
+            time_limit: 每个局面的搜索时间（秒）
+            seed: 随机种子
+        """
+        self.positions = positions
+        self.opening_plies = opening_plies
+        self.time_limit = time_limit
+        self.seed = seed
+    
+    def _positions(self, backend: str) -> List[Board]:
+        """在中心7x7区域随机落子构造测试局面（跳过已分出胜负的局面）"""
+        rng = random.Random(self.seed)
+        boards = []
+        while len(boards) < self.positions:
+            board = BoardFactory.create_board(GameSettings(board_backend=backend))
+            center = board.size // 2
+            cells = [(row, col) for row in range(center - 3, center + 4) for col in range(center - 3, center + 4)]
+            rng.shuffle(cells)
+            for row, col in cells[:self.opening_plies]:
+                board.make_move(row, col)
+            if not board.is_game_over:
+                boards.append(board)
+        return boards
+    
+    def run(self) -> Dict[str, Dict[str, float]]:
+        """
+        对所有后端执行基准测试
+        
+        Returns:
+            后端名称到 {"nodes_per_second": ..., "average_depth": ...} 的映射
+        """
+        results = {}
+        for backend in GameSettings.BOARD_BACKENDS:
+            engine = AlphaBetaEngine(time_limit=self.time_limit)
+            depths = [engine.search(board).depth for board in self._positions(backend)]
+            results[backend] = {
+                "nodes_per_second": engine.nodes_per_second,
+                "average_depth": sum(depths) / len(depths),
+            }
+        return results
+
+
+def main():
+    """基准测试入口"""
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    benchmark = EngineBenchmark()
+    print(f"{benchmark.positions} 个中局局面, 每个局面搜索 {benchmark.time_limit:.1f} 秒:")
+    for backend, stats in benchmark.run().items():
+        print(f"{backend:>10}: {stats['nodes_per_second']:.0f} 节点/秒, 平均完成深度 {stats['average_depth']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
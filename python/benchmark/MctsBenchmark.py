@@ -0,0 +1,92 @@
+"""
+MCTS并行基准测试
+在固定的中局局面上测量MctsEngine在1、2、4和N（CPU核心数）个工作进程下每秒的模拟次数
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.MctsBenchmark
+"""
+import logging
+import os
+import random
+from typing import Dict, List
+
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.engine.MctsEngine import MctsEngine
+from python.models.GameModels import GameSettings
+from python.util.Logger import logger
+
+
+class MctsBenchmark:
+    """MCTS并行基准测试类"""
+    
+    def __init__(self, positions: int = 3, opening_plies: int = 12, time_limit: float = 2.0, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            positions: 测试局面数
+            opening_plies: 每个局面在中心区域随机落下的棋子数
+            time_limit: 每个局面的搜索时间（秒）
+            seed: 随机种子
+        """
+        self.positions = positions
+        self.opening_plies = opening_plies
+        self.time_limit = time_limit
+        self.seed = seed
+    
+    @staticmethod
+    def worker_counts() -> List[int]:
+        """要测试的进程数: 1、2、4和CPU核心数（去重）"""
+        return sorted({1, 2, 4, os.cpu_count() or 1})
+    
+    def _positions(self) -> List[Board]:
+        """在中心7x7区域随机落子构造测试局面（跳过已分出胜负的局面）"""
+        rng = random.Random(self.seed)
+        boards = []
+        while len(boards) < self.positions:
+            board = BoardFactory.create_board(GameSettings())
+            center = board.size // 2
+            cells = [(row, col) for row in range(center - 3, center + 4) for col in range(center - 3, center + 4)]
+            rng.shuffle(cells)
+            for row, col in cells[:self.opening_plies]:
+                board.make_move(row, col)
+            if not board.is_game_over:
+                boards.append(board)
+        return boards
+    
+    def run(self) -> Dict[int, Dict[str, float]]:
+        """
+        对每个进程数执行基准测试
+        
+        Returns:
+            进程数到 {"playouts_per_second": ..., "speedup": ...} 的映射，speedup相对单进程
+        """
+        boards = self._positions()
+        results = {}
+        for workers in self.worker_counts():
+            with MctsEngine(workers=workers, seed=self.seed) as engine:
+                # 预热: 启动进程池，不计入统计
+                engine.search(boards[0], time_limit=0.1)
+                engine.total_playouts, engine.total_time = 0, 0.0
+                for board in boards:
+                    engine.search(board, time_limit=self.time_limit)
+                results[workers] = {"playouts_per_second": engine.playouts_per_second}
+        single = results[1]["playouts_per_second"]
+        for stats in results.values():
+            stats["speedup"] = stats["playouts_per_second"] / single if single else 0.0
+        return results
+
+
+def main():
+    """基准测试入口"""
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    benchmark = MctsBenchmark()
+    print(f"{benchmark.positions} 个中局局面, 每个局面搜索 {benchmark.time_limit:.1f} 秒, CPU核心数 {os.cpu_count()}:")
+    for workers, stats in benchmark.run().items():
+        print(f"{workers:>3} 进程: {stats['playouts_per_second']:.0f} 次模拟/秒, 加速比 {stats['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
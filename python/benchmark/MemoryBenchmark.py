@@ -0,0 +1,153 @@
+"""
+内存基准测试
+统计每局存活对局占用的字节数，并对比旧的数据结构（dataclass位置 + 元组列表历史）
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.MemoryBenchmark
+"""
+import logging
+import random
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings, MoveHistory, Player, Position
+from python.util.Logger import logger
+
+
+@dataclass
+class LegacyPosition:
+    """旧版位置结构（普通dataclass，每次创建新对象）"""
+    row: int
+    col: int
+
+
+class MemoryBenchmark:
+    """内存基准测试类"""
+    
+    def __init__(self, games: int = 500, plies: int = 60, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            games: 同时存活的对局数
+            plies: 每局落子数
+            seed: 随机种子
+        """
+        self.games = games
+        self.plies = plies
+        self.seed = seed
+        self.size = GameSettings().board_size
+    
+    def _random_games(self) -> List[List[int]]:
+        """生成每局的落子格子序列"""
+        rng = random.Random(self.seed)
+        cells = list(range(self.size * self.size))
+        games = []
+        for _ in range(self.games):
+            rng.shuffle(cells)
+            games.append(cells[:self.plies])
+        return games
+    
+    @staticmethod
+    def _measure(build: Callable[[], list]) -> int:
+        """测量build返回的对象集合占用的总字节数"""
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        objects = build()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        del objects
+        return total
+    
+    def _legacy_history(self, games: List[List[int]]) -> list:
+        """旧版落子历史: (Player, 新建位置) 元组列表"""
+        histories = []
+        for cells in games:
+            history = []
+            for ply, cell in enumerate(cells):
+                player = Player.BLACK if ply % 2 == 0 else Player.WHITE
+                history.append((player, LegacyPosition(*divmod(cell, self.size))))
+            histories.append(history)
+        return histories
+    
+    def _compact_history(self, games: List[List[int]]) -> list:
+        """新版落子历史: MoveHistory数组"""
+        histories = []
+        for cells in games:
+            history = MoveHistory(self.size)
+            for ply, cell in enumerate(cells):
+                history.push(cell, Player.BLACK if ply % 2 == 0 else Player.WHITE)
+            histories.append(history)
+        return histories
+    
+    def _legacy_available_moves(self, games: List[List[int]]) -> list:
+        """旧版可用位置列表: 每次新建位置对象"""
+        results = []
+        for cells in games:
+            taken = set(cells)
+            results.append([LegacyPosition(*divmod(cell, self.size))
+                            for cell in range(self.size * self.size) if cell not in taken])
+        return results
+    
+    def _compact_available_moves(self, games: List[List[int]]) -> list:
+        """新版可用位置列表: 引用共享位置实例"""
+        Position.index_table(self.size)
+        results = []
+        for cells in games:
+            taken = set(cells)
+            results.append([Position.from_index(cell, self.size)
+                            for cell in range(self.size * self.size) if cell not in taken])
+        return results
+    
+    def _boards(self, games: List[List[int]], backend: str) -> list:
+        """完整的存活棋盘"""
+        boards = []
+        for cells in games:
+            board = BoardFactory.create_board(GameSettings(board_backend=backend, max_undo_steps=0))
+            for cell in cells:
+                if board.is_game_over:
+                    break
+                board.make_move(*divmod(cell, self.size))
+            boards.append(board)
+        return boards
+    
+    def run(self) -> Dict[str, float]:
+        """
+        执行基准测试
+        
+        Returns:
+            各项每局平均字节数
+        """
+        games = self._random_games()
+        # 预热共享结构（Zobrist表、窗口索引、位置表），避免计入第一局
+        self._boards(games[:1], "list")
+        
+        results = {
+            "history_before": self._measure(lambda: self._legacy_history(games)),
+            "history_after": self._measure(lambda: self._compact_history(games)),
+            "available_moves_before": self._measure(lambda: self._legacy_available_moves(games)),
+            "available_moves_after": self._measure(lambda: self._compact_available_moves(games)),
+        }
+        for backend in GameSettings.BOARD_BACKENDS:
+            results[f"board_{backend}"] = self._measure(lambda: self._boards(games, backend))
+        return {name: total / self.games for name, total in results.items()}
+
+
+def main():
+    """基准测试入口"""
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    benchmark = MemoryBenchmark()
+    results = benchmark.run()
+    print(f"每局 {benchmark.plies} 步, {benchmark.games} 局同时存活, 每局平均字节数:")
+    print(f"  落子历史:     之前 {results['history_before']:.0f}, 之后 {results['history_after']:.0f}")
+    print(f"  可用位置列表: 之前 {results['available_moves_before']:.0f}, 之后 {results['available_moves_after']:.0f}")
+    for backend in GameSettings.BOARD_BACKENDS:
+        print(f"  完整棋盘({backend}): {results[f'board_{backend}']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+模拟落子基准测试
+比较make_move/undo_move与push/pop在搜索式"落子-撤销"循环下的吞吐量
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.SimulationBenchmark
+"""
+import logging
+import random
+import time
+from typing import Dict, List
+
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings
+from python.util.Logger import logger
+
+
+class SimulationBenchmark:
+    """模拟落子基准测试类"""
+    
+    def __init__(self, sequences: int = 2000, depth: int = 8, opening_plies: int = 20, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            sequences: 模拟的落子序列数
+            depth: 每个序列的落子深度
+            opening_plies: 开始模拟前预先落下的棋子数
+            seed: 随机种子
+        """
+        self.sequences = sequences
+        self.depth = depth
+        self.opening_plies = opening_plies
+        self.seed = seed
+    
+    def _prepare(self, backend: str):
+        """构造中局棋盘和待模拟的落子序列"""
+        rng = random.Random(self.seed)
+        board = BoardFactory.create_board(GameSettings(board_backend=backend, max_undo_steps=0))
+        cells = list(range(board.size * board.size))
+        rng.shuffle(cells)
+        opening, rest = cells[:self.opening_plies], cells[self.opening_plies:]
+        for cell in opening:
+            board.push(cell)
+        
+        lines: List[List[int]] = []
+        for _ in range(self.sequences):
+            lines.append(rng.sample(rest, self.depth))
+        return board, lines
+    
+    def run_make_undo(self, backend: str) -> float:
+        """使用make_move/undo_move，返回每秒处理的落子-撤销对数"""
+        board, lines = self._prepare(backend)
+        plies = 0
+        start = time.perf_counter()
+        for line in lines:
+            played = 0
+            for cell in line:
+                if board.is_game_over:
+                    break
+                board.make_move(cell // board.size, cell % board.size)
+                played += 1
+            for _ in range(played):
+                board.undo_move()
+            plies += played
+        elapsed = time.perf_counter() - start
+        return plies / elapsed if elapsed > 0 else 0.0
+    
+    def run_push_pop(self, backend: str) -> float:
+        """使用push/pop，返回每秒处理的落子-撤销对数"""
+        board, lines = self._prepare(backend)
+        push = board.push
+        pop = board.pop
+        plies = 0
+        start = time.perf_counter()
+        for line in lines:
+            played = 0
+            for cell in line:
+                played += 1
+                if push(cell):
+                    break
+            for _ in range(played):
+                pop()
+            plies += played
+        elapsed = time.perf_counter() - start
+        return plies / elapsed if elapsed > 0 else 0.0
+    
+    def run(self) -> Dict[str, Dict[str, float]]:
+        """
+        对所有后端执行基准测试
+        
+        Returns:
+            后端名称到 {"make_undo": 步/秒, "push_pop": 步/秒} 的映射
+        """
+        return {
+            backend: {
+                "make_undo": self.run_make_undo(backend),
+                "push_pop": self.run_push_pop(backend),
+            }
+            for backend in GameSettings.BOARD_BACKENDS
+        }
+
+
+def main():
+    """基准测试入口"""
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    for backend, stats in SimulationBenchmark().run().items():
+        speedup = stats["push_pop"] / stats["make_undo"] if stats["make_undo"] else 0.0
+        print(f"{backend:>10}: make_move/undo_move {stats['make_undo']:.0f} 步/秒, "
+              f"push/pop {stats['push_pop']:.0f} 步/秒, 提升 {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+并行搜索基准测试
+在固定的中局局面上测量LazySmpEngine在1、2、4和N（CPU核心数）个工作进程下完成固定深度搜索所需的时间
+
+运行方式（在项目根目录）:
+    python -m python.benchmark.SmpBenchmark
+"""
+import logging
+import os
+import random
+import time
+from typing import Dict, List
+
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.LazySmpEngine import LazySmpEngine
+from python.models.GameModels import GameSettings
+from python.util.Logger import logger
+
+
+class SmpBenchmark:
+    """并行搜索基准测试类"""
+    
+    def __init__(self, positions: int = 4, opening_plies: int = 12, depth: int = 6, seed: int = 20240101):
+        """
+        初始化基准测试
+        
+        Args:
+            positions: 测试局面数
+            opening_plies: 每个局面在中心区域随机落下的棋子数
+            depth: 要完成的搜索深度
+            seed: 随机种子
+        """
+        self.positions = positions
+        self.opening_plies = opening_plies
+        self.depth = depth
+        self.seed = seed
+    
+    @staticmethod
+    def worker_counts() -> List[int]:
+        """要测试的进程数: 1、2、4和CPU核心数（去重）"""
+        return sorted({1, 2, 4, os.cpu_count() or 1})
+    
+    def _positions(self) -> List[Board]:
+        """在中心7x7区域随机落子构造测试局面（跳过已分出胜负或存在强制获胜序列的局面）"""
+        rng = random.Random(self.seed)
+        probe = AlphaBetaEngine(max_depth=1)
+        boards = []
+        while len(boards) < self.positions:
+            board = BoardFactory.create_board(GameSettings())
+            center = board.size // 2
+            cells = [(row, col) for row in range(center - 3, center + 4) for col in range(center - 3, center + 4)]
+            rng.shuffle(cells)
+            for row, col in cells[:self.opening_plies]:
+                board.make_move(row, col)
+            if not board.is_game_over and abs(probe.search(board).score) < AlphaBetaEngine.MATE_THRESHOLD:
+                boards.append(board)
+        return boards
+    
+    def run(self) -> Dict[int, Dict[str, float]]:
+        """
+        对每个进程数执行基准测试
+        
+        Returns:
+            进程数到 {"time_to_depth": ..., "speedup": ...} 的映射，time_to_depth为平均秒数，speedup相对单进程
+        """
+        boards = self._positions()
+        results = {}
+        for workers in self.worker_counts():
+            with LazySmpEngine(time_limit=600, workers=workers, max_depth=self.depth) as engine:
+                # 预热: 启动进程池，不计入统计
+                engine.search(boards[0], time_limit=0.1)
+                elapsed = 0.0
+                for board in boards:
+                    start = time.perf_counter()
+                    engine.search(board)
+                    elapsed += time.perf_counter() - start
+                results[workers] = {"time_to_depth": elapsed / len(boards)}
+        single = results[1]["time_to_depth"]
+        for stats in results.values():
+            stats["speedup"] = single / stats["time_to_depth"] if stats["time_to_depth"] else 0.0
+        return results
+
+
+def main():
+    """基准测试入口"""
+    logger.get_logger().setLevel(logging.WARNING)
+    
+    benchmark = SmpBenchmark()
+    print(f"{benchmark.positions} 个中局局面, 搜索到深度 {benchmark.depth}, CPU核心数 {os.cpu_count()}:")
+    for workers, stats in benchmark.run().items():
+        print(f"{workers:>3} 进程: 平均 {stats['time_to_depth']:.2f} 秒, 加速比 {stats['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+批量对局模拟器
+用形状为(N, size, size)的数组同时推进N局独立的自对弈，用于大规模比较规则变体
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from python.core.LineWindowIndex import LineWindowIndex
+from python.models.GameModels import GameSettings, Player
+
+
+class BatchSimulator:
+    """批量对局模拟器类
+    
+    规则与Board完全一致: 黑方先行，双方轮流落子；
+    某一手形成不少于win_count的连子即获胜（长连同样获胜），棋盘下满且无人获胜为平局。
+    """
+    
+    # 支持的落子策略
+    POLICIES = ("random", "neighbour")
+    
+    # 八邻域的行、列偏移
+    _NEIGHBOUR_ROWS = np.array([-1, -1, -1, 0, 0, 1, 1, 1], dtype=np.intp)
+    _NEIGHBOUR_COLS = np.array([-1, 0, 1, -1, 1, -1, 0, 1], dtype=np.intp)
+    
+    # 棋盘外边框格子的取值，不等于任何Player.value
+    _BORDER = -1
+    
+    def __init__(self, settings: Optional[GameSettings] = None, num_games: int = 1024,
+                 policy: str = "random", seed: Optional[int] = None):
+        """
+        初始化批量模拟器
+        
+        Args:
+            settings: 游戏设置（使用board_size和win_count）
+            num_games: 同时进行的对局数
+            policy: 落子策略，"random"为在所有空位中均匀随机，"neighbour"为优先选择已有棋子周围的空位
+            seed: 随机种子
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"不支持的落子策略: {policy}")
+        self.settings = settings or GameSettings()
+        self.settings.validate()
+        self.size = self.settings.board_size
+        self.win_count = self.settings.win_count
+        self.num_games = num_games
+        self.policy = policy
+        self.rng = np.random.default_rng(seed)
+        
+        # 棋盘四周留出win_count-1格的边框，使得检查胜负时无需做边界判断
+        self._pad = self.win_count - 1
+        self._padded_size = self.size + 2 * self._pad
+        # 以落子为中心、长度为2*win_count-1的线段上每个格子在带边框棋盘中的扁平偏移，形状为(4, 2k-1)
+        offsets = np.arange(-self._pad, self._pad + 1)
+        self._line_offsets = np.array(
+            [(dr * self._padded_size + dc) * offsets for dr, dc in LineWindowIndex.DIRECTIONS],
+            dtype=np.intp
+        )
+        
+        self.reset()
+    
+    def reset(self):
+        """重置所有对局"""
+        cell_count = self.size * self.size
+        self._padded = np.full((self.num_games, self._padded_size, self._padded_size), self._BORDER, dtype=np.int8)
+        # 所有对局的棋盘，形状为(N, size, size)，是带边框数组的内部视图
+        self.boards = self._padded[:, self._pad:self._pad + self.size, self._pad:self._pad + self.size]
+        self.boards[...] = Player.NONE.value
+        # 每局当前落子方（Player.value）
+        self.current = np.full(self.num_games, Player.BLACK.value, dtype=np.int8)
+        # 每局胜者（Player.value，0表示无人获胜）
+        self.winners = np.zeros(self.num_games, dtype=np.int8)
+        # 每局是否已经结束
+        self.done = np.zeros(self.num_games, dtype=bool)
+        # 每局已落子数与落子序列（格子索引，未使用的位置为-1）
+        self.move_counts = np.zeros(self.num_games, dtype=np.int16)
+        self.moves = np.full((self.num_games, cell_count), -1, dtype=np.int16)
+        # 每局每个格子的得分，每步选择得分最高的格子:
+        # 空位的基础分是在本轮对局中固定的[0, 1)随机优先级，等价于在空位中均匀随机，
+        # 同时避免每步重新生成(N, size * size)个随机数；已落子的格子为-1，
+        # neighbour策略下已有棋子周围的空位再加1
+        self._scores = self.rng.random((self.num_games, cell_count), dtype=np.float32)
+    
+    def legal_mask(self) -> np.ndarray:
+        """
+        获取合法落子掩码
+        
+        Returns:
+            形状为(N, size * size)的布尔数组，已结束对局的行全为False
+        """
+        flat = self.boards.reshape(self.num_games, -1)
+        return (flat == Player.NONE.value) & ~self.done[:, None]
+    
+    def choose_moves(self) -> np.ndarray:
+        """
+        按策略为每局选择一手
+        
+        Returns:
+            形状为(N,)的格子索引数组，已结束的对局为-1
+        """
+        # 未结束的对局必有空位，因此最大值一定落在合法位置上
+        moves = self._scores.argmax(axis=1)
+        moves[self.done] = -1
+        return moves
+    
+    def _boost_neighbours(self, games: np.ndarray, rows: np.ndarray, cols: np.ndarray):
+        """为新落子周围尚未加分的空位加分"""
+        near_rows = rows[:, None] + self._NEIGHBOUR_ROWS
+        near_cols = cols[:, None] + self._NEIGHBOUR_COLS
+        inside = (near_rows >= 0) & (near_rows < self.size) & (near_cols >= 0) & (near_cols < self.size)
+        near_games = np.broadcast_to(games[:, None], inside.shape)[inside]
+        near_cells = near_rows[inside] * self.size + near_cols[inside]
+        scores = self._scores[near_games, near_cells]
+        # 同一步中每局只落一子，因此这里的(对局, 格子)对互不重复
+        self._scores[near_games, near_cells] = np.where((scores >= 0) & (scores < 1), scores + 1, scores)
+    
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        """
+        为所有未结束的对局同时落子，并向量化地判断胜负
+        
+        Args:
+            moves: 形状为(N,)的格子索引数组，-1表示该局本步不落子
+        
+        Returns:
+            本步结束的对局掩码
+        """
+        active = (moves >= 0) & ~self.done
+        games = np.flatnonzero(active)
+        if games.size == 0:
+            return np.zeros(self.num_games, dtype=bool)
+        
+        cells = moves[games]
+        rows, cols = np.divmod(cells, self.size)
+        players = self.current[games]
+        if (self.boards[games, rows, cols] != Player.NONE.value).any():
+            raise ValueError("存在落在非空位置的棋子")
+        
+        self.boards[games, rows, cols] = players
+        self.moves[games, self.move_counts[games]] = cells
+        self._scores[games, cells] = -1.0
+        if self.policy == "neighbour":
+            self._boost_neighbours(games, rows, cols)
+        self.move_counts[games] += 1
+        
+        won = self._check_wins(games, rows, cols, players)
+        full = self.move_counts[games] == self.size * self.size
+        
+        finished = np.zeros(self.num_games, dtype=bool)
+        finished[games] = won | full
+        self.winners[games[won]] = players[won]
+        self.done |= finished
+        
+        # 与Board一致: 对局结束时不再切换落子方
+        switch = games[~(won | full)]
+        self.current[switch] = 3 - self.current[switch]
+        return finished
+    
+    def _check_wins(self, games: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                    players: np.ndarray) -> np.ndarray:
+        """检查每局最后一手所在的四条线上是否存在包含它的win_count连子"""
+        # 线段上每个格子是否为己方棋子，形状为(G, 4, 2k-1)
+        centers = (games * self._padded_size + rows + self._pad) * self._padded_size + cols + self._pad
+        own = self._padded.reshape(-1)[centers[:, None, None] + self._line_offsets] == players[:, None, None]
+        
+        # 长度为k、覆盖中心的窗口共k个（起点为0..k-1），逐格求与得到每个窗口是否全为己方棋子
+        starts = self.win_count
+        full = own[:, :, :starts].copy()
+        for offset in range(1, self.win_count):
+            full &= own[:, :, offset:offset + starts]
+        return full.reshape(len(games), -1).any(axis=1)
+    
+    def run(self, max_steps: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        按策略把所有对局下到结束
+        
+        Args:
+            max_steps: 最多推进的步数，默认为棋盘格子数
+        
+        Returns:
+            包含winners、move_counts、draws的结果字典
+        """
+        max_steps = max_steps or self.size * self.size
+        for _ in range(max_steps):
+            if self.done.all():
+                break
+            self.step(self.choose_moves())
+        return self.results()
+    
+    def results(self) -> Dict[str, np.ndarray]:
+        """
+        获取当前结果
+        
+        Returns:
+            winners: 每局胜者的Player.value；move_counts: 每局步数；
+            draws: 每局是否平局；done: 每局是否结束
+        """
+        return {
+            "winners": self.winners.copy(),
+            "move_counts": self.move_counts.copy(),
+            "draws": self.done & (self.winners == Player.NONE.value),
+            "done": self.done.copy(),
+        }
+    
+    def game_moves(self, game: int) -> np.ndarray:
+        """
+        获取某一局的落子序列
+        
+        Args:
+            game: 对局编号
+        
+        Returns:
+            按顺序排列的格子索引数组
+        """
+        return self.moves[game, :self.move_counts[game]].copy()
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        统计胜负比例
+        
+        Returns:
+            黑胜、白胜、平局比例和平均步数
+        """
+        finished = max(int(self.done.sum()), 1)
+        return {
+            "black_win_rate": float((self.winners == Player.BLACK.value).sum()) / finished,
+            "white_win_rate": float((self.winners == Player.WHITE.value).sum()) / finished,
+            "draw_rate": float((self.done & (self.winners == Player.NONE.value)).sum()) / finished,
+            "average_moves": float(self.move_counts[self.done].mean()) if self.done.any() else 0.0,
+        }
@@ -0,0 +1,52 @@
+"""
+位棋盘类
+使用整数位掩码存储双方棋子，提供与Board相同的公共接口
+"""
+from typing import List
+
+from python.core.Board import Board
+from python.models.GameModels import Player
+
+
+class BitBoard(Board):
+    """位棋盘类
+    
+    每个玩家的棋子保存为一个任意精度整数，第 row * size + col 位表示(row, col)，
+    棋盘存储只占两个整数，适合大量棋盘同时存在的场景。
+    胜负判断和威胁查询沿用Board在落子时维护的窗口计数，只检查经过落子位置的窗口；
+    纯Python中逐格的位运算并不比列表访问快，因此默认后端仍为list。
+    """
+    
+    def _init_storage(self):
+        """初始化位掩码存储"""
+        self._black_bits = 0
+        self._white_bits = 0
+    
+    def _read_cell(self, row: int, col: int) -> Player:
+        """读取指定位置的棋子（不做边界检查）"""
+        bit = 1 << (row * self.size + col)
+        if self._black_bits & bit:
+            return Player.BLACK
+        if self._white_bits & bit:
+            return Player.WHITE
+        return Player.NONE
+    
+    def _write_cell(self, row: int, col: int, player: Player):
+        """写入指定位置的棋子（不做边界检查，写入棋子时该位置必须为空）"""
+        bit = 1 << (row * self.size + col)
+        if player is Player.BLACK:
+            self._black_bits |= bit
+        elif player is Player.WHITE:
+            self._white_bits |= bit
+        else:
+            self._black_bits &= ~bit
+            self._white_bits &= ~bit
+    
+    def get_board_state(self) -> List[List[Player]]:
+        """
+        获取当前棋盘状态
+        
+        Returns:
+            棋盘状态的深拷贝
+        """
+        return [[self._read_cell(row, col) for col in range(self.size)] for row in range(self.size)]
@@ -2,15 +2,23 @@
 棋盘逻辑类
 管理棋盘状态、落子、胜负判断等核心逻辑
 """
+import time
+from contextlib import contextmanager
 from typing import List, Optional, Tuple
 
-from python.models.GameModels import GameResult, GameSettings, Player, Position
+from python.core.LineWindowIndex import LineWindowIndex
+from python.core.PatternEvaluator import PatternEvaluator
+from python.core.ZobristTable import ZobristTable
+from python.models.GameModels import BoardSnapshot, GameResult, GameSettings, MoveHistory, Player, Position
 from python.util.Logger import logger
 
 
 class Board:
     """棋盘类"""
     
+    # 按player.value索引的对手
+    _OPPONENTS = (Player.NONE, Player.WHITE, Player.BLACK)
+    
     def __init__(self, settings: Optional[GameSettings] = None):
         """
         初始化棋盘
@@ -18,33 +26,228 @@ class Board:
         Args:
             settings: 游戏设置，如果为None则使用默认设置
         """
-        self.settings = settings or GameSettings()
+        self._init_board(settings or GameSettings())
+        logger.info(f"初始化棋盘: {self.size}x{self.size}, 获胜连子数: {self.win_count}")
+    
+    def _init_board(self, settings: GameSettings):
+        """按设置初始化空棋盘的全部状态（不输出日志，clone也经由此处）"""
+        self.settings = settings
         self.settings.validate()
         
         # 初始化棋盘状态
         self.size = self.settings.board_size
         self.win_count = self.settings.win_count
-        self._board = [[Player.NONE for _ in range(self.size)] for _ in range(self.size)]
+        self._zobrist = ZobristTable.for_size(self.size)
+        self._windows = LineWindowIndex.for_size(self.size, self.win_count)
+        self._init_storage()
+        self._init_tracking()
         
         # 游戏历史记录
-        self.move_history: List[Tuple[Player, Position]] = []
+        self.move_history = MoveHistory(self.size)
+        self._positions = Position.index_table(self.size)
         self.current_player = Player.BLACK
         
         # 胜负状态
         self.winner = Player.NONE
-        self.winning_positions: List[Position] = []
         self.is_game_over = False
         
-        logger.info(f"初始化棋盘: {self.size}x{self.size}, 获胜连子数: {self.win_count}")
+        # 修改序号: 每次修改开始和结束时各加1，为偶数时棋盘处于一致状态，version = _seq // 2
+        self._seq = 0
+        # 最近一次生成的只读快照
+        self._snapshot: Optional[BoardSnapshot] = None
+        # 可选的增量棋型评估器，挂载后随每次落子和悔棋更新
+        self._evaluator: Optional[PatternEvaluator] = None
+    
+    def _init_storage(self):
+        """初始化底层棋盘存储（子类可替换为其他存储结构）"""
+        self._board = [[Player.NONE for _ in range(self.size)] for _ in range(self.size)]
+    
+    def _read_cell(self, row: int, col: int) -> Player:
+        """读取指定位置的棋子（不做边界检查）"""
+        return self._board[row][col]
+    
+    def _write_cell(self, row: int, col: int, player: Player):
+        """写入指定位置的棋子（不做边界检查）"""
+        self._board[row][col] = player
+    
+    def _cells_bytes(self) -> bytes:
+        """按行优先顺序导出每个格子的player.value"""
+        return bytes(self._read_cell(row, col).value for row in range(self.size) for col in range(self.size))
+    
+    def _init_tracking(self):
+        """初始化与存储无关的增量状态（局面哈希、空位计数、空位掩码）"""
+        self._hash = 0
+        self._empty_count = self.size * self.size
+        # 第 row * size + col 位为1表示该格为空
+        self._free_mask = (1 << self._empty_count) - 1
+        
+        # 每个窗口内双方的棋子数，按player.value索引
+        window_count = self._windows.window_count
+        self._window_counts = [None, bytearray(window_count), bytearray(window_count)]
+        # 对某一方"活"的窗口（对方棋子数为0），按己方棋子数分组
+        self._live_windows = [None] + [[set() for _ in range(self.win_count + 1)] for _ in range(2)]
+        
+        # 获胜窗口编号，获胜连子在需要时才由它生成
+        self._winning_window = -1
+        self._winning_positions: Optional[List[Position]] = None
+    
+    def _place(self, row: int, col: int, player: Player) -> bool:
+        """
+        在空位放置棋子并增量更新局面哈希、空位信息和窗口计数
+        
+        Returns:
+            如果覆盖该位置的某个窗口达到获胜连子数则返回True
+        """
+        index = row * self.size + col
+        value = player.value
+        self._write_cell(row, col, player)
+        self._hash ^= self._zobrist.keys[value][index]
+        self._free_mask ^= 1 << index
+        self._empty_count -= 1
+        
+        own_counts = self._window_counts[value]
+        opponent_counts = self._window_counts[3 - value]
+        own_live = self._live_windows[value]
+        opponent_live = self._live_windows[3 - value]
+        win_count = self.win_count
+        won = False
+        for window in self._windows.cell_windows[index]:
+            count = own_counts[window] + 1
+            own_counts[window] = count
+            if count >= win_count:
+                won = True
+            opponent_count = opponent_counts[window]
+            if opponent_count == 0:
+                if count > 1:
+                    own_live[count - 1].discard(window)
+                own_live[count].add(window)
+            elif count == 1:
+                # 窗口首次出现己方棋子，对对方不再是活窗口
+                opponent_live[opponent_count].discard(window)
+        if self._evaluator is not None:
+            self._evaluator.on_place(index, value)
+        return won
+    
+    def _remove(self, row: int, col: int, player: Player):
+        """移除指定玩家的棋子并增量更新局面哈希、空位信息和窗口计数"""
+        index = row * self.size + col
+        value = player.value
+        self._write_cell(row, col, Player.NONE)
+        self._hash ^= self._zobrist.keys[value][index]
+        self._free_mask |= 1 << index
+        self._empty_count += 1
+        
+        own_counts = self._window_counts[value]
+        opponent_counts = self._window_counts[3 - value]
+        own_live = self._live_windows[value]
+        opponent_live = self._live_windows[3 - value]
+        for window in self._windows.cell_windows[index]:
+            count = own_counts[window]
+            own_counts[window] = count - 1
+            opponent_count = opponent_counts[window]
+            if opponent_count == 0:
+                own_live[count].discard(window)
+                if count > 1:
+                    own_live[count - 1].add(window)
+            elif count == 1:
+                # 窗口中已无己方棋子，重新成为对方的活窗口
+                opponent_live[opponent_count].add(window)
+        if self._evaluator is not None:
+            self._evaluator.on_remove(index, value)
+    
+    @property
+    def zobrist_hash(self) -> int:
+        """当前局面的64位Zobrist哈希"""
+        return self._hash
+    
+    @property
+    def version(self) -> int:
+        """棋盘版本号，每次落子、悔棋、重置后单调递增"""
+        return self._seq >> 1
+    
+    def advance_version(self, version: int):
+        """把版本号推进到不小于version（恢复保存的对局后与之前发出的版本号衔接）"""
+        if version > self._seq >> 1:
+            self._seq = version << 1
+    
+    @property
+    def empty_count(self) -> int:
+        """当前空位数量"""
+        return self._empty_count
+    
+    @property
+    def free_mask(self) -> int:
+        """空位位掩码，第 row * size + col 位为1表示该格为空"""
+        return self._free_mask
+    
+    @property
+    def winning_positions(self) -> List[Position]:
+        """获胜连子位置（仅在有玩家获胜后生成）"""
+        if self._winning_window < 0:
+            return []
+        if self._winning_positions is None:
+            self._winning_positions = [
+                self._positions[cell] for cell in self._windows.window_cells[self._winning_window]
+            ]
+        return self._winning_positions
+    
+    @property
+    def evaluator(self) -> Optional[PatternEvaluator]:
+        """已挂载的增量棋型评估器"""
+        return self._evaluator
+    
+    def attach_evaluator(self, evaluator: Optional[PatternEvaluator] = None) -> PatternEvaluator:
+        """
+        挂载增量棋型评估器，并按当前局面重建其状态
+        
+        Args:
+            evaluator: 评估器，为None时按棋盘设置新建
+        
+        Returns:
+            已挂载的评估器
+        """
+        evaluator = evaluator or PatternEvaluator(self.size, self.win_count)
+        evaluator.rebuild(self._cells_bytes())
+        self._evaluator = evaluator
+        return evaluator
+    
+    def detach_evaluator(self):
+        """卸载增量棋型评估器"""
+        self._evaluator = None
+    
+    def clone(self) -> "Board":
+        """
+        复制棋盘（同一后端，包括落子历史和胜负状态，不包括评估器和快照缓存）
+        
+        引擎每次搜索都会复制棋盘，因此这里不经过__init__，不输出初始化日志。
+        
+        Returns:
+            新的棋盘实例，修改它不会影响本棋盘
+        """
+        board = type(self).__new__(type(self))
+        board._init_board(self.settings)
+        for player, position in self.move_history:
+            board._place(position.row, position.col, player)
+            board.move_history.push(position.to_index(self.size), player)
+        board.current_player = self.current_player
+        board.winner = self.winner
+        board.is_game_over = self.is_game_over
+        board._winning_window = self._winning_window
+        board._seq = self._seq & ~1
+        return board
     
     def reset(self):
         """重置棋盘"""
-        self._board = [[Player.NONE for _ in range(self.size)] for _ in range(self.size)]
+        self._seq += 1
+        self._init_storage()
+        self._init_tracking()
+        if self._evaluator is not None:
+            self._evaluator.reset()
         self.move_history.clear()
         self.current_player = Player.BLACK
         self.winner = Player.NONE
-        self.winning_positions.clear()
         self.is_game_over = False
+        self._seq += 1
         
         logger.info("棋盘已重置")
     
@@ -55,17 +258,17 @@ class Board:
         Args:
             row: 行号 (0-based)
             col: 列号 (0-based)
-            
+        
         Returns:
             该位置的玩家，如果没有棋子则返回Player.NONE
-            
+        
         Raises:
             IndexError: 如果位置超出棋盘范围
         """
         if not (0 <= row < self.size and 0 <= col < self.size):
             raise IndexError(f"位置({row}, {col})超出棋盘范围(0-{self.size-1})")
         
-        return self._board[row][col]
+        return self._read_cell(row, col)
     
     def is_valid_move(self, row: int, col: int) -> bool:
         """
@@ -74,7 +277,7 @@ class Board:
         Args:
             row: 行号
             col: 列号
-            
+        
         Returns:
             如果位置有效且为空则返回True
         """
@@ -91,7 +294,7 @@ class Board:
             row: 行号
             col: 列号
             player: 落子玩家，如果为None则使用当前玩家
-            
+        
         Returns:
             如果落子成功则返回True，否则返回False
         """
@@ -106,30 +309,41 @@ class Board:
         # 确定落子玩家
         move_player = player or self.current_player
         
-        # 落子
-        self._board[row][col] = move_player
-        position = Position(row, col)
-        self.move_history.append((move_player, position))
-        
-        logger.info(f"玩家 {move_player.name} 在位置 ({row}, {col}) 落子")
+        # 落子（写入期间序号为奇数，读者据此判断是否读到了未完成的落子）
+        self._seq += 1
+        self._place(row, col, move_player)
+        self.move_history.push(row * self.size + col, move_player)
         
-        # 检查胜负
+        # 检查胜负、平局，否则切换玩家
         if self._check_win(row, col, move_player):
             self.winner = move_player
             self.is_game_over = True
-            logger.info(f"玩家 {move_player.name} 获胜!")
-            return True
-        
-        # 检查平局
-        if self._check_draw():
+        elif self._check_draw():
             self.is_game_over = True
-            logger.info("游戏平局!")
-            return True
+        else:
+            self.current_player = move_player.opposite()
+        self._seq += 1
         
-        # 切换玩家
-        self.current_player = move_player.opposite()
+        logger.info(f"玩家 {move_player.name} 在位置 ({row}, {col}) 落子")
+        if self.winner != Player.NONE:
+            logger.info(f"玩家 {move_player.name} 获胜!")
+        elif self.is_game_over:
+            logger.info("游戏平局!")
         return True
     
+    def resign(self, player: Player):
+        """
+        认输: 对手获胜，对局结束（没有获胜连子），版本号推进，快照和按版本增量同步的客户端都能看到结果
+        
+        Args:
+            player: 认输的一方
+        """
+        self._seq += 1
+        self.winner = player.opposite()
+        self.is_game_over = True
+        self._seq += 1
+        logger.info(f"玩家 {player.name} 认输，玩家 {self.winner.name} 获胜!")
+    
     def undo_move(self) -> bool:
         """
         悔棋一步
@@ -150,69 +364,176 @@ class Board:
             return False
         
         # 移除最后一步
+        self._seq += 1
         player, position = self.move_history.pop()
-        self._board[position.row][position.col] = Player.NONE
+        self._remove(position.row, position.col, player)
         
         # 重置游戏状态
         self.winner = Player.NONE
-        self.winning_positions.clear()
+        self._winning_window = -1
+        self._winning_positions = None
         self.is_game_over = False
         
         # 恢复当前玩家
         self.current_player = player
+        self._seq += 1
         
         logger.info(f"悔棋: 玩家 {player.name} 在位置 ({position.row}, {position.col})")
         return True
     
+    def push(self, cell: int) -> bool:
+        """
+        搜索用落子：当前玩家在指定格子落子并切换玩家
+        
+        与make_move不同，push不记录日志、不检查位置和游戏是否结束，也不更新winner/is_game_over，
+        但会同步更新局面哈希、空位信息、窗口计数和落子历史。调用方必须保证该格为空。
+        
+        Args:
+            cell: 格子索引 (row * size + col)
+        
+        Returns:
+            如果这一手形成获胜连子则返回True
+        """
+        player = self.current_player
+        row, col = divmod(cell, self.size)
+        self._seq += 1
+        won = self._place(row, col, player)
+        self.move_history.push(cell, player)
+        self.current_player = self._OPPONENTS[player.value]
+        self._seq += 1
+        return won
+    
+    def pop(self) -> int:
+        """
+        搜索用悔棋：撤销最后一手（push或make_move）并恢复当前玩家
+        
+        不受allow_undo和max_undo_steps限制，也不记录日志。撤销的是结束对局的make_move时，
+        与undo_move一样清除winner和is_game_over（push不设置它们，搜索路径上只多一次判断）。
+        
+        Returns:
+            被撤销的格子索引
+        """
+        self._seq += 1
+        cell, player = self.move_history.pop_cell()
+        self._remove(cell // self.size, cell % self.size, player)
+        self.current_player = player
+        if self.is_game_over:
+            self.winner = Player.NONE
+            self._winning_window = -1
+            self._winning_positions = None
+            self.is_game_over = False
+        self._seq += 1
+        return cell
+    
+    @contextmanager
+    def simulation(self):
+        """
+        模拟上下文：退出时撤销在上下文中push的所有落子
+        
+        Yields:
+            棋盘本身
+        """
+        depth = len(self.move_history)
+        try:
+            yield self
+        finally:
+            while len(self.move_history) > depth:
+                self.pop()
+    
     def _check_win(self, row: int, col: int, player: Player) -> bool:
         """
         检查指定位置是否形成获胜连子
         
+        只需检查覆盖该位置的窗口中是否有己方棋子数达到获胜连子数
+        
         Args:
             row: 行号
             col: 列号
             player: 玩家
-            
+        
         Returns:
             如果获胜则返回True
         """
-        # 检查的四个方向: 水平、垂直、左上到右下、右上到左下
-        directions = [
-            (0, 1),   # 水平
-            (1, 0),   # 垂直
-            (1, 1),   # 左上到右下
-            (1, -1)   # 右上到左下
-        ]
-        
-        for dr, dc in directions:
-            count = 1  # 当前位置已经有一个棋子
-            positions = [Position(row, col)]
-            
-            # 正向检查
-            for i in range(1, self.win_count):
-                r, c = row + dr * i, col + dc * i
-                if 0 <= r < self.size and 0 <= c < self.size and self._board[r][c] == player:
-                    count += 1
-                    positions.append(Position(r, c))
-                else:
-                    break
-            
-            # 反向检查
-            for i in range(1, self.win_count):
-                r, c = row - dr * i, col - dc * i
-                if 0 <= r < self.size and 0 <= c < self.size and self._board[r][c] == player:
-                    count += 1
-                    positions.append(Position(r, c))
-                else:
-                    break
-            
-            # 如果达到获胜条件
-            if count >= self.win_count:
-                self.winning_positions = positions[:self.win_count]  # 只保留获胜的连子
+        counts = self._window_counts[player.value]
+        for window in self._windows.cell_windows[row * self.size + col]:
+            if counts[window] >= self.win_count:
+                self._winning_window = window
+                self._winning_positions = None
                 return True
-        
         return False
     
+    def _window_empty_cells(self, window: int) -> List[int]:
+        """获取窗口中的空位索引"""
+        free = self._free_mask
+        return [cell for cell in self._windows.window_cells[window] if free >> cell & 1]
+    
+    def get_winning_cells(self, player: Player) -> List[Position]:
+        """
+        获取指定玩家下一手即可连成获胜连子的位置
+        
+        Args:
+            player: 玩家
+        
+        Returns:
+            位置列表（按行优先顺序）
+        """
+        return [self._positions[cell] for cell in sorted(self.winning_cell_indices(player))]
+    
+    def winning_cell_indices(self, player: Player) -> set:
+        """
+        获取指定玩家下一手即可连成获胜连子的格子索引（搜索用，无序）
+        
+        Args:
+            player: 玩家
+        
+        Returns:
+            格子索引集合
+        """
+        return self.live_window_cells(player, self.win_count - 1)
+    
+    def live_window_cells(self, player: Player, stones: int) -> set:
+        """
+        获取指定玩家所有恰有stones个己方棋子、没有对方棋子的窗口中的空位（搜索用，无序）
+        
+        stones为win_count-1时是成五点，为win_count-2时是下一手可以形成冲四或活四的位置。
+        
+        Args:
+            player: 玩家
+            stones: 窗口内的己方棋子数
+        
+        Returns:
+            格子索引集合
+        """
+        cells = set()
+        for window in self._live_windows[player.value][stones]:
+            cells.update(self._window_empty_cells(window))
+        return cells
+    
+    def get_open_fours(self, player: Player) -> List[Tuple[Position, Position]]:
+        """
+        获取指定玩家的活四（win_count-1个连续棋子且两端均为空）
+        
+        Args:
+            player: 玩家
+        
+        Returns:
+            每个活四两端的成五位置
+        """
+        near_wins = self._live_windows[player.value][self.win_count - 1]
+        window_cells = self._windows.window_cells
+        next_window = self._windows.next_window
+        free = self._free_mask
+        open_fours = []
+        for window in near_wins:
+            first = window_cells[window][0]
+            following = next_window[window]
+            # 窗口首格为空且后移一格的窗口同样差一子，则两个窗口共享中间的连子
+            if free >> first & 1 and following in near_wins:
+                last = window_cells[following][-1]
+                open_fours.append((self._positions[first], self._positions[last]))
+        open_fours.sort(key=lambda ends: (ends[0].row, ends[0].col, ends[1].row, ends[1].col))
+        return open_fours
+    
     def _check_draw(self) -> bool:
         """
         检查是否平局（棋盘已满）
@@ -220,11 +541,7 @@ class Board:
         Returns:
             如果平局则返回True
         """
-        for row in range(self.size):
-            for col in range(self.size):
-                if self._board[row][col] == Player.NONE:
-                    return False
-        return True
+        return self._empty_count == 0
     
     def get_board_state(self) -> List[List[Player]]:
         """
@@ -235,18 +552,55 @@ class Board:
         """
         return [row.copy() for row in self._board]
     
+    def get_snapshot(self) -> BoardSnapshot:
+        """
+        获取当前棋盘的只读快照
+        
+        快照按版本号缓存，版本不变时所有读者共享同一个对象，不做任何复制。
+        生成快照时若遇到并发修改会重试，因此不会读到未完成的落子。
+        
+        Returns:
+            BoardSnapshot实例
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._seq >> 1:
+            return snapshot
+        
+        while True:
+            seq = self._seq
+            if seq & 1:
+                # 写入进行中，让出时间片后重试
+                time.sleep(0)
+                continue
+            snapshot = BoardSnapshot(
+                version=seq >> 1,
+                size=self.size,
+                cells=self._cells_bytes(),
+                current_player=self.current_player,
+                move_count=len(self.move_history),
+                winner=self.winner,
+                is_game_over=self.is_game_over,
+                winning_positions=tuple(self.winning_positions),
+                zobrist_hash=self._hash
+            )
+            if self._seq == seq:
+                self._snapshot = snapshot
+                return snapshot
+    
     def get_available_moves(self) -> List[Position]:
         """
         获取所有可用的落子位置
         
         Returns:
-            可用位置列表
+            可用位置列表（按行优先顺序）
         """
+        positions = self._positions
         moves = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self._board[row][col] == Player.NONE:
-                    moves.append(Position(row, col))
+        free = self._free_mask
+        while free:
+            low = free & -free
+            moves.append(positions[low.bit_length() - 1])
+            free ^= low
         return moves
     
     def get_game_result(self) -> Optional[GameResult]:
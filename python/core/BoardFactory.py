@@ -0,0 +1,38 @@
+"""
+棋盘工厂类
+根据游戏设置中的board_backend创建对应的棋盘实现
+"""
+from typing import Optional
+
+from python.core.BitBoard import BitBoard
+from python.core.Board import Board
+from python.models.GameModels import GameSettings
+
+
+class BoardFactory:
+    """棋盘工厂类"""
+    
+    # 后端名称到棋盘类的映射
+    _BACKENDS = {
+        "list": Board,
+        "bitboard": BitBoard,
+    }
+    
+    @staticmethod
+    def create_board(settings: Optional[GameSettings] = None) -> Board:
+        """
+        创建棋盘实例
+        
+        Args:
+            settings: 游戏设置，如果为None则使用默认设置
+        
+        Returns:
+            与settings.board_backend对应的棋盘实例
+        """
+        settings = settings or GameSettings()
+        settings.validate()
+        if settings.board_backend == "numpy":
+            # numpy为可选依赖，仅在选用该后端时导入
+            from python.core.NumpyBoard import NumpyBoard
+            return NumpyBoard(settings)
+        return BoardFactory._BACKENDS[settings.board_backend](settings)
@@ -0,0 +1,291 @@
+"""
+游戏逻辑执行器
+把对GameLogic的所有修改排入命令队列，由唯一的执行线程依次执行
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from python.core.Board import Board
+from python.core.GameLogic import GameLogic
+from python.models.GameModels import GameView, Player, Position, SearchResult
+from python.util.Logger import logger
+
+
+class GameActor:
+    """游戏逻辑执行器类（actor模式）
+    
+    GameLogic只由执行线程访问: 界面线程、MCP服务器线程等调用方通过submit或make_move等方法
+    把命令排入队列并立即得到Future（在协程中可以用run等待），命令按提交顺序逐条执行。
+    GameLogic的事件回调（on_move_made等）因此都在执行线程中触发，回调只应做线程安全的轻量操作；
+    回调触发时新视图还没有发布，需要读取新状态的一方应使用on_publish。
+    
+    每条命令执行后，如果棋盘版本或游戏状态有变化，把新的GameView作为一个整体替换到view属性；
+    读取方直接读取view得到一致的快照，不需要加锁，也不会被正在执行的命令阻塞。
+    
+    引擎执棋通过set_engine设置: 轮到引擎时GameLogic把棋盘副本交给执行器之外的引擎线程搜索，
+    结果再作为apply_engine_move命令排入队列，执行线程只落下结果，不会在搜索期间阻塞其他命令。
+    不应通过命令直接调用GameLogic.set_engine（同步搜索会占用执行线程）；
+    传入的GameLogic已经设置了同步引擎时，创建执行器时改为由引擎线程搜索。
+    
+    开启后台思考（ponder，引擎需为EngineWorker）时，后台思考同样只在引擎线程中进行，规则与GameLogic相同:
+    引擎落子后提交预测的应着之后的局面，轮到引擎时局面命中则取用后台搜索的结果，否则作废后重新搜索；
+    开始、重新开始、悔棋和恢复对局时GameLogic通过on_engine_reset通知，引擎线程作废后台思考并清空引擎状态。
+    """
+    
+    def __init__(self, game_logic: GameLogic):
+        """
+        创建执行器并启动执行线程
+        
+        Args:
+            game_logic: 游戏逻辑（之后不应再从其他线程直接访问）
+        """
+        self._game_logic = game_logic
+        self._commands: "queue.Queue[Optional[Tuple[Callable[[GameLogic], Any], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # 发布新视图后在执行线程中调用的回调（如标记界面刷新），参数为(旧视图, 新视图)
+        self.on_publish: Optional[Callable[[GameView, GameView], None]] = None
+        
+        # 统计计数
+        self.commands = 0
+        self.failures = 0
+        
+        # 引擎及其搜索线程（第一次设置引擎时创建）
+        self._engine = None
+        self._engine_executor: Optional[ThreadPoolExecutor] = None
+        
+        # 后台思考的局面 (局面哈希, 步数) 和开始时间（只在引擎线程中访问，没有后台思考时为None）及命中统计
+        self._ponder_key: Optional[Tuple[int, int]] = None
+        self._ponder_start = 0.0
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        # 引擎线程开始本次搜索的时间（没有搜索时为None），供界面显示思考时间
+        self.thinking_since: Optional[float] = None
+        
+        self.view = GameView(game_logic.get_snapshot(), game_logic.get_game_state(), 0)
+        self._thread = threading.Thread(target=self._run, name="GameActor", daemon=True)
+        self._thread.start()
+        logger.info("游戏逻辑执行器已启动")
+        if game_logic.engine is not None:
+            self.set_engine(game_logic.engine, game_logic.engine_player, game_logic.ponder)
+    
+    @property
+    def settings(self):
+        """游戏设置（创建后不变，可以直接读取）"""
+        return self._game_logic.settings
+    
+    def submit(self, command: Callable[[GameLogic], Any]) -> Future:
+        """
+        提交命令
+        
+        Args:
+            command: 在执行线程中以GameLogic为参数调用的函数
+        
+        Returns:
+            命令的Future，结果为command的返回值（抛出的异常同样由Future传递）
+        """
+        future = Future()
+        self._commands.put((command, future))
+        return future
+    
+    async def run(self, command: Callable[[GameLogic], Any]) -> Any:
+        """在协程中提交命令并等待结果（不阻塞事件循环）"""
+        return await asyncio.wrap_future(self.submit(command))
+    
+    def is_owner_thread(self) -> bool:
+        """当前线程是否为执行线程"""
+        return threading.current_thread() is self._thread
+    
+    def close(self):
+        """执行完已提交的命令后停止执行线程和引擎线程（不关闭引擎本身）"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._commands.put(None)
+        if thread is not threading.current_thread():
+            thread.join()
+        if self._engine_executor is not None:
+            self._engine_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def set_engine(self, engine, player: Player = Player.WHITE, ponder: bool = False) -> Future:
+        """
+        设置由引擎执棋的一方，引擎在引擎线程中搜索
+        
+        引擎在同一局的各步之间保留的搜索状态由引擎自行判断是否延续（局面不是上一次搜索的延续时清空），
+        改写历史时由引擎线程调用reset_search_state()清空。
+        
+        Args:
+            engine: 提供search(board)的引擎（如AlphaBetaEngine，或在工作进程中搜索的EngineWorker），
+                为None时取消引擎；被替换的引擎有close()时在其搜索结束后关闭
+            player: 引擎执棋方
+            ponder: 是否在对手思考时后台搜索（引擎没有ponder方法，即不是EngineWorker时忽略）
+        
+        Returns:
+            命令的Future
+        """
+        if self._engine_executor is None:
+            self._engine_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="GameActorEngine")
+        if ponder and engine is not None and not hasattr(engine, "ponder"):
+            logger.warning(f"{type(engine).__name__} 不支持后台思考（需要在EngineWorker中运行），已关闭后台思考")
+            ponder = False
+        previous = self._engine
+        self._engine = engine
+        if previous is not None:
+            self._engine_executor.submit(self._stop_ponder, previous)
+            close = getattr(previous, "close", None)
+            if previous is not engine and close is not None:
+                self._engine_executor.submit(close)
+        if engine is None:
+            return self.submit(lambda logic: logic.set_engine_callback(None, player))
+        # 棋盘版本在提交搜索前读取（搜索期间引擎在副本上推演，副本的版本号会变化）
+        on_engine_turn = lambda board: self._engine_executor.submit(self._search, engine, board, board.version, ponder)
+        on_engine_reset = lambda: self._engine_executor.submit(self._reset_engine, engine)
+        logger.info(f"执行器引擎: {type(engine).__name__}, 后台思考: {ponder}")
+        return self.submit(lambda logic: logic.set_engine_callback(on_engine_turn, player, on_engine_reset))
+    
+    def _search(self, engine, board: Board, version: int, ponder: bool = False):
+        """
+        引擎线程: 搜索棋盘副本并把结果排入队列（提交时的版本version已过期时apply_engine_move忽略结果），
+        之后按需开始后台思考
+        """
+        self.thinking_since = time.perf_counter()
+        try:
+            result = self._take_ponder_result(engine, board)
+            if result is None:
+                result = engine.search(board)
+        except Exception as e:
+            logger.error(f"引擎搜索失败: {e}", exc_info=True)
+            return
+        finally:
+            self.thinking_since = None
+        if result is None:
+            return
+        self.apply_engine_move(result, version)
+        if ponder and result.position is not None:
+            self._start_ponder(engine, board, result)
+    
+    def _start_ponder(self, engine, board: Board, result: SearchResult):
+        """引擎线程: 在落子后的棋盘副本上提交预测的应着之后的局面（没有预测时提交对手当前的局面）"""
+        if board.push(result.position.to_index(board.size)):
+            # 引擎这一手获胜
+            return
+        line = result.principal_variation
+        if len(line) > 1 and board.is_valid_move(line[1].row, line[1].col):
+            if board.push(line[1].to_index(board.size)):
+                # 预测对手直接获胜，没有可思考的局面
+                return
+        self._ponder_key = (board.zobrist_hash, len(board.move_history))
+        self._ponder_start = time.perf_counter()
+        engine.ponder(board, engine.time_limit * GameLogic.PONDER_BUDGET_FACTOR)
+    
+    def _stop_ponder(self, engine):
+        """引擎线程: 作废进行中的后台思考（工作进程恢复思考前的引擎状态）"""
+        if self._ponder_key is None:
+            return
+        self._ponder_key = None
+        engine.cancel()
+    
+    def _take_ponder_result(self, engine, board: Board) -> Optional[SearchResult]:
+        """
+        引擎线程: 轮到引擎时结束后台思考，局面命中时取用后台搜索的结果，否则作废
+        
+        Returns:
+            可以直接使用的结果，否则返回None（需要重新搜索）
+        """
+        key = self._ponder_key
+        if key is None:
+            return None
+        elapsed = time.perf_counter() - self._ponder_start
+        if key != (board.zobrist_hash, len(board.move_history)):
+            self.ponder_misses += 1
+            logger.info(f"后台思考未命中（已思考 {elapsed:.2f} 秒）")
+            self._stop_ponder(engine)
+            return None
+        self._ponder_key = None
+        self.ponder_hits += 1
+        result = engine.finish(max(0.0, engine.time_limit - elapsed))
+        if result is None or result.position is None:
+            return None
+        logger.info(f"后台思考命中: ({result.position.row}, {result.position.col}), 深度 {result.depth}, "
+                    f"已思考 {time.perf_counter() - self._ponder_start:.2f} 秒")
+        return result
+    
+    def _reset_engine(self, engine):
+        """引擎线程: 改写历史后作废后台思考并清空引擎跨步保留的搜索状态"""
+        self._stop_ponder(engine)
+        reset = getattr(engine, "reset_search_state", None)
+        if reset is not None:
+            reset()
+    
+    def _run(self):
+        """执行线程主循环"""
+        logic = self._game_logic
+        while True:
+            item = self._commands.get()
+            if item is None:
+                break
+            command, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            self.commands += 1
+            result, error = None, None
+            try:
+                result = command(logic)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"游戏逻辑命令执行失败: {e}", exc_info=True)
+                error = e
+            # 先发布视图再完成Future，等待命令的一方随后读取view时能看到命令的结果
+            self._publish()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        logger.info("游戏逻辑执行器已停止")
+    
+    def _publish(self):
+        """棋盘或游戏状态有变化时发布新的视图（执行线程中调用）"""
+        view = self.view
+        snapshot = self._game_logic.get_snapshot()
+        game_state = self._game_logic.get_game_state()
+        if snapshot is not view.snapshot or game_state != view.game_state:
+            self.view = GameView(snapshot, game_state, view.revision + 1)
+            if self.on_publish is not None:
+                self.on_publish(view, self.view)
+    
+    def make_move(self, row: int, col: int) -> Future:
+        """落子，结果为是否成功"""
+        return self.submit(lambda logic: logic.make_move(row, col))
+    
+    def undo_move(self) -> Future:
+        """悔棋，结果为是否成功"""
+        return self.submit(lambda logic: logic.undo_move())
+    
+    def start_game(self) -> Future:
+        """开始新游戏"""
+        return self.submit(lambda logic: logic.start_game())
+    
+    def restart_game(self) -> Future:
+        """重新开始游戏"""
+        return self.submit(lambda logic: logic.restart_game())
+    
+    def apply_engine_move(self, result: SearchResult, board_version: Optional[int] = None) -> Future:
+        """落下异步搜索的结果，结果为是否成功（见GameLogic.apply_engine_move）"""
+        return self.submit(lambda logic: logic.apply_engine_move(result, board_version))
+    
+    def get_available_moves(self) -> List[Position]:
+        """获取可用落子位置（从当前视图计算）"""
+        snapshot = self.view.snapshot
+        positions = Position.index_table(snapshot.size)
+        return [positions[cell] for cell, value in enumerate(snapshot.cells) if value == 0]
+    
+    def get_move_history(self) -> Future:
+        """获取落子历史，结果为 [(玩家, 位置), ...]"""
+        return self.submit(lambda logic: list(logic.board.move_history))
+    
+    def get_current_player(self) -> Player:
+        """获取当前玩家（从当前视图读取）"""
+        return self.view.snapshot.current_player
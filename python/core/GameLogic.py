@@ -2,15 +2,36 @@
 游戏逻辑类
 管理游戏流程、状态转换、事件处理等高层逻辑
 """
-from typing import Callable, List, Optional
+import bisect
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from python.core.Board import Board
-from python.models.GameModels import GameResult, GameSettings, GameState, Player, Position
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import BoardSnapshot, GameResult, GameSettings, GameState, Player, Position, SearchResult
 from python.util.Logger import logger
 
 
 class GameLogic:
-    """游戏逻辑管理器"""
+    """游戏逻辑管理器
+    
+    开启后台思考（ponder）时，引擎落子后在引擎的工作进程中继续搜索（引擎需为EngineWorker，
+    不与执行线程争用解释器锁）: 主变例中有预测的对手应着时搜索应着之后的局面，否则搜索对手当前的局面
+    （整棵应着树），时间上限为每步预算的PONDER_BUDGET_FACTOR倍。对手实际落子后，若正好是预测的局面，
+    后台搜索就作为本步的搜索，最多再等到累计满一步的时间；否则作废后台搜索，工作进程恢复思考前
+    引擎的跨步状态后重新搜索。
+    
+    引擎在同一局对局的各步之间保留杀手着法、历史启发、主变例或搜索树等状态，
+    悔棋、重新开始和开始新对局时通过引擎的reset_search_state()清空。
+    每局的引擎搜索统计（含引擎last_reuse中的复用计数）可以通过get_engine_stats()获取。
+    
+    GameLogic记录历史中每一手落子后的棋盘版本，以及最近一次改写历史（开始、悔棋、恢复）后的版本，
+    get_moves_since(version)据此返回某个版本之后新增的落子，供客户端增量同步。
+    引擎在棋盘上搜索时版本号也会增加（push/pop），因此不能用版本差推算落子数。
+    """
+    
+    # 后台思考的时间上限为每步时间预算的倍数，通常在对手落子时被提前停止或取用
+    PONDER_BUDGET_FACTOR = 4.0
     
     def __init__(self, settings: Optional[GameSettings] = None):
         """
@@ -20,9 +41,34 @@ class GameLogic:
             settings: 游戏设置
         """
         self.settings = settings or GameSettings()
-        self.board = Board(self.settings)
+        self.board = BoardFactory.create_board(self.settings)
         self.game_state = GameState.NOT_STARTED
         
+        # 历史中每一手落子后的棋盘版本，以及最近一次改写历史后的棋盘版本（见get_moves_since）
+        self._move_versions: List[int] = []
+        self._base_version = self.board.version
+        
+        # 内置引擎及其执棋方（Player.NONE表示不使用引擎）；引擎由调用方创建，core不依赖engine包
+        self.engine: Optional[Any] = None
+        self.engine_player = Player.NONE
+        self.last_search: Optional[SearchResult] = None
+        # 异步引擎: 设置后轮到引擎执棋方时以棋盘副本调用此回调，由调用方在别处搜索后通过apply_engine_move落子；
+        # 开始、重新开始、悔棋和恢复对局时调用on_engine_reset，由调用方清空引擎状态并作废后台思考
+        self.on_engine_turn: Optional[Callable[[Board], None]] = None
+        self.on_engine_reset: Optional[Callable[[], None]] = None
+        
+        # 后台思考: 引擎需要提供ponder、finish和cancel（如EngineWorker）
+        self.ponder = False
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        # 进行中的后台思考的局面 (局面哈希, 步数) 和开始时间（没有后台思考时为None）
+        self._ponder_key: Optional[Tuple[int, int]] = None
+        self._ponder_start = 0.0
+        
+        # 本局的引擎搜索统计
+        self._engine_stats: Dict[str, float] = {}
+        self._reset_engine_stats()
+        
         # 事件回调
         self.on_state_change: Optional[Callable[[GameState], None]] = None
         self.on_move_made: Optional[Callable[[Player, Position], None]] = None
@@ -33,7 +79,11 @@ class GameLogic:
     
     def start_game(self):
         """开始新游戏"""
+        self._stop_ponder()
+        self._reset_engine_state()
+        self._reset_engine_stats()
         self.board.reset()
+        self._rebase_versions()
         self.game_state = GameState.PLAYING
         
         logger.info("游戏开始")
@@ -42,10 +92,15 @@ class GameLogic:
             self.on_state_change(self.game_state)
         if self.on_force_redraw:
             self.on_force_redraw()
+        self._engine_move_if_needed()
     
     def restart_game(self):
         """重新开始游戏"""
+        self._stop_ponder()
+        self._reset_engine_state()
+        self._reset_engine_stats()
         self.board.reset()
+        self._rebase_versions()
         self.game_state = GameState.PLAYING
         
         logger.info("游戏重新开始")
@@ -54,6 +109,31 @@ class GameLogic:
             self.on_state_change(self.game_state)
         if self.on_force_redraw:
             self.on_force_redraw()
+        self._engine_move_if_needed()
+    
+    def restore_game(self, cells: Sequence[int], game_state: GameState = GameState.PLAYING, version: int = 0):
+        """
+        按落子序列恢复对局（不触发事件回调和引擎），用于还原紧凑保存的对局
+        
+        Args:
+            cells: 按顺序的落子格子索引（黑方先手，双方交替）
+            game_state: 恢复后的游戏状态
+            version: 保存时的棋盘版本，恢复后的版本号从它之后继续，之前发出的版本号不会被重复使用
+        """
+        self._stop_ponder()
+        self._reset_engine_state()
+        self.board.reset()
+        if cells:
+            # 之前的落子都没有结束对局，只需按make_move检查最后一手的胜负（也只记录一条日志）
+            for cell in cells[:-1]:
+                self.board.push(cell)
+            self.board.make_move(*divmod(cells[-1], self.board.size))
+        if game_state in (GameState.BLACK_WIN, GameState.WHITE_WIN) and not self.board.is_game_over:
+            # 以认输结束的对局
+            self.board.resign(Player.WHITE if game_state == GameState.BLACK_WIN else Player.BLACK)
+        self.board.advance_version(version)
+        self._rebase_versions()
+        self.game_state = game_state
     
     def make_move(self, row: int, col: int) -> bool:
         """
@@ -62,7 +142,7 @@ class GameLogic:
         Args:
             row: 行号
             col: 列号
-            
+        
         Returns:
             如果落子成功则返回True
         """
@@ -73,9 +153,11 @@ class GameLogic:
         success = self.board.make_move(row, col)
         
         if success:
+            self._move_versions.append(self.board.version)
+            
             # 通知移动事件
             if self.on_move_made:
-                position = Position(row, col)
+                position = Position.at(row, col)
                 self.on_move_made(self.board.current_player.opposite(), position)
             
             # 检查游戏是否结束
@@ -83,9 +165,190 @@ class GameLogic:
                 self._handle_game_over()
         if self.on_force_redraw:
             self.on_force_redraw()
+        if success:
+            self._engine_move_if_needed()
         
         return success
     
+    def set_engine(self, engine: Optional[Any], player: Player = Player.WHITE, ponder: bool = False):
+        """
+        设置由内置引擎执棋的一方
+        
+        Args:
+            engine: 引擎实例（AlphaBetaEngine、MctsEngine或LazySmpEngine等提供search(board)的对象），为None时取消引擎；
+                被替换的引擎有close()时会被关闭
+            player: 引擎执棋方
+            ponder: 是否在对手思考时后台搜索（引擎没有ponder方法，即不是EngineWorker时忽略）
+        """
+        self._stop_ponder()
+        if self.engine is not None and self.engine is not engine:
+            # 释放被替换引擎的进程池、共享内存等资源
+            close = getattr(self.engine, "close", None)
+            if close is not None:
+                close()
+        if ponder and engine is not None and not hasattr(engine, "ponder"):
+            logger.warning(f"{type(engine).__name__} 不支持后台思考（需要在EngineWorker中运行），已关闭后台思考")
+            ponder = False
+        self.engine = engine
+        self.on_engine_turn = None
+        self.on_engine_reset = None
+        self._reset_engine_state()
+        self.engine_player = player if engine is not None else Player.NONE
+        self.ponder = ponder and engine is not None
+        logger.info(f"引擎执棋方: {self.engine_player.name}, 后台思考: {self.ponder}")
+        self._engine_move_if_needed()
+    
+    def set_engine_callback(self, on_engine_turn: Optional[Callable[[Board], None]], player: Player = Player.WHITE,
+                            on_engine_reset: Optional[Callable[[], None]] = None):
+        """
+        设置由外部异步搜索的引擎执棋方（如在工作进程中搜索，不阻塞调用线程）
+        
+        后台思考同样由调用方负责（见GameActor.set_engine），GameLogic只在改写历史时通过on_engine_reset通知。
+        
+        Args:
+            on_engine_turn: 轮到引擎执棋方时以棋盘副本调用的回调，为None时取消引擎
+            player: 引擎执棋方
+            on_engine_reset: 开始、重新开始、悔棋和恢复对局时调用的回调（可选）
+        """
+        self._stop_ponder()
+        self.engine = None
+        self.ponder = False
+        self.on_engine_turn = on_engine_turn
+        self.on_engine_reset = on_engine_reset if on_engine_turn is not None else None
+        self.engine_player = player if on_engine_turn is not None else Player.NONE
+        logger.info(f"异步引擎执棋方: {self.engine_player.name}")
+        self._engine_move_if_needed()
+    
+    def apply_engine_move(self, result: SearchResult, board_version: Optional[int] = None) -> bool:
+        """
+        落下异步搜索的结果
+        
+        Args:
+            result: 搜索结果
+            board_version: 提交搜索时的棋盘版本，给出时棋盘已被修改则忽略结果
+        
+        Returns:
+            如果落子成功则返回True；棋盘已变化、已不是引擎执棋方的回合或没有着法时忽略并返回False
+        """
+        if (self.game_state != GameState.PLAYING or self.board.current_player != self.engine_player
+                or result.position is None or board_version is not None and board_version != self.board.version):
+            return False
+        self._record_engine_search(result)
+        self.last_search = result
+        return self.make_move(result.position.row, result.position.col)
+    
+    def _engine_move_if_needed(self):
+        """轮到引擎执棋方时由引擎搜索并落子，之后按需开始后台思考"""
+        if (self.engine_player == Player.NONE or self.game_state != GameState.PLAYING
+                or self.board.current_player != self.engine_player):
+            return
+        if self.on_engine_turn is not None:
+            # 异步引擎: 提交局面后立即返回
+            self.on_engine_turn(self.board.clone())
+            return
+        result = self._take_ponder_result()
+        if result is None:
+            result = self.engine.search(self.board)
+        if result is None:
+            logger.error("引擎搜索失败，没有落子")
+            return
+        # 直接使用后台思考结果时，引擎的last_reuse就是那次后台搜索的统计
+        self._record_engine_search(result)
+        self.last_search = result
+        if result.position is not None:
+            self.make_move(result.position.row, result.position.col)
+            self._start_ponder(result)
+    
+    def _reset_engine_state(self):
+        """清空引擎跨步保留的搜索状态（异步引擎调用on_engine_reset，引擎没有reset_search_state时忽略）"""
+        if self.on_engine_reset is not None:
+            self.on_engine_reset()
+            return
+        reset = getattr(self.engine, "reset_search_state", None)
+        if reset is not None:
+            reset()
+    
+    def _reset_engine_stats(self):
+        """清空本局的引擎搜索统计"""
+        self._engine_stats = {"searches": 0, "reused_searches": 0, "nodes": 0, "time": 0.0}
+    
+    def _record_engine_search(self, result: SearchResult):
+        """把一次引擎搜索计入本局统计，并累加引擎last_reuse中的复用计数"""
+        stats = self._engine_stats
+        reuse = getattr(self.engine, "last_reuse", None) or {}
+        stats["searches"] += 1
+        stats["reused_searches"] += 1 if reuse.get("reused") else 0
+        stats["nodes"] += result.nodes
+        stats["time"] += result.elapsed
+        for name, value in reuse.items():
+            if name != "reused":
+                stats[name] = stats.get(name, 0) + value
+    
+    def get_engine_stats(self) -> Dict[str, float]:
+        """
+        获取本局的引擎搜索统计
+        
+        Returns:
+            searches（搜索次数）、reused_searches（使用了上一步保留状态的次数）、nodes、time，
+            以及按引擎累加的复用计数: AlphaBetaEngine为pv_moves、cutoffs和reused_cutoffs
+            （由保留的杀手着法、历史启发或应着产生的剪枝），MctsEngine为reused_visits；
+            另有reused_cutoff_rate或reused_visit_rate（复用部分所占比例）
+        """
+        stats = dict(self._engine_stats)
+        if stats.get("cutoffs"):
+            stats["reused_cutoff_rate"] = stats["reused_cutoffs"] / stats["cutoffs"]
+        if "reused_visits" in stats:
+            visits = stats["reused_visits"] + stats["nodes"]
+            stats["reused_visit_rate"] = stats["reused_visits"] / visits if visits else 0.0
+        return stats
+    
+    def _start_ponder(self, result: SearchResult):
+        """引擎落子后在工作进程中搜索预测的应着之后的局面（没有预测时搜索对手当前的局面）"""
+        if not self.ponder or self.game_state != GameState.PLAYING:
+            return
+        board = self.board.clone()
+        line = result.principal_variation
+        if len(line) > 1 and board.is_valid_move(line[1].row, line[1].col):
+            if board.push(line[1].to_index(board.size)):
+                # 预测对手直接获胜，没有可思考的局面
+                return
+        self._ponder_key = (board.zobrist_hash, len(board.move_history))
+        self._ponder_start = time.perf_counter()
+        self.engine.ponder(board, self.engine.time_limit * self.PONDER_BUDGET_FACTOR)
+    
+    def _stop_ponder(self):
+        """作废进行中的后台思考（工作进程恢复思考前的引擎状态）"""
+        if self._ponder_key is None:
+            return
+        self._ponder_key = None
+        self.engine.cancel()
+    
+    def _take_ponder_result(self) -> Optional[SearchResult]:
+        """
+        结束后台思考: 对手走出了预测的局面时取用后台搜索的结果，否则作废后台搜索
+        
+        Returns:
+            可以直接使用的结果，否则返回None（需要重新搜索）
+        """
+        key = self._ponder_key
+        if key is None:
+            return None
+        elapsed = time.perf_counter() - self._ponder_start
+        if key != (self.board.zobrist_hash, len(self.board.move_history)):
+            self.ponder_misses += 1
+            logger.info(f"后台思考未命中（已思考 {elapsed:.2f} 秒）")
+            self._stop_ponder()
+            return None
+        self._ponder_key = None
+        self.ponder_hits += 1
+        # 后台搜索就是本步的搜索: 累计思考满一步的时间（或提前结束）后取用
+        result = self.engine.finish(max(0.0, self.engine.time_limit - elapsed))
+        if result is None or result.position is None:
+            return None
+        logger.info(f"后台思考命中: ({result.position.row}, {result.position.col}), 深度 {result.depth}, "
+                    f"已思考 {time.perf_counter() - self._ponder_start:.2f} 秒")
+        return result
+    
     def _handle_game_over(self):
         """处理游戏结束"""
         game_result = self.board.get_game_result()
@@ -124,9 +387,17 @@ class GameLogic:
             logger.warning(f"游戏状态为 {self.game_state.value}，不能悔棋")
             return False
         
+        self._stop_ponder()
         success = self.board.undo_move()
+        # 与引擎对弈时连同引擎的一手一起撤销，回到人类玩家的回合；
+        # 引擎执黑且撤销的是它的第一手时没有更早的落子可撤销，仍轮到引擎，由下面重新搜索
+        if success and self.engine_player != Player.NONE and self.board.current_player == self.engine_player:
+            self.board.undo_move()
         
         if success:
+            self._rebase_versions()
+            # 引擎保留的启发信息和搜索树属于被撤销的局面
+            self._reset_engine_state()
             # 游戏状态恢复为进行中
             self.game_state = GameState.PLAYING
             
@@ -137,9 +408,62 @@ class GameLogic:
                 self.on_state_change(self.game_state)
         if self.on_force_redraw:
             self.on_force_redraw()
+        if success:
+            self._engine_move_if_needed()
         
         return success
     
+    def resign(self, player: Player) -> bool:
+        """
+        认输，对手获胜
+        
+        Args:
+            player: 认输的一方
+        
+        Returns:
+            如果认输成功则返回True
+        """
+        if self.game_state != GameState.PLAYING or player == Player.NONE:
+            logger.warning(f"游戏状态为 {self.game_state.value}，不能认输")
+            return False
+        
+        self._stop_ponder()
+        # 棋盘记录胜方并推进版本号，快照与按版本增量同步的客户端由此得知对局结束
+        self.board.resign(player)
+        self.game_state = GameState.BLACK_WIN if self.board.winner == Player.BLACK else GameState.WHITE_WIN
+        
+        logger.info(f"{player.name} 认输，游戏结束: {self.game_state.value}")
+        
+        if self.on_state_change:
+            self.on_state_change(self.game_state)
+        if self.on_game_over:
+            self.on_game_over(self.board.get_game_result())
+        if self.on_force_redraw:
+            self.on_force_redraw()
+        
+        return True
+    
+    def _rebase_versions(self):
+        """改写历史（重置、悔棋、恢复）后调用: 之前版本的客户端需要重新获取完整状态"""
+        self._base_version = self.board.version
+        del self._move_versions[len(self.board.move_history):]
+        self._move_versions.extend([self._base_version] * (len(self.board.move_history) - len(self._move_versions)))
+    
+    def get_moves_since(self, version: int) -> Optional[List[Tuple[Player, Position]]]:
+        """
+        获取某个棋盘版本之后新增的落子
+        
+        Args:
+            version: 客户端已知的棋盘版本
+        
+        Returns:
+            按顺序的 [(玩家, 位置), ...]，没有新落子时为空列表；
+            该版本早于最近一次改写历史（开始、悔棋、恢复）或晚于当前版本时返回None，此时需要完整状态
+        """
+        if version < self._base_version or version > self.board.version:
+            return None
+        return self.board.move_history[bisect.bisect_right(self._move_versions, version):]
+    
     def get_current_player(self) -> Player:
         """获取当前玩家"""
         return self.board.current_player
@@ -152,6 +476,10 @@ class GameLogic:
         """获取棋盘状态"""
         return self.board.get_board_state()
     
+    def get_snapshot(self) -> BoardSnapshot:
+        """获取棋盘只读快照（版本不变时共享同一对象）"""
+        return self.board.get_snapshot()
+    
     def get_available_moves(self) -> List[Position]:
         """获取可用落子位置"""
         return self.board.get_available_moves()
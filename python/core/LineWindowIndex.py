@@ -0,0 +1,92 @@
+"""
+连线窗口索引
+预先枚举棋盘上所有长度为win_count的连线窗口，以及每个格子被哪些窗口覆盖
+"""
+from typing import Dict, List, Tuple
+
+
+class LineWindowIndex:
+    """连线窗口索引类
+    
+    窗口是沿某一方向连续的win_count个格子，格子索引为 row * board_size + col。
+    同一(board_size, win_count)的索引只构建一次，由所有棋盘共享，构建后只读。
+    """
+    
+    # 四个方向: 水平、垂直、左上到右下、右上到左下
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+    
+    # 按(board_size, win_count)缓存的实例
+    _instances: Dict[Tuple[int, int], "LineWindowIndex"] = {}
+    
+    def __init__(self, board_size: int, win_count: int):
+        """
+        构建连线窗口索引
+        
+        Args:
+            board_size: 棋盘大小
+            win_count: 获胜连子数
+        """
+        self.board_size = board_size
+        self.win_count = win_count
+        cell_count = board_size * board_size
+        
+        # 每个窗口包含的格子（按方向顺序排列）
+        self.window_cells: List[Tuple[int, ...]] = []
+        # 每个窗口所在的方向下标
+        self.window_direction: List[int] = []
+        # window_at[direction][cell]: 以该格子为起点、沿该方向的窗口编号，不存在则为-1
+        self.window_at: List[List[int]] = [[-1] * cell_count for _ in self.DIRECTIONS]
+        
+        for direction, (dr, dc) in enumerate(self.DIRECTIONS):
+            for row in range(board_size):
+                for col in range(board_size):
+                    end_row = row + dr * (win_count - 1)
+                    end_col = col + dc * (win_count - 1)
+                    if not (0 <= end_row < board_size and 0 <= end_col < board_size):
+                        continue
+                    cells = tuple((row + dr * i) * board_size + col + dc * i for i in range(win_count))
+                    self.window_at[direction][row * board_size + col] = len(self.window_cells)
+                    self.window_cells.append(cells)
+                    self.window_direction.append(direction)
+        
+        # 沿同一方向后移一格的相邻窗口编号，不存在则为-1
+        self.next_window: List[int] = []
+        for window, cells in enumerate(self.window_cells):
+            dr, dc = self.DIRECTIONS[self.window_direction[window]]
+            row, col = divmod(cells[0], board_size)
+            next_row, next_col = row + dr, col + dc
+            if 0 <= next_row < board_size and 0 <= next_col < board_size:
+                self.next_window.append(self.window_at[self.window_direction[window]][next_row * board_size + next_col])
+            else:
+                self.next_window.append(-1)
+        
+        # 每个格子被哪些窗口覆盖
+        cell_windows: List[List[int]] = [[] for _ in range(cell_count)]
+        for window, cells in enumerate(self.window_cells):
+            for cell in cells:
+                cell_windows[cell].append(window)
+        self.cell_windows: List[Tuple[int, ...]] = [tuple(windows) for windows in cell_windows]
+    
+    @classmethod
+    def for_size(cls, board_size: int, win_count: int) -> "LineWindowIndex":
+        """
+        获取共享的连线窗口索引
+        
+        Args:
+            board_size: 棋盘大小
+            win_count: 获胜连子数
+        
+        Returns:
+            LineWindowIndex实例
+        """
+        key = (board_size, win_count)
+        index = cls._instances.get(key)
+        if index is None:
+            index = cls(board_size, win_count)
+            cls._instances[key] = index
+        return index
+    
+    @property
+    def window_count(self) -> int:
+        """窗口总数"""
+        return len(self.window_cells)
@@ -0,0 +1,301 @@
+"""
+NumPy棋盘类
+使用int8数组存储棋盘，提供整盘向量化的连子统计、连线查找和威胁图
+"""
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from python.core.Board import Board
+from python.core.LineWindowIndex import LineWindowIndex
+from python.models.GameModels import GameSettings, Player
+
+
+class NumpyBoard(Board):
+    """NumPy棋盘类
+    
+    棋盘状态保存在形状为(size, size)的int8数组中，取值为Player.value。
+    每次落子和悔棋同样维护基类的哈希、空位和窗口计数，因此与其他后端行为完全一致；
+    整盘分析方法直接在数组上做切片运算，不逐格转换Player。
+    """
+    
+    # 按value排列的玩家枚举
+    _PLAYERS = tuple(Player)
+    
+    def _init_storage(self):
+        """初始化int8数组存储"""
+        self._array = np.zeros((self.size, self.size), dtype=np.int8)
+    
+    def _read_cell(self, row: int, col: int) -> Player:
+        """读取指定位置的棋子（不做边界检查）"""
+        return self._PLAYERS[self._array.item(row, col)]
+    
+    def _write_cell(self, row: int, col: int, player: Player):
+        """写入指定位置的棋子（不做边界检查）"""
+        self._array[row, col] = player.value
+    
+    def _cells_bytes(self) -> bytes:
+        """按行优先顺序导出每个格子的player.value"""
+        return self._array.tobytes()
+    
+    def get_board_state(self) -> List[List[Player]]:
+        """
+        获取当前棋盘状态
+        
+        Returns:
+            棋盘状态的深拷贝
+        """
+        players = self._PLAYERS
+        return [[players[value] for value in row] for row in self._array.tolist()]
+    
+    # ---------- 与其他格式互转 ----------
+    
+    @staticmethod
+    def state_to_array(board_state: Sequence[Sequence[Player]]) -> np.ndarray:
+        """
+        将get_board_state格式的二维Player列表转换为int8数组
+        
+        Args:
+            board_state: 棋盘状态
+        
+        Returns:
+            形状为(size, size)的int8数组
+        """
+        return np.array([[player.value for player in row] for row in board_state], dtype=np.int8)
+    
+    @staticmethod
+    def array_to_state(array: np.ndarray) -> List[List[Player]]:
+        """
+        将int8数组转换为get_board_state格式
+        
+        Args:
+            array: 形状为(size, size)的数组
+        
+        Returns:
+            二维Player列表
+        """
+        players = NumpyBoard._PLAYERS
+        return [[players[value] for value in row] for row in np.asarray(array).tolist()]
+    
+    @classmethod
+    def from_array(cls, array: np.ndarray, settings: Optional[GameSettings] = None) -> "NumpyBoard":
+        """
+        从数组构造棋盘
+        
+        落子历史按行优先顺序重建，当前玩家由双方棋子数推断（黑方先行）。
+        
+        Args:
+            array: 形状为(size, size)、取值为Player.value的数组
+            settings: 游戏设置，board_size会被数组大小覆盖
+        
+        Returns:
+            NumpyBoard实例
+        """
+        array = np.asarray(array, dtype=np.int8)
+        settings = replace(settings or GameSettings(), board_size=array.shape[0], board_backend="numpy")
+        board = cls(settings)
+        for cell in np.flatnonzero(array).tolist():
+            row, col = divmod(cell, board.size)
+            player = cls._PLAYERS[array.item(row, col)]
+            board._place(row, col, player)
+            board.move_history.push(cell, player)
+        black = int(np.count_nonzero(array == Player.BLACK.value))
+        white = int(np.count_nonzero(array == Player.WHITE.value))
+        board.current_player = Player.BLACK if black <= white else Player.WHITE
+        board._seq += 2
+        return board
+    
+    # ---------- 零拷贝导出 ----------
+    
+    def as_array(self) -> np.ndarray:
+        """
+        获取棋盘数组的只读视图（零拷贝，随棋盘变化）
+        
+        Returns:
+            只读的int8数组视图
+        """
+        view = self._array.view()
+        view.flags.writeable = False
+        return view
+    
+    def __array__(self, dtype=None, copy=None):
+        """支持np.asarray(board)，返回只读视图"""
+        view = self.as_array()
+        if dtype is not None and np.dtype(dtype) != view.dtype:
+            return view.astype(dtype)
+        return view
+    
+    def __buffer__(self, flags: int) -> memoryview:
+        """缓冲区协议（Python 3.12+），导出只读的int8内存"""
+        return memoryview(self.as_array())
+    
+    def to_memoryview(self) -> memoryview:
+        """导出只读memoryview（适用于不支持__buffer__的Python版本）"""
+        return memoryview(self.as_array())
+    
+    # ---------- 向量化分析 ----------
+    
+    def _window_slices(self, direction: int, length: int, offset: int) -> Tuple[slice, slice]:
+        """
+        获取沿某方向、长度为length的所有窗口中第offset个格子构成的切片
+        
+        对所有合法起点(r, c)，返回的切片使得 array[slices][r', c'] 为窗口(r, c)的第offset个格子，
+        其中(r', c')为起点在起点网格中的下标。
+        
+        Args:
+            direction: 方向下标（与LineWindowIndex.DIRECTIONS一致）
+            length: 窗口长度
+            offset: 窗口内偏移 (0 <= offset < length)
+        
+        Returns:
+            (行切片, 列切片)
+        """
+        dr, dc = LineWindowIndex.DIRECTIONS[direction]
+        span = length - 1
+        rows = self.size - dr * span
+        cols = self.size - abs(dc) * span
+        first_col = span if dc < 0 else 0
+        row_start = dr * offset
+        col_start = first_col + dc * offset
+        return slice(row_start, row_start + rows), slice(col_start, col_start + cols)
+    
+    def _window_sums(self, mask: np.ndarray, direction: int, length: int) -> np.ndarray:
+        """计算每个窗口内mask为真的格子数，形状为起点网格"""
+        total = None
+        for offset in range(length):
+            part = mask[self._window_slices(direction, length, offset)].astype(np.int16)
+            total = part if total is None else total + part
+        return total
+    
+    def find_lines(self, player: Player, length: Optional[int] = None) -> np.ndarray:
+        """
+        查找所有由指定玩家连续length个棋子组成的连线
+        
+        Args:
+            player: 玩家
+            length: 连线长度，默认为获胜连子数
+        
+        Returns:
+            形状为(n, 3)的数组，每行为(方向下标, 起点行, 起点列)
+        """
+        length = length or self.win_count
+        mask = self._array == player.value
+        found = []
+        for direction in range(len(LineWindowIndex.DIRECTIONS)):
+            if length > self.size:
+                break
+            full = self._window_sums(mask, direction, length) == length
+            starts = np.argwhere(full)
+            if starts.size:
+                row_slice, col_slice = self._window_slices(direction, length, 0)
+                starts[:, 0] += row_slice.start
+                starts[:, 1] += col_slice.start
+                found.append(np.column_stack((np.full(len(starts), direction), starts)))
+        if not found:
+            return np.empty((0, 3), dtype=np.intp)
+        return np.concatenate(found)
+    
+    def run_lengths(self, player: Player) -> np.ndarray:
+        """
+        计算每个格子在四个方向上所在连续棋子的长度
+        
+        Args:
+            player: 玩家
+        
+        Returns:
+            形状为(4, size, size)的int8数组，非该玩家棋子的格子为0
+        """
+        mask = self._array == player.value
+        result = np.zeros((len(LineWindowIndex.DIRECTIONS), self.size, self.size), dtype=np.int8)
+        for direction, (dr, dc) in enumerate(LineWindowIndex.DIRECTIONS):
+            forward = self._directional_run(mask, dr, dc)
+            backward = self._directional_run(mask, -dr, -dc)
+            result[direction] = np.where(mask, forward + backward - 1, 0)
+        return result
+    
+    def _directional_run(self, mask: np.ndarray, dr: int, dc: int) -> np.ndarray:
+        """从每个格子出发沿(dr, dc)连续为真的格子数（含自身）"""
+        run = mask.astype(np.int8)
+        current = mask.copy()
+        for step in range(1, self.size):
+            shifted = np.zeros_like(mask)
+            src_rows, dst_rows = self._shift_slices(dr * step)
+            src_cols, dst_cols = self._shift_slices(dc * step)
+            shifted[dst_rows, dst_cols] = mask[src_rows, src_cols]
+            current &= shifted
+            if not current.any():
+                break
+            run += current
+        return run
+    
+    def _shift_slices(self, delta: int) -> Tuple[slice, slice]:
+        """返回(源切片, 目标切片)，使 target[目标] = source[源] 等价于 target[i] = source[i + delta]"""
+        if delta >= 0:
+            return slice(delta, self.size), slice(0, self.size - delta)
+        return slice(0, self.size + delta), slice(-delta, self.size)
+    
+    def run_histogram(self, player: Player) -> np.ndarray:
+        """
+        统计各方向上每种长度的极大连续棋子段数量
+        
+        Args:
+            player: 玩家
+        
+        Returns:
+            形状为(4, size + 1)的数组，[direction, length]为该方向长度为length的连续段数
+        """
+        runs = self.run_lengths(player)
+        mask = self._array == player.value
+        histogram = np.zeros((len(LineWindowIndex.DIRECTIONS), self.size + 1), dtype=np.intp)
+        for direction, (dr, dc) in enumerate(LineWindowIndex.DIRECTIONS):
+            # 连续段的起点: 自身是棋子且反方向前一格不是
+            previous = np.zeros_like(mask)
+            src_rows, dst_rows = self._shift_slices(-dr)
+            src_cols, dst_cols = self._shift_slices(-dc)
+            previous[dst_rows, dst_cols] = mask[src_rows, src_cols]
+            starts = mask & ~previous
+            histogram[direction] = np.bincount(runs[direction][starts], minlength=self.size + 1)
+        return histogram
+    
+    def threat_map(self, player: Player, min_stones: Optional[int] = None) -> np.ndarray:
+        """
+        计算威胁图: 每个空位被多少个"只含己方棋子且至少min_stones子"的获胜窗口覆盖
+        
+        min_stones默认为win_count-1，此时非零的格子正是下一手即可获胜的位置。
+        
+        Args:
+            player: 玩家
+            min_stones: 窗口内己方棋子数下限
+        
+        Returns:
+            形状为(size, size)的int16数组，已有棋子的格子为0
+        """
+        min_stones = self.win_count - 1 if min_stones is None else min_stones
+        own = self._array == player.value
+        opponent = self._array == player.opposite().value
+        threats = np.zeros((self.size, self.size), dtype=np.int16)
+        for direction in range(len(LineWindowIndex.DIRECTIONS)):
+            own_sums = self._window_sums(own, direction, self.win_count)
+            opponent_sums = self._window_sums(opponent, direction, self.win_count)
+            live = ((opponent_sums == 0) & (own_sums >= min_stones)).astype(np.int16)
+            for offset in range(self.win_count):
+                threats[self._window_slices(direction, self.win_count, offset)] += live
+        threats[self._array != Player.NONE.value] = 0
+        return threats
+    
+    def analyze(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        一次调用得到双方的连线、连子直方图和威胁图
+        
+        Returns:
+            {玩家名: {"lines": ..., "run_histogram": ..., "threat_map": ...}}
+        """
+        return {
+            player.name: {
+                "lines": self.find_lines(player),
+                "run_histogram": self.run_histogram(player),
+                "threat_map": self.threat_map(player),
+            }
+            for player in (Player.BLACK, Player.WHITE)
+        }
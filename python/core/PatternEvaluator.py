@@ -0,0 +1,218 @@
+"""
+增量棋型评估器
+维护每个(方向, 格子)线段的棋型key和双方的静态评估分，随落子和悔棋增量更新
+"""
+from typing import Dict, List, Optional, Tuple
+
+from python.core.LineWindowIndex import LineWindowIndex
+from python.core.PatternTable import PatternTable
+from python.models.GameModels import PatternShape, Player
+
+
+class PatternEvaluator:
+    """增量棋型评估器类
+    
+    每个格子在四个方向上各有一条线段，keys[player.value][direction * cell_count + cell]
+    是从该玩家视角编码的线段key（见PatternTable）。落子时只有同一条线上半径win_count-1
+    以内的线段会变化，因此每手只需更新4 * (2 * win_count - 1)个key。
+    
+    玩家的总分是其每个棋子在每个方向上的棋型分值之和；一个棋型中的每个棋子都会计分一次。
+    """
+    
+    # 按(棋盘大小, 获胜连子数)缓存的初始key和影响列表，同规格的评估器共享
+    _layouts: Dict[Tuple[int, int], Tuple[List[int], List[List[Tuple[int, int, int]]]]] = {}
+    
+    def __init__(self, board_size: int, win_count: int):
+        """
+        初始化评估器
+        
+        Args:
+            board_size: 棋盘大小
+            win_count: 获胜连子数
+        """
+        self.size = board_size
+        self.win_count = win_count
+        self.table = PatternTable.for_win_count(win_count)
+        self.cell_count = board_size * board_size
+        
+        layout = self._layouts.get((board_size, win_count))
+        if layout is None:
+            layout = self._build_layout(board_size, self.table)
+            self._layouts[(board_size, win_count)] = layout
+        # 空棋盘上每条线段的key，以及influence[cell]: 在cell落子会改变的(线段编号, 线段中心格, 位权)
+        self._initial_keys, self._influence = layout
+        
+        self._center_power = self.table.powers[self.table.radius]
+        self.reset()
+    
+    @staticmethod
+    def _build_layout(board_size: int, table: PatternTable) -> Tuple[List[int], List[List[Tuple[int, int, int]]]]:
+        """生成空棋盘的线段key（只有棋盘外的格子为BLOCKED）和每个格子的影响列表"""
+        radius = table.radius
+        cell_count = board_size * board_size
+        initial_keys = [0] * (len(LineWindowIndex.DIRECTIONS) * cell_count)
+        influence: List[List[Tuple[int, int, int]]] = [[] for _ in range(cell_count)]
+        for direction, (dr, dc) in enumerate(LineWindowIndex.DIRECTIONS):
+            for row in range(board_size):
+                for col in range(board_size):
+                    cell = row * board_size + col
+                    slot = direction * cell_count + cell
+                    key = 0
+                    for offset in range(-radius, radius + 1):
+                        r, c = row + dr * offset, col + dc * offset
+                        power = table.powers[offset + radius]
+                        if 0 <= r < board_size and 0 <= c < board_size:
+                            influence[r * board_size + c].append((slot, cell, power))
+                        else:
+                            key += PatternTable.BLOCKED * power
+                    initial_keys[slot] = key
+        return initial_keys, influence
+    
+    def reset(self):
+        """清空为空棋盘"""
+        # 按player.value索引的线段key和总分
+        self.keys: List[Optional[List[int]]] = [None, list(self._initial_keys), list(self._initial_keys)]
+        self._totals = [0, 0, 0]
+        # 每个格子的player.value
+        self._stones = bytearray(self.cell_count)
+    
+    def rebuild(self, cells: bytes):
+        """
+        从按行优先排列的player.value重建全部状态
+        
+        Args:
+            cells: 长度为size * size的字节串（如Board._cells_bytes()）
+        """
+        self.reset()
+        for cell, value in enumerate(cells):
+            if value:
+                self.on_place(cell, value)
+    
+    def on_place(self, cell: int, value: int):
+        """
+        落子后增量更新
+        
+        Args:
+            cell: 格子索引
+            value: 落子玩家的player.value
+        """
+        stones = self._stones
+        totals = self._totals
+        scores = self.table.scores
+        own_keys = self.keys[value]
+        opponent_keys = self.keys[3 - value]
+        stones[cell] = value
+        for slot, center, power in self._influence[cell]:
+            owner = stones[center]
+            if owner == value:
+                # center == cell时线段原本以空位为中心，没有计分
+                old = scores[own_keys[slot]] if center != cell else 0
+                own_keys[slot] += power
+                totals[value] += scores[own_keys[slot]] - old
+                opponent_keys[slot] += 2 * power
+            elif owner:
+                old = scores[opponent_keys[slot]]
+                opponent_keys[slot] += 2 * power
+                totals[owner] += scores[opponent_keys[slot]] - old
+                own_keys[slot] += power
+            else:
+                own_keys[slot] += power
+                opponent_keys[slot] += 2 * power
+    
+    def on_remove(self, cell: int, value: int):
+        """
+        悔棋后增量更新
+        
+        Args:
+            cell: 格子索引
+            value: 被移除棋子的player.value
+        """
+        stones = self._stones
+        totals = self._totals
+        scores = self.table.scores
+        own_keys = self.keys[value]
+        opponent_keys = self.keys[3 - value]
+        for slot, center, power in self._influence[cell]:
+            owner = stones[center]
+            if owner == value:
+                old = scores[own_keys[slot]]
+                own_keys[slot] -= power
+                # center == cell时移除后该线段以空位为中心，不再计分
+                totals[value] += (scores[own_keys[slot]] if center != cell else 0) - old
+                opponent_keys[slot] -= 2 * power
+            elif owner:
+                old = scores[opponent_keys[slot]]
+                opponent_keys[slot] -= 2 * power
+                totals[owner] += scores[opponent_keys[slot]] - old
+                own_keys[slot] -= power
+            else:
+                own_keys[slot] -= power
+                opponent_keys[slot] -= 2 * power
+        stones[cell] = 0
+    
+    def score(self, player: Player) -> int:
+        """获取指定玩家的总分"""
+        return self._totals[player.value]
+    
+    def evaluate(self, player: Player) -> int:
+        """
+        从指定玩家视角的静态评估
+        
+        Returns:
+            己方总分减去对方总分
+        """
+        value = player.value
+        return self._totals[value] - self._totals[3 - value]
+    
+    def shapes_at(self, cell: int, player: Player) -> Tuple[PatternShape, ...]:
+        """
+        获取某个棋子在四个方向上的棋型
+        
+        Args:
+            cell: 格子索引
+            player: 玩家（该格不是此玩家的棋子时均为NONE）
+        
+        Returns:
+            按LineWindowIndex.DIRECTIONS排列的棋型
+        """
+        keys = self.keys[player.value]
+        shapes = self.table.shapes
+        return tuple(PatternShape(shapes[keys[direction * self.cell_count + cell]])
+                     for direction in range(len(LineWindowIndex.DIRECTIONS)))
+    
+    def move_shapes(self, cell: int, player: Player) -> Tuple[PatternShape, ...]:
+        """
+        获取在空位落子后四个方向上形成的棋型（不修改状态）
+        
+        Args:
+            cell: 空位的格子索引
+            player: 落子玩家
+        
+        Returns:
+            按LineWindowIndex.DIRECTIONS排列的棋型
+        """
+        keys = self.keys[player.value]
+        shapes = self.table.shapes
+        center_power = self._center_power
+        return tuple(PatternShape(shapes[keys[direction * self.cell_count + cell] + center_power])
+                     for direction in range(len(LineWindowIndex.DIRECTIONS)))
+    
+    def move_score(self, cell: int, player: Player) -> int:
+        """
+        在空位落子后四个方向上形成的棋型分值之和（用于着法排序）
+        
+        Args:
+            cell: 空位的格子索引
+            player: 落子玩家
+        
+        Returns:
+            棋型分值之和
+        """
+        keys = self.keys[player.value]
+        scores = self.table.scores
+        center_power = self._center_power
+        cell_count = self.cell_count
+        return (scores[keys[cell] + center_power] +
+                scores[keys[cell_count + cell] + center_power] +
+                scores[keys[2 * cell_count + cell] + center_power] +
+                scores[keys[3 * cell_count + cell] + center_power])
@@ -0,0 +1,265 @@
+"""
+棋型查找表
+把某个棋子在一条线上的邻域编码为三进制整数，并通过预先生成的查找表直接得到棋型和分值
+"""
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from python.models.GameModels import PatternShape
+from python.util.Logger import logger
+
+
+class PatternTable:
+    """棋型查找表类
+    
+    线段以中心格为中点、半径为win_count-1，共2*win_count-1格；所有长度为win_count且
+    落在线段内的窗口都包含中心格。线段上第i格（从负方向一端数起）贡献 digit * 3**i，
+    digit取值: 0为空位，1为己方棋子，2为对方棋子或棋盘外。
+    
+    棋型按"再下一手能形成什么"递归定义:
+    成五为存在全是己方棋子的窗口；有两个及以上成五点为活四，恰有一个为冲四；
+    再下一手可成活四为活三，可成冲四为眠三；可成活三为活二，可成眠三为眠二。
+    中心格不是己方棋子时棋型为NONE。
+    
+    完整的表有3**(2*win_count-1)项，超过MAX_TABLE_KEYS（win_count大于6）时不再预先生成，
+    shapes和scores改为按key即时判断并缓存的查找对象（_OnDemandLookup），下标访问方式不变。
+    """
+    
+    class _OnDemandLookup:
+        """按需计算并缓存的查找表: lookup[key]为棋型值（values为None时）或values[棋型值]"""
+        
+        def __init__(self, table: "PatternTable", values: Optional[Sequence[int]] = None):
+            self._table = table
+            self._values = values
+            self._cache: Dict[int, int] = {}
+        
+        def __len__(self) -> int:
+            return self._table.key_count
+        
+        def __getitem__(self, key: int) -> int:
+            value = self._cache.get(key)
+            if value is None:
+                value = self._table._classify_key(key)
+                if self._values is not None:
+                    value = self._values[value]
+                self._cache[key] = value
+            return value
+    
+    EMPTY = 0
+    OWN = 1
+    BLOCKED = 2
+    
+    # 每种棋型的分值，按PatternShape索引
+    SCORES = (0, 10, 100, 100, 1000, 1000, 10000, 100000)
+    
+    # 预先生成完整表的最大项数（win_count=6时为3**11），更大的表按需计算
+    MAX_TABLE_KEYS = 3 ** 11
+    
+    # 磁盘缓存格式版本，修改生成规则时需要递增
+    FORMAT_VERSION = 1
+    
+    # 磁盘缓存目录（项目根目录下的.cache/patterns）
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             ".cache", "patterns")
+    
+    # 按获胜连子数缓存的实例
+    _instances: Dict[int, "PatternTable"] = {}
+    
+    def __init__(self, win_count: int, shapes: Optional[bytes] = None):
+        """
+        初始化查找表
+        
+        Args:
+            win_count: 获胜连子数
+            shapes: 已生成的棋型表，为None时重新生成（完整表过大时改为按需计算）
+        """
+        self.win_count = win_count
+        self.radius = win_count - 1
+        self.length = 2 * win_count - 1
+        self.center = self.radius
+        self.powers = tuple(3 ** i for i in range(self.length))
+        self.key_count = 3 ** self.length
+        
+        # 成五窗口的位掩码（都包含中心格）
+        self._windows = [((1 << win_count) - 1) << start for start in range(win_count)]
+        
+        # shapes[key]为PatternShape的值，scores[key]为对应分值
+        self.on_demand = shapes is None and self.key_count > self.MAX_TABLE_KEYS
+        if self.on_demand:
+            self.shapes = self._OnDemandLookup(self)
+            self.scores = self._OnDemandLookup(self, self.SCORES)
+            return
+        self.shapes = shapes if shapes is not None else self._generate()
+        if len(self.shapes) != self.key_count:
+            raise ValueError(f"棋型表大小错误: {len(self.shapes)} != {self.key_count}")
+        self.scores: List[int] = [self.SCORES[shape] for shape in self.shapes]
+    
+    @classmethod
+    def for_win_count(cls, win_count: int) -> "PatternTable":
+        """
+        获取指定获胜连子数的共享查找表，优先读取磁盘缓存，没有则生成并写入缓存
+        
+        Args:
+            win_count: 获胜连子数
+        
+        Returns:
+            PatternTable实例
+        """
+        table = cls._instances.get(win_count)
+        if table is None and 3 ** (2 * win_count - 1) > cls.MAX_TABLE_KEYS:
+            table = cls._instances[win_count] = cls(win_count)
+        if table is None:
+            shapes = cls._load_cache(win_count)
+            table = cls(win_count, shapes)
+            if shapes is None:
+                cls._save_cache(win_count, table.shapes)
+            cls._instances[win_count] = table
+        return table
+    
+    @classmethod
+    def cache_path(cls, win_count: int) -> str:
+        """获取指定获胜连子数的缓存文件路径"""
+        return os.path.join(cls.CACHE_DIR, f"pattern_k{win_count}_v{cls.FORMAT_VERSION}.bin")
+    
+    @classmethod
+    def _load_cache(cls, win_count: int) -> Optional[bytes]:
+        """读取磁盘缓存，不存在或大小不符时返回None"""
+        path = cls.cache_path(win_count)
+        try:
+            with open(path, "rb") as f:
+                shapes = f.read()
+        except OSError:
+            return None
+        if len(shapes) != 3 ** (2 * win_count - 1):
+            logger.warning(f"棋型表缓存大小不符，将重新生成: {path}")
+            return None
+        return shapes
+    
+    @classmethod
+    def _save_cache(cls, win_count: int, shapes: bytes):
+        """写入磁盘缓存（先写临时文件再替换，失败时只记录警告）"""
+        path = cls.cache_path(win_count)
+        try:
+            os.makedirs(cls.CACHE_DIR, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(shapes)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"写入棋型表缓存失败: {e}")
+    
+    # 下一手之后的棋型 -> 当前棋型（没有列出的为NONE）
+    _PROMOTIONS = {
+        PatternShape.OPEN_FOUR: PatternShape.OPEN_THREE,
+        PatternShape.FOUR: PatternShape.THREE,
+        PatternShape.OPEN_THREE: PatternShape.OPEN_TWO,
+        PatternShape.THREE: PatternShape.TWO,
+    }
+    
+    def _decode(self, key: int) -> Tuple[int, List[int]]:
+        """把key拆分为己方棋子的位掩码和空位下标列表"""
+        own = 0
+        empties = []
+        digits = key
+        for i in range(self.length):
+            digits, digit = divmod(digits, 3)
+            if digit == self.OWN:
+                own |= 1 << i
+            elif digit == self.EMPTY:
+                empties.append(i)
+        return own, empties
+    
+    def _shape_from_followups(self, followups: List[int]) -> int:
+        """由各空位落子后的棋型推出当前棋型"""
+        fives = followups.count(PatternShape.FIVE)
+        if fives >= 2:
+            return PatternShape.OPEN_FOUR
+        if fives == 1:
+            return PatternShape.FOUR
+        if followups:
+            return self._PROMOTIONS.get(max(followups), PatternShape.NONE)
+        return PatternShape.NONE
+    
+    def _classify_key(self, key: int) -> int:
+        """
+        即时判断单个key的棋型（按需计算模式，递归查询的后继key由shapes缓存）
+        
+        没有任何一个不含对方棋子的窗口已有win_count-3个己方棋子时，三手之内无法成五，直接为NONE，
+        因此递归最多展开三层。
+        """
+        if (key // self.powers[self.center]) % 3 != self.OWN:
+            return PatternShape.NONE
+        own, empties = self._decode(key)
+        if any(own & window == window for window in self._windows):
+            return PatternShape.FIVE
+        empty_mask = sum(1 << i for i in empties)
+        best = max((bin(own & window).count("1") for window in self._windows
+                    if (own | empty_mask) & window == window), default=-1)
+        if best < self.win_count - 3:
+            return PatternShape.NONE
+        shapes = self.shapes
+        return self._shape_from_followups([shapes[key + self.powers[i]] for i in empties])
+    
+    def _generate(self) -> bytes:
+        """
+        生成棋型表
+        
+        把中心格以外的一个空位改为己方棋子会使key增大，因此按key从大到小处理时，
+        递归依赖的棋型都已经算出。
+        """
+        powers = self.powers
+        center_power = powers[self.center]
+        shapes = bytearray(self.key_count)
+        windows = self._windows
+        
+        for key in range(self.key_count - 1, -1, -1):
+            if (key // center_power) % 3 != self.OWN:
+                continue
+            own, empties = self._decode(key)
+            if any(own & window == window for window in windows):
+                shapes[key] = PatternShape.FIVE
+                continue
+            shapes[key] = self._shape_from_followups([shapes[key + powers[i]] for i in empties])
+        return bytes(shapes)
+    
+    def encode(self, digits: Sequence[int]) -> int:
+        """
+        把线段编码为key
+        
+        Args:
+            digits: 长度为length的线段，取值为EMPTY/OWN/BLOCKED
+        
+        Returns:
+            线段key
+        """
+        if len(digits) != self.length:
+            raise ValueError(f"线段长度必须为{self.length}")
+        return sum(digit * power for digit, power in zip(digits, self.powers))
+    
+    def classify(self, key: int) -> PatternShape:
+        """获取key对应的棋型"""
+        return PatternShape(self.shapes[key])
+    
+    def parse(self, line: str) -> PatternShape:
+        """
+        按字符串描述查询棋型，便于调试
+        
+        Args:
+            line: 长度为length的字符串，"."为空位，"X"为己方棋子，"O"或"#"为对方棋子或棋盘外
+        
+        Returns:
+            中心格的棋型
+        """
+        mapping = {".": self.EMPTY, "X": self.OWN, "O": self.BLOCKED, "#": self.BLOCKED}
+        return self.classify(self.encode([mapping[char] for char in line]))
+
+
+def main():
+    """预先生成常用获胜连子数的棋型表缓存"""
+    for win_count in (4, 5, 6):
+        table = PatternTable.for_win_count(win_count)
+        print(f"win_count={win_count}: {table.key_count} 个key, 缓存文件 {PatternTable.cache_path(win_count)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+对局会话管理器
+在一个进程中按对局ID托管大量并发对局，空闲对局以紧凑形式保存并在超时后过期
+"""
+import gc
+import sys
+import threading
+import time
+import types
+import uuid
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from python.core.Board import Board
+from python.core.GameLogic import GameLogic
+from python.models.GameModels import GameSettings, GameState, Player
+from python.util.Logger import logger
+
+
+class SessionManager:
+    """对局会话管理器类
+    
+    每个会话有自己的锁，acquire在锁内交出会话的GameLogic，不同对局之间互不阻塞。
+    会话有两种形态: 活跃会话持有完整的GameLogic（棋盘、评估器等）；超过idle_timeout没有访问的会话
+    被压缩为落子格子序列（每手2字节）加游戏状态和棋盘版本，下次acquire时按序列重建，版本号继续递增。
+    超过ttl没有访问的会话被删除。压缩和过期由sweep执行，create和acquire每隔sweep_interval秒
+    顺带调用一次，因此不需要后台线程，也不依赖窗口。
+    
+    join为对局登记各方的玩家名（座位），供MCP等多人接口校验落子方；
+    可以给出一个引擎池（用于LLM对引擎的对局），各会话从池中借出引擎搜索，
+    每局的跨步搜索状态只在本局的各步之间延续（见EnginePool），悔棋、重新开始和删除对局时清空。
+    轮到引擎执棋方时GameLogic只记下棋盘副本，由调用方（可以在单独的线程池中）调用play_engine:
+    搜索在会话锁外进行，结果再在锁内通过apply_engine_move落下，棋盘已被修改时丢弃。
+    """
+    
+    class _Session:
+        """会话: 活跃时logic不为None，压缩后只保留moves和game_state"""
+        __slots__ = ("game_id", "lock", "settings", "engine_player", "players", "logic", "moves", "game_state",
+                     "version", "created", "last_used", "expired", "engine_board")
+        
+        def __init__(self, game_id: str, settings: GameSettings, engine_player: Player):
+            self.game_id = game_id
+            self.lock = threading.RLock()
+            self.settings = settings
+            self.engine_player = engine_player
+            # 已加入的玩家: 执棋方 -> 玩家名
+            self.players: Dict[Player, str] = {}
+            self.logic: Optional[GameLogic] = None
+            # 压缩形态: 落子格子序列（array('H').tobytes()）
+            self.moves = b""
+            self.game_state = GameState.NOT_STARTED
+            # 压缩时的棋盘版本，重建后版本号从它之后继续
+            self.version = 0
+            self.created = time.monotonic()
+            self.last_used = self.created
+            self.expired = False
+            # 等待引擎搜索的棋盘副本（轮到引擎执棋方时由GameLogic交出）
+            self.engine_board: Optional[Board] = None
+    
+    # 按棋盘规则缓存的活跃会话占用字节数（见live_session_bytes）
+    _live_bytes: Dict[Tuple[int, int, str], int] = {}
+    # 统计会话占用时不计入的共享对象类型
+    _SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.CodeType)
+    
+    def __init__(self, settings: Optional[GameSettings] = None, idle_timeout: float = 60.0, ttl: float = 3600.0,
+                 sweep_interval: float = 1.0, engines: Optional[Any] = None):
+        """
+        初始化会话管理器
+        
+        Args:
+            settings: 新对局的默认设置
+            idle_timeout: 会话多久（秒）没有访问后压缩
+            ttl: 会话多久（秒）没有访问后删除
+            sweep_interval: create和acquire顺带执行sweep的最小间隔（秒）
+            engines: 引擎执棋的会话使用的引擎池（EnginePool，由调用方创建），为None时不支持引擎执棋
+        """
+        self.settings = settings or GameSettings()
+        self.idle_timeout = idle_timeout
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.engines = engines
+        
+        # 统计计数
+        self.created = 0
+        self.expired = 0
+        self.compactions = 0
+        self.restores = 0
+        
+        self._sessions: Dict[str, "SessionManager._Session"] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._sessions
+    
+    def create(self, game_id: Optional[str] = None, settings: Optional[GameSettings] = None,
+               engine_player: Player = Player.NONE) -> str:
+        """
+        创建并开始一局对局
+        
+        Args:
+            game_id: 对局ID，为None时自动生成
+            settings: 游戏设置，为None时使用默认设置
+            engine_player: 由引擎池中的引擎执棋的一方，Player.NONE表示双方都由调用方落子
+        
+        Returns:
+            对局ID
+        
+        Raises:
+            ValueError: 对局ID已存在，或指定了引擎执棋方但没有引擎池
+        """
+        if engine_player != Player.NONE and self.engines is None:
+            raise ValueError("会话管理器没有配置引擎")
+        settings = settings or self.settings
+        settings.validate()
+        game_id = game_id or uuid.uuid4().hex
+        session = self._Session(game_id, settings, engine_player)
+        with self._lock:
+            if game_id in self._sessions:
+                raise ValueError(f"对局已存在: {game_id}")
+            self._sessions[game_id] = session
+            self.created += 1
+        with session.lock:
+            self._activate(session).start_game()
+        logger.info(f"创建对局 {game_id}, 引擎执棋方: {engine_player.name}")
+        self._maybe_sweep()
+        return game_id
+    
+    def delete(self, game_id: str) -> bool:
+        """
+        删除对局
+        
+        Returns:
+            对局存在时返回True
+        """
+        with self._lock:
+            session = self._sessions.pop(game_id, None)
+        if session is None:
+            return False
+        with session.lock:
+            self._expire(session)
+        return True
+    
+    def join(self, game_id: str, player_name: str, player: Player = Player.NONE) -> Player:
+        """
+        加入对局，占用一方的座位（同名玩家再次加入时返回原来的座位）
+        
+        Args:
+            game_id: 对局ID
+            player_name: 玩家名
+            player: 想要的执棋方，Player.NONE表示任意空座位（先黑后白）
+        
+        Returns:
+            分配到的执棋方
+        
+        Raises:
+            KeyError: 对局不存在
+            ValueError: 座位已被占用（或由引擎执棋）
+        """
+        session = self._get_session(game_id)
+        with session.lock:
+            for seat, name in session.players.items():
+                if name == player_name and player in (Player.NONE, seat):
+                    return seat
+            free = [seat for seat in (Player.BLACK, Player.WHITE)
+                    if seat not in session.players and seat != session.engine_player]
+            if player != Player.NONE:
+                free = [seat for seat in free if seat == player]
+            if not free:
+                raise ValueError(f"没有可用的座位: {player.name}" if player != Player.NONE else "对局已满")
+            session.players[free[0]] = player_name
+            session.last_used = time.monotonic()
+        logger.info(f"{player_name} 加入对局 {game_id}, 执棋方: {free[0].name}")
+        return free[0]
+    
+    def get_players(self, game_id: str) -> Dict[Player, str]:
+        """
+        获取已加入对局的玩家
+        
+        Returns:
+            执棋方 -> 玩家名
+        
+        Raises:
+            KeyError: 对局不存在
+        """
+        session = self._get_session(game_id)
+        with session.lock:
+            return dict(session.players)
+    
+    def get_engine_player(self, game_id: str) -> Player:
+        """获取对局中由引擎执棋的一方（Player.NONE表示没有）"""
+        return self._get_session(game_id).engine_player
+    
+    def _get_session(self, game_id: str) -> "SessionManager._Session":
+        """查找会话"""
+        session = self._sessions.get(game_id)
+        if session is None or session.expired:
+            raise KeyError(f"对局不存在: {game_id}")
+        return session
+    
+    @contextmanager
+    def acquire(self, game_id: str) -> Iterator[GameLogic]:
+        """
+        锁定对局并取得其GameLogic（压缩的对局先重建）
+        
+        Args:
+            game_id: 对局ID
+        
+        Yields:
+            对局的GameLogic，只应在with块内使用
+        
+        Raises:
+            KeyError: 对局不存在或已过期
+        """
+        self._maybe_sweep()
+        session = self._get_session(game_id)
+        with session.lock:
+            if session.expired:
+                raise KeyError(f"对局不存在: {game_id}")
+            try:
+                yield self._activate(session)
+            finally:
+                session.last_used = time.monotonic()
+    
+    def _activate(self, session: "SessionManager._Session") -> GameLogic:
+        """取得会话的GameLogic，压缩形态时按落子序列重建（调用方持有会话锁）"""
+        logic = session.logic
+        if logic is None:
+            logic = GameLogic(session.settings)
+            if session.moves or session.game_state != GameState.NOT_STARTED:
+                logic.restore_game(array("H", session.moves), session.game_state, session.version)
+                self.restores += 1
+            if session.engine_player != Player.NONE:
+                # 悔棋、重新开始时清空引擎池为本局保留的跨步状态
+                logic.set_engine_callback(lambda board: setattr(session, "engine_board", board),
+                                          session.engine_player, lambda: self.engines.reset(session.game_id))
+            session.logic = logic
+            session.moves = b""
+        session.last_used = time.monotonic()
+        return logic
+    
+    def play_engine(self, game_id: str) -> bool:
+        """
+        轮到引擎执棋方时为对局搜索并落子（搜索期间不持有会话锁，其他请求可以访问这一局）
+        
+        Args:
+            game_id: 对局ID
+        
+        Returns:
+            引擎是否落子；没有等待搜索的局面（不是引擎的回合或另一个调用已在搜索），
+            或搜索期间棋盘被修改（如认输）时返回False
+        
+        Raises:
+            KeyError: 对局不存在或已过期
+            Exception: 引擎搜索抛出的异常（等待搜索的局面被交还，可以再次调用）
+        """
+        session = self._get_session(game_id)
+        with session.lock:
+            if session.expired:
+                raise KeyError(f"对局不存在: {game_id}")
+            logic = self._activate(session)
+            board, session.engine_board = session.engine_board, None
+            if board is None or board.version != logic.board.version:
+                return False
+        try:
+            result = self.engines.search(game_id, board)
+        except Exception:
+            # 交还等待搜索的局面，之后的调用可以重试（棋盘已被修改时GameLogic已交出新的局面）
+            with session.lock:
+                if session.engine_board is None and session.logic is not None \
+                        and session.logic.board.version == board.version:
+                    session.engine_board = board
+            raise
+        with self.acquire(game_id) as logic:
+            return logic.apply_engine_move(result, board.version)
+    
+    def _expire(self, session: "SessionManager._Session"):
+        """标记会话已删除并释放其GameLogic和引擎池中为它保留的搜索状态（调用方持有会话锁）"""
+        session.expired = True
+        session.logic = None
+        session.engine_board = None
+        if session.engine_player != Player.NONE:
+            self.engines.reset(session.game_id)
+    
+    def _compact(self, session: "SessionManager._Session"):
+        """把活跃会话压缩为落子序列（调用方持有会话锁）"""
+        logic = session.logic
+        session.moves = array("H", logic.board.move_history.cells).tobytes()
+        session.game_state = logic.get_game_state()
+        session.version = logic.board.version
+        session.logic = None
+        # 重建时轮到引擎的话GameLogic会重新交出棋盘
+        session.engine_board = None
+        self.compactions += 1
+    
+    def _maybe_sweep(self):
+        """距上次sweep超过sweep_interval时执行sweep"""
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+    
+    def sweep(self) -> Tuple[int, int]:
+        """
+        压缩空闲会话并删除过期会话（正在被使用的会话跳过）
+        
+        Returns:
+            (压缩的会话数, 删除的会话数)
+        """
+        now = time.monotonic()
+        self._last_sweep = now
+        with self._lock:
+            sessions = list(self._sessions.values())
+        compacted, expired = 0, 0
+        for session in sessions:
+            idle = now - session.last_used
+            if idle < self.idle_timeout or session.logic is None and idle < self.ttl:
+                continue
+            if not session.lock.acquire(blocking=False):
+                continue
+            try:
+                idle = now - session.last_used
+                if idle >= self.ttl:
+                    self._expire(session)
+                    with self._lock:
+                        self._sessions.pop(session.game_id, None)
+                    expired += 1
+                elif idle >= self.idle_timeout and session.logic is not None:
+                    self._compact(session)
+                    compacted += 1
+            finally:
+                session.lock.release()
+        self.expired += expired
+        if compacted or expired:
+            logger.info(f"会话清理: 压缩 {compacted} 局, 过期 {expired} 局, 剩余 {len(self._sessions)} 局")
+        return compacted, expired
+    
+    def info(self, game_id: str) -> Dict[str, Any]:
+        """
+        获取对局概况（不重建压缩的对局）
+        
+        Returns:
+            game_id、active（是否活跃）、game_state、move_count、engine_player、players、idle_seconds和age_seconds
+        
+        Raises:
+            KeyError: 对局不存在
+        """
+        session = self._get_session(game_id)
+        with session.lock:
+            logic = session.logic
+            now = time.monotonic()
+            return {
+                "game_id": game_id,
+                "active": logic is not None,
+                "game_state": (logic.get_game_state() if logic is not None else session.game_state).value,
+                "move_count": len(logic.board.move_history) if logic is not None else len(session.moves) // 2,
+                "engine_player": session.engine_player.name,
+                "players": {seat.name: name for seat, name in session.players.items()},
+                "idle_seconds": now - session.last_used,
+                "age_seconds": now - session.created,
+            }
+    
+    def list_games(self) -> List[str]:
+        """获取所有对局ID"""
+        with self._lock:
+            return list(self._sessions)
+    
+    @classmethod
+    def live_session_bytes(cls, settings: GameSettings) -> int:
+        """
+        计算一个活跃会话（GameLogic及其棋盘、评估器等）自身占用的字节数，按棋盘规则缓存
+        
+        从新建的GameLogic出发遍历它引用的对象，累加sys.getsizeof；同时新建第二个GameLogic，
+        两者都能到达的对象（共享的查找表、枚举成员等）不属于单个会话，不计入。
+        只统计对象本身的大小，不含分配器的额外开销，也与其他线程的分配无关。
+        """
+        key = (settings.board_size, settings.win_count, settings.board_backend)
+        size = cls._live_bytes.get(key)
+        if size is None:
+            logic, other = GameLogic(settings), GameLogic(settings)
+            logic.start_game()
+            other.start_game()
+            shared = cls._reachable(other)
+            size = sum(sys.getsizeof(obj) for key_id, obj in cls._reachable(logic).items() if key_id not in shared)
+            cls._live_bytes[key] = size
+        return size
+    
+    @classmethod
+    def _reachable(cls, root: Any) -> Dict[int, Any]:
+        """从root出发经由引用可达的对象（对象ID -> 对象），不进入类型、模块和函数"""
+        found: Dict[int, Any] = {}
+        stack = [root]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in found or isinstance(obj, cls._SHARED_TYPES):
+                continue
+            found[id(obj)] = obj
+            stack.extend(gc.get_referents(obj))
+        return found
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        获取统计信息
+        
+        Returns:
+            sessions、active、idle、created、expired、compactions、restores，
+            active_session_bytes（每个活跃会话自身对象的字节数，见live_session_bytes）、
+            idle_session_bytes（每个压缩会话的落子序列平均字节数，即落子数乘以每手2字节，
+            不含会话对象本身的固定开销）和memory_bytes（两者合计的估计总字节数）
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+        active = [session for session in sessions if session.logic is not None]
+        idle = [session for session in sessions if session.logic is None]
+        active_bytes = sum(self.live_session_bytes(session.settings) for session in active)
+        idle_bytes = sum(len(session.moves) for session in idle)
+        return {
+            "sessions": len(sessions),
+            "active": len(active),
+            "idle": len(idle),
+            "created": self.created,
+            "expired": self.expired,
+            "compactions": self.compactions,
+            "restores": self.restores,
+            "active_session_bytes": active_bytes / len(active) if active else 0.0,
+            "idle_session_bytes": idle_bytes / len(idle) if idle else 0.0,
+            "memory_bytes": active_bytes + idle_bytes,
+        }
@@ -0,0 +1,75 @@
+"""
+Zobrist哈希表
+为每个(玩家, 格子)生成固定的64位随机数，用于增量计算局面哈希
+"""
+import random
+from typing import Dict, List, Sequence
+
+from python.models.GameModels import Player
+
+
+class ZobristTable:
+    """Zobrist哈希表类
+    
+    随机数由以board_size派生的固定种子生成，因此同一棋盘大小在不同进程中得到相同的哈希值。
+    格子索引为 row * board_size + col。
+    """
+    
+    # 随机数种子基数，修改会使所有已持久化的哈希失效
+    SEED_BASE = 0x5A0B_1257
+    
+    # 按棋盘大小缓存的实例
+    _instances: Dict[int, "ZobristTable"] = {}
+    
+    def __init__(self, board_size: int):
+        """
+        初始化Zobrist哈希表
+        
+        Args:
+            board_size: 棋盘大小
+        """
+        self.board_size = board_size
+        rng = random.Random(self.SEED_BASE + board_size)
+        cell_count = board_size * board_size
+        
+        # keys[player.value][cell]，Player.NONE对应全0，便于统一异或
+        self.keys: List[List[int]] = [[0] * cell_count]
+        for _ in (Player.BLACK, Player.WHITE):
+            self.keys.append([rng.getrandbits(64) for _ in range(cell_count)])
+    
+    @classmethod
+    def for_size(cls, board_size: int) -> "ZobristTable":
+        """
+        获取指定棋盘大小的共享哈希表
+        
+        Args:
+            board_size: 棋盘大小
+        
+        Returns:
+            ZobristTable实例
+        """
+        table = cls._instances.get(board_size)
+        if table is None:
+            table = cls(board_size)
+            cls._instances[board_size] = table
+        return table
+    
+    def key(self, player: Player, row: int, col: int) -> int:
+        """获取指定玩家在指定位置的随机数"""
+        return self.keys[player.value][row * self.board_size + col]
+    
+    def hash_board(self, board_state: Sequence[Sequence[Player]]) -> int:
+        """
+        从完整棋盘状态计算哈希（O(n²)，用于校验或初始化）
+        
+        Args:
+            board_state: 棋盘状态
+        
+        Returns:
+            64位局面哈希
+        """
+        value = 0
+        for row, cells in enumerate(board_state):
+            for col, player in enumerate(cells):
+                value ^= self.keys[player.value][row * self.board_size + col]
+        return value
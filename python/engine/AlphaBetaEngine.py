@@ -0,0 +1,520 @@
+"""
+Alpha-Beta搜索引擎
+负极大值alpha-beta搜索，带迭代加深、主变例搜索（PVS）、邻近候选着法和墙钟时间预算
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+from python.core.Board import Board
+from python.engine.OpeningBook import OpeningBook
+from python.engine.PositionCache import PositionCache
+from python.engine.ThreatSolver import ThreatSolver
+from python.engine.TranspositionTable import TranspositionTable
+from python.models.GameModels import Player, Position, SearchResult
+from python.util.Logger import logger
+
+
+class AlphaBetaEngine:
+    """Alpha-Beta搜索引擎类
+    
+    搜索在棋盘的副本上进行，不会修改传入的棋盘。评估使用挂载在副本上的PatternEvaluator，
+    候选着法限制在已有棋子周围candidate_radius格以内，并按双方在该点的棋型分值排序。
+    一方下一手即可获胜时直接返回胜负分；对方下一手即可获胜时只考虑封堵点。
+    
+    杀手着法、历史启发表、应着表和上一次的主变例在多次搜索之间保留: 新局面是上一次搜索局面的延续
+    （落子历史以其为前缀）时，杀手着法按已走的步数平移，主变例在实际走法与其开头一致时截去已走部分继续使用，
+    历史启发分值减半；否则（悔棋、新对局、其他棋盘）全部清空。每次搜索从保留状态中得到的收益记录在last_reuse中。
+    """
+    
+    # 胜负分，减去到达时的层数使得更快的胜利得分更高
+    WIN_SCORE = 100_000_000
+    # 超过此分值视为已经找到必胜或必败
+    MATE_THRESHOLD = WIN_SCORE - 1000
+    # 每搜索多少个节点检查一次时间
+    CHECK_INTERVAL = 64
+    # 完成深度达到此值的结果写入持久化局面缓存，缓存中达到此深度的结果直接使用
+    CACHE_MIN_DEPTH = 6
+    
+    # 按player.value索引的对手
+    _OPPONENTS = (Player.NONE, Player.WHITE, Player.BLACK)
+    
+    # 按(棋盘大小, 半径)缓存的邻域表
+    _neighbourhoods: Dict[Tuple[int, int], Tuple[Tuple[int, ...], ...]] = {}
+    
+    class _Timeout(Exception):
+        """时间预算用尽"""
+    
+    def __init__(self, time_limit: float = 1.0, max_depth: int = 10, candidate_radius: int = 2,
+                 max_candidates: int = 12, transposition_table: Optional[TranspositionTable] = None,
+                 threat_solver: Optional[ThreatSolver] = None, use_threat_solver: bool = True,
+                 start_depth: int = 1, root_rotation: int = 0, opening_book: Optional[OpeningBook] = None,
+                 position_cache: Optional[PositionCache] = None):
+        """
+        初始化引擎
+        
+        Args:
+            time_limit: 每步的默认时间预算（秒）
+            max_depth: 迭代加深的最大深度
+            candidate_radius: 候选着法与已有棋子的最大切比雪夫距离
+            max_candidates: 每个节点最多搜索的候选着法数
+            transposition_table: 置换表，为None时新建默认大小的置换表
+            threat_solver: 主搜索之前运行的威胁空间求解器，为None时新建一个小预算的求解器
+            use_threat_solver: 是否在主搜索之前先查找VCF/VCT
+            start_depth: 迭代加深的起始深度
+            root_rotation: 根节点除第一个以外的候选着法循环移动的位数（并行搜索中用于错开各进程的搜索顺序）
+            opening_book: 开局库，命中时直接使用开局库着法而不搜索
+            position_cache: 持久化局面缓存，搜索前查询，已证明胜负或较深的搜索结束后写回
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.candidate_radius = candidate_radius
+        self.max_candidates = max_candidates
+        self.transposition_table = transposition_table or TranspositionTable()
+        self.threat_solver = threat_solver or ThreatSolver(node_budget=2000)
+        self.use_threat_solver = use_threat_solver
+        self.start_depth = start_depth
+        self.root_rotation = root_rotation
+        self.opening_book = opening_book
+        self.position_cache = position_cache
+        # 外部停止信号（需提供is_set()，如multiprocessing.Event），置位后搜索按超时处理
+        self.stop_event = None
+        
+        # 累计统计
+        self.total_nodes = 0
+        self.total_time = 0.0
+        
+        self._board: Optional[Board] = None
+        self._deadline = 0.0
+        self._nodes = 0
+        self._near_counts = bytearray()
+        self._near_mask = 0
+        self._neighbours: Tuple[Tuple[int, ...], ...] = ()
+        # 每层的主变例、上一轮迭代的主变例和杀手着法
+        self._pv: List[List[int]] = []
+        self._previous_pv: List[int] = []
+        self._killers: List[List[int]] = []
+        # 当前迭代中根节点已完整搜索过的最佳结果 (分值, 主变例)
+        self._root_best: Optional[Tuple[int, List[int]]] = None
+        
+        # 跨步保留的状态: 历史启发表 _history[player.value][cell]、应着表 _counter[对方上一手] = 应着，
+        # 上一次搜索的根局面落子序列和主变例
+        self._history: List[List[int]] = []
+        self._counter: List[int] = []
+        self._last_root: Optional[List[int]] = None
+        self._last_size = 0
+        self._last_pv: List[int] = []
+        # 本次搜索开始时从上一次搜索继承的主变例、杀手着法和应着表，用于统计
+        self._inherited_pv: List[int] = []
+        self._inherited_killers: List[Tuple[int, ...]] = []
+        self._inherited_counter: List[int] = []
+        self._cutoffs = 0
+        self._reused_cutoffs = 0
+        # 最近一次搜索的复用统计: reused（是否为上一次搜索的延续）、pv_moves（继承的主变例长度）、
+        # cutoffs（beta截断次数）、reused_cutoffs（由继承的主变例、杀手着法或应着引起的截断次数）
+        self.last_reuse: Dict[str, int] = {}
+    
+    @property
+    def nodes_per_second(self) -> float:
+        """累计平均每秒搜索节点数"""
+        return self.total_nodes / self.total_time if self.total_time > 0 else 0.0
+    
+    def reset_search_state(self):
+        """清空跨步保留的杀手着法、历史启发表、应着表和主变例（悔棋或开始新对局时调用）"""
+        self._killers = [[-1, -1]]
+        self._history = []
+        self._counter = []
+        self._last_root = None
+        self._last_size = 0
+        self._last_pv = []
+        self._previous_pv = []
+    
+    def save_search_state(self) -> tuple:
+        """保存跨步保留的搜索状态（后台思考前调用，预测落空时用restore_search_state恢复）"""
+        return ([list(killers) for killers in self._killers], [list(table) for table in self._history],
+                list(self._counter), self._last_root, self._last_size, list(self._last_pv), list(self._previous_pv))
+    
+    def restore_search_state(self, state: tuple):
+        """恢复save_search_state保存的搜索状态"""
+        killers, history, counter, self._last_root, self._last_size, last_pv, previous_pv = state
+        self._killers = [list(entry) for entry in killers]
+        self._history = [list(table) for table in history]
+        self._counter = list(counter)
+        self._last_pv = list(last_pv)
+        self._previous_pv = list(previous_pv)
+    
+    @classmethod
+    def _neighbourhood(cls, size: int, radius: int) -> Tuple[Tuple[int, ...], ...]:
+        """获取每个格子radius以内（不含自身）的格子索引"""
+        key = (size, radius)
+        table = cls._neighbourhoods.get(key)
+        if table is None:
+            cells = []
+            for row in range(size):
+                for col in range(size):
+                    cells.append(tuple(
+                        r * size + c
+                        for r in range(max(0, row - radius), min(size, row + radius + 1))
+                        for c in range(max(0, col - radius), min(size, col + radius + 1))
+                        if r != row or c != col
+                    ))
+            table = tuple(cells)
+            cls._neighbourhoods[key] = table
+        return table
+    
+    def search(self, board: Board, time_limit: Optional[float] = None) -> SearchResult:
+        """
+        为当前玩家搜索最佳着法
+        
+        Args:
+            board: 棋盘（不会被修改）
+            time_limit: 本次搜索的时间预算（秒），默认为构造时的time_limit
+        
+        Returns:
+            搜索结果；游戏已结束时position为None
+        """
+        start = time.perf_counter()
+        budget = self.time_limit if time_limit is None else time_limit
+        self._deadline = start + budget
+        self._nodes = 0
+        
+        if board.is_game_over or board.empty_count == 0:
+            return SearchResult(None, 0, 0, 0, 0.0)
+        if board.empty_count == board.size * board.size:
+            center = Position.at(board.size // 2, board.size // 2)
+            return SearchResult(center, 0, 0, 0, time.perf_counter() - start, (center,))
+        
+        if self.opening_book is not None:
+            result = self._probe_book(board, start)
+            if result is not None:
+                return result
+        if self.position_cache is not None:
+            result = self._probe_cache(board, start)
+            if result is not None:
+                return result
+        
+        self._prepare(board)
+        if self.use_threat_solver:
+            result = self._solve_threats(start)
+            if result is not None:
+                self._store_result(board, result)
+                return result
+        self.transposition_table.new_search()
+        best_score, best_line, completed_depth = 0, [self._fallback_move()], 0
+        for depth in range(min(self.start_depth, self.max_depth), self.max_depth + 1):
+            self._root_best = None
+            self._pv = [[] for _ in range(depth + 2)]
+            while len(self._killers) < depth + 2:
+                self._killers.append([-1, -1])
+            try:
+                score = self._negamax(depth, -self.WIN_SCORE - 1, self.WIN_SCORE + 1, 0)
+            except self._Timeout:
+                # 本轮已完整搜索的根着法中最好的一个不差于上一轮的最佳着法（它总是最先搜索）
+                if self._root_best is not None:
+                    best_score, best_line = self._root_best
+                break
+            best_score, best_line, completed_depth = score, self._pv[0], depth
+            self._previous_pv = best_line
+            if abs(score) >= self.MATE_THRESHOLD:
+                break
+            # 下一轮的耗时通常是本轮的数倍，剩余时间不足一半时不再开始
+            if time.perf_counter() - start > budget / 2:
+                break
+        
+        elapsed = time.perf_counter() - start
+        self.total_nodes += self._nodes
+        self.total_time += elapsed
+        self._board = None
+        self._last_pv = list(best_line)
+        self._record_reuse()
+        
+        positions = Position.index_table(board.size)
+        result = SearchResult(positions[best_line[0]], best_score, completed_depth, self._nodes, elapsed,
+                              tuple(positions[cell] for cell in best_line))
+        logger.info(f"引擎搜索完成: 最佳 ({result.position.row}, {result.position.col}), 评分 {best_score}, "
+                    f"深度 {completed_depth}, 节点 {self._nodes}, {result.nodes_per_second:.0f} 节点/秒, "
+                    f"置换表命中率 {self.transposition_table.stats()['hit_rate']:.1%}")
+        self._store_result(board, result)
+        return result
+    
+    def _probe_book(self, board: Board, start: float) -> Optional[SearchResult]:
+        """查询开局库，命中时返回得分最高的着法，distribution为各着法的对局数比例"""
+        book_move = self.opening_book.best_move(board)
+        if book_move is None:
+            return None
+        book_moves = self.opening_book.probe(board)
+        games = sum(candidate.games for candidate in book_moves)
+        elapsed = time.perf_counter() - start
+        logger.info(f"命中开局库: ({book_move.position.row}, {book_move.position.col}), "
+                    f"{book_move.games} 局, 得分 {book_move.score:.2f}, 耗时 {elapsed * 1000:.2f}ms")
+        return SearchResult(book_move.position, 0, 0, 0, elapsed, (book_move.position,),
+                            tuple((candidate.position, candidate.games / games) for candidate in book_moves))
+    
+    def _probe_cache(self, board: Board, start: float) -> Optional[SearchResult]:
+        """查询持久化局面缓存，只使用已证明胜负或足够深的结果"""
+        cached = self.position_cache.get(board)
+        if cached is None or cached.position is None:
+            return None
+        if (not board.is_valid_move(cached.position.row, cached.position.col)
+                or abs(cached.score) < self.MATE_THRESHOLD and cached.depth < self.CACHE_MIN_DEPTH):
+            return None
+        elapsed = time.perf_counter() - start
+        logger.info(f"命中局面缓存: ({cached.position.row}, {cached.position.col}), 评分 {cached.score}, "
+                    f"深度 {cached.depth}, 耗时 {elapsed * 1000:.2f}ms")
+        return SearchResult(cached.position, cached.score, cached.depth, 0, elapsed, cached.principal_variation)
+    
+    def _store_result(self, board: Board, result: SearchResult):
+        """已证明胜负或完成深度足够的结果写回持久化局面缓存"""
+        if self.position_cache is None or result.position is None:
+            return
+        proven = abs(result.score) >= self.MATE_THRESHOLD
+        if proven or result.depth >= self.CACHE_MIN_DEPTH:
+            self.position_cache.put(board, result.position, result.score, result.depth, proven)
+    
+    def _solve_threats(self, start: float) -> Optional[SearchResult]:
+        """先查找VCF，再查找VCT，找到强制获胜序列时直接返回其第一手"""
+        solver = self.threat_solver
+        nodes = 0
+        for mode in (ThreatSolver.VCF, ThreatSolver.VCT):
+            line = solver.solve(self._board, mode)
+            nodes += solver.nodes
+            if line:
+                elapsed = time.perf_counter() - start
+                self.total_nodes += nodes
+                self.total_time += elapsed
+                self._board = None
+                self._last_pv = [position.to_index(self._last_size) for position in line]
+                self._record_reuse()
+                logger.info(f"引擎找到{mode.upper()}: 第一手 ({line[0].row}, {line[0].col}), 序列长度 {len(line)}, "
+                            f"节点 {nodes}, 耗时 {elapsed * 1000:.1f}ms")
+                return SearchResult(line[0], self.WIN_SCORE - len(line), len(line), nodes, elapsed, tuple(line))
+        self._nodes += nodes
+        return None
+    
+    def _prepare(self, board: Board):
+        """复制棋盘、挂载评估器并初始化邻域计数"""
+        self._board = board.clone()
+        self._board.attach_evaluator()
+        self._neighbours = self._neighbourhood(board.size, self.candidate_radius)
+        self._near_counts = bytearray(board.size * board.size)
+        self._near_mask = 0
+        for cell in self._board.move_history.cells:
+            self._mark_near(cell)
+        self._carry_over(board)
+    
+    def _carry_over(self, board: Board):
+        """新局面是上一次搜索局面的延续时保留并平移启发信息，否则清空"""
+        cells = list(board.move_history.cells)
+        last = self._last_root
+        reused = last is not None and board.size == self._last_size and cells[:len(last)] == last
+        if reused:
+            played = cells[len(last):]
+            shift = len(played)
+            self._killers = self._killers[shift:] or [[-1, -1]]
+            pv = self._last_pv
+            self._previous_pv = pv[shift:] if pv[:shift] == played else []
+            for table in self._history:
+                for cell in range(len(table)):
+                    table[cell] >>= 1
+        else:
+            self.reset_search_state()
+            cell_count = board.size * board.size
+            self._history = [[0] * cell_count for _ in range(3)]
+            self._counter = [-1] * cell_count
+        self.last_reuse = {"reused": int(reused)}
+        self._last_root = cells
+        self._last_size = board.size
+        
+        self._inherited_pv = list(self._previous_pv)
+        self._inherited_killers = [tuple(killers) for killers in self._killers]
+        self._inherited_counter = list(self._counter)
+        self._cutoffs = 0
+        self._reused_cutoffs = 0
+    
+    def _record_reuse(self):
+        """记录本次搜索的复用统计"""
+        self.last_reuse.update(pv_moves=len(self._inherited_pv), cutoffs=self._cutoffs,
+                               reused_cutoffs=self._reused_cutoffs)
+    
+    def _mark_near(self, cell: int):
+        """把cell周围的格子计入邻域"""
+        counts = self._near_counts
+        mask = self._near_mask
+        for neighbour in self._neighbours[cell]:
+            if not counts[neighbour]:
+                mask |= 1 << neighbour
+            counts[neighbour] += 1
+        self._near_mask = mask
+    
+    def _unmark_near(self, cell: int):
+        """把cell周围的格子移出邻域"""
+        counts = self._near_counts
+        mask = self._near_mask
+        for neighbour in self._neighbours[cell]:
+            counts[neighbour] -= 1
+            if not counts[neighbour]:
+                mask ^= 1 << neighbour
+        self._near_mask = mask
+    
+    def _fallback_move(self) -> int:
+        """时间不足以完成第一轮迭代时的着法: 候选着法中排序最靠前的一个"""
+        board = self._board
+        player = board.current_player
+        threats = board.winning_cell_indices(player) or board.winning_cell_indices(self._OPPONENTS[player.value])
+        if threats:
+            return min(threats)
+        return self._ordered_moves(0)[0]
+    
+    def _ordered_moves(self, ply: int, hash_move: int = -1) -> List[int]:
+        """生成并排序候选着法（置换表着法、上一轮主变例着法、杀手着法依次靠前）"""
+        board = self._board
+        evaluator = board.evaluator
+        player = board.current_player
+        opponent = self._OPPONENTS[player.value]
+        
+        free = board.free_mask
+        bits = self._near_mask & free or free
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(low.bit_length() - 1)
+            bits ^= low
+        
+        move_score = evaluator.move_score
+        history = self._history[player.value]
+        scored = sorted(((move_score(cell, player) + move_score(cell, opponent), history[cell], cell) for cell in cells),
+                        reverse=True)
+        moves = [cell for _, _, cell in scored[:self.max_candidates]]
+        
+        # 依次为置换表着法、上一轮主变例着法、杀手着法和对方上一手的应着
+        preferred = list(self._killers[ply])
+        history_cells = board.move_history.cells
+        if history_cells:
+            preferred.append(self._counter[history_cells[-1]])
+        if ply < len(self._previous_pv):
+            preferred.insert(0, self._previous_pv[ply])
+        preferred.insert(0, hash_move)
+        for cell in reversed(preferred):
+            if cell >= 0 and free >> cell & 1:
+                if cell in moves:
+                    moves.remove(cell)
+                moves.insert(0, cell)
+        if ply == 0 and self.root_rotation and len(moves) > 2:
+            shift = self.root_rotation % (len(moves) - 1)
+            moves = moves[:1] + moves[1 + shift:] + moves[1:1 + shift]
+        return moves
+    
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """
+        负极大值alpha-beta搜索（主变例搜索）
+        
+        Returns:
+            从当前玩家视角的分值
+        """
+        self._nodes += 1
+        if not self._nodes % self.CHECK_INTERVAL and (
+                time.perf_counter() > self._deadline or self.stop_event is not None and self.stop_event.is_set()):
+            raise self._Timeout()
+        
+        board = self._board
+        self._pv[ply] = []
+        player = board.current_player
+        
+        wins = board.winning_cell_indices(player)
+        if wins:
+            self._pv[ply] = [min(wins)]
+            return self.WIN_SCORE - ply - 1
+        if board.empty_count == 0:
+            return 0
+        if depth <= 0:
+            return board.evaluator.evaluate(player)
+        
+        table = self.transposition_table
+        key = board.zobrist_hash
+        entry = table.probe(key)
+        hash_move = -1
+        if entry is not None:
+            entry_depth, bound, score, hash_move = entry
+            if ply > 0 and entry_depth >= depth:
+                score = self._score_from_table(score, ply)
+                if (bound == TranspositionTable.EXACT
+                        or (bound == TranspositionTable.LOWER and score >= beta)
+                        or (bound == TranspositionTable.UPPER and score <= alpha)):
+                    if hash_move >= 0:
+                        self._pv[ply] = [hash_move]
+                    return score
+        
+        threats = board.winning_cell_indices(self._OPPONENTS[player.value])
+        moves = sorted(threats) if threats else self._ordered_moves(ply, hash_move)
+        
+        original_alpha = alpha
+        best = -self.WIN_SCORE - 1
+        best_move = -1
+        for index, cell in enumerate(moves):
+            # 超时异常会跳过撤销，搜索用的棋盘副本随之丢弃
+            board.push(cell)
+            self._mark_near(cell)
+            if index == 0:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                # 零窗口验证，失败时再以完整窗口重新搜索
+                score = -self._negamax(depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._negamax(depth - 1, -beta, -score, ply + 1)
+            self._unmark_near(cell)
+            board.pop()
+            
+            if score > best:
+                best = score
+                best_move = cell
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [cell] + self._pv[ply + 1]
+                    if ply == 0:
+                        self._root_best = (score, self._pv[0])
+                if alpha >= beta:
+                    self._record_cutoff(ply, cell, depth)
+                    break
+        
+        if best >= beta:
+            bound = TranspositionTable.LOWER
+        elif best > original_alpha:
+            bound = TranspositionTable.EXACT
+        else:
+            bound = TranspositionTable.UPPER
+        table.store(key, depth, bound, self._score_to_table(best, ply), best_move)
+        return best
+    
+    def _record_cutoff(self, ply: int, cell: int, depth: int):
+        """beta截断时更新杀手着法、历史启发表和应着表（棋盘上已撤销cell）"""
+        board = self._board
+        killers = self._killers[ply]
+        if cell != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = cell
+        self._history[board.current_player.value][cell] += depth * depth
+        history_cells = board.move_history.cells
+        previous = history_cells[-1] if history_cells else -1
+        if previous >= 0:
+            self._counter[previous] = cell
+        
+        self._cutoffs += 1
+        if ((ply < len(self._inherited_pv) and self._inherited_pv[ply] == cell)
+                or (ply < len(self._inherited_killers) and cell in self._inherited_killers[ply])
+                or (previous >= 0 and self._inherited_counter[previous] == cell)):
+            self._reused_cutoffs += 1
+    
+    def _score_to_table(self, score: int, ply: int) -> int:
+        """胜负分改为相对当前节点的距离后写入置换表"""
+        if score >= self.MATE_THRESHOLD:
+            return score + ply
+        if score <= -self.MATE_THRESHOLD:
+            return score - ply
+        return score
+    
+    def _score_from_table(self, score: int, ply: int) -> int:
+        """从置换表读出的胜负分换算为相对根节点的距离"""
+        if score >= self.MATE_THRESHOLD:
+            return score - ply
+        if score <= -self.MATE_THRESHOLD:
+            return score + ply
+        return score
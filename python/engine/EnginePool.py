@@ -0,0 +1,153 @@
+"""
+引擎池
+固定数量的引擎实例供多局对局轮流搜索，每局的跨步搜索状态不会混入其他对局
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from python.core.Board import Board
+from python.models.GameModels import SearchResult
+from python.util.Logger import logger
+
+
+class EnginePool:
+    """引擎池类
+    
+    按需用factory创建最多size个引擎，每次搜索借出一个空闲引擎，都在使用时等待归还，
+    因此同时进行的搜索数和引擎占用的内存（置换表等）都与对局数无关。
+    
+    每个引擎记录最近一次为哪一局（owner）搜索: 借出时优先选择上次为同一局搜索过的引擎，
+    使杀手着法、历史启发、主变例或搜索树等跨步状态在同一局的各步之间延续；
+    借给另一局时先调用引擎的reset_search_state()，不同对局的跨步状态不会混在一起。
+    置换表按局面哈希索引并带校验，对所有对局都有效，不随之清空。
+    """
+    
+    class _Slot:
+        """池中的一个引擎、它最近一次服务的对局，以及引擎是否没有跨步状态"""
+        __slots__ = ("engine", "owner", "busy", "clean")
+        
+        def __init__(self, engine):
+            self.engine = engine
+            self.owner: Optional[str] = None
+            self.busy = False
+            self.clean = True
+    
+    def __init__(self, factory: Callable[[], Any], size: int = 2):
+        """
+        初始化引擎池（立即创建第一个引擎）
+        
+        Args:
+            factory: 创建引擎的函数，引擎需要提供search(board, time_limit)和time_limit
+            size: 最多创建的引擎数，即同时进行的搜索数上限
+        """
+        if size < 1:
+            raise ValueError("引擎池大小必须为正数")
+        self.factory = factory
+        self.size = size
+        
+        # 统计计数
+        self.searches = 0
+        self.resets = 0
+        
+        self._slots: List[EnginePool._Slot] = [self._Slot(factory())]
+        # 引擎的默认时间预算（秒）
+        self.time_limit: float = self._slots[0].engine.time_limit
+        self._condition = threading.Condition()
+        self._closed = False
+    
+    def search(self, owner: str, board: Board, time_limit: Optional[float] = None) -> SearchResult:
+        """
+        借出引擎为指定对局搜索（没有空闲引擎时等待）
+        
+        Args:
+            owner: 对局ID
+            board: 棋盘
+            time_limit: 时间预算（秒），None表示使用引擎的默认值
+        
+        Returns:
+            搜索结果
+        """
+        slot = self._checkout(owner)
+        try:
+            if time_limit is None:
+                return slot.engine.search(board)
+            return slot.engine.search(board, time_limit)
+        finally:
+            with self._condition:
+                slot.busy = False
+                self._condition.notify_all()
+    
+    def _checkout(self, owner: str) -> "EnginePool._Slot":
+        """借出空闲引擎: 优先上次服务同一局的，其次空闲最久未用的，不足size个时新建"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("引擎池已关闭")
+                free = [slot for slot in self._slots if not slot.busy]
+                slot = next((slot for slot in free if slot.owner == owner), None)
+                if slot is None and len(self._slots) < self.size:
+                    slot = self._Slot(self.factory())
+                    self._slots.append(slot)
+                    logger.info(f"引擎池新建引擎，共 {len(self._slots)} 个")
+                if slot is None and free:
+                    slot = free[0]
+                if slot is not None:
+                    break
+                self._condition.wait()
+            slot.busy = True
+            # 空闲列表按归还顺序排列，借出的引擎移到末尾
+            self._slots.remove(slot)
+            self._slots.append(slot)
+            self.searches += 1
+            if slot.owner != owner and not slot.clean:
+                self._reset_engine(slot)
+                self.resets += 1
+            slot.owner = owner
+            slot.clean = False
+        return slot
+    
+    @staticmethod
+    def _reset_engine(slot: "EnginePool._Slot"):
+        """清空引擎的跨步状态（引擎没有reset_search_state时忽略）"""
+        reset = getattr(slot.engine, "reset_search_state", None)
+        if reset is not None:
+            reset()
+        slot.clean = True
+    
+    def reset(self, owner: str):
+        """清空为指定对局保留的跨步状态（悔棋、重新开始或对局结束时调用），下次借出时重新开始"""
+        with self._condition:
+            for slot in self._slots:
+                if slot.owner == owner:
+                    slot.owner = None
+                    # 正在搜索的引擎在下一次借出时清空
+                    if not slot.busy:
+                        self._reset_engine(slot)
+    
+    def close(self):
+        """等待进行中的搜索结束并关闭引擎（引擎有close()时）"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            while any(slot.busy for slot in self._slots):
+                self._condition.wait()
+            slots, self._slots = self._slots, []
+        for slot in slots:
+            close = getattr(slot.engine, "close", None)
+            if close is not None:
+                close()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取统计信息
+        
+        Returns:
+            engines（已创建的引擎数）、busy（正在搜索的引擎数）、searches和resets（为换局清空状态的次数）
+        """
+        with self._condition:
+            return {
+                "engines": len(self._slots),
+                "busy": sum(slot.busy for slot in self._slots),
+                "searches": self.searches,
+                "resets": self.resets,
+            }
@@ -0,0 +1,313 @@
+"""
+引擎工作进程
+在独立进程中运行引擎搜索，调用方提交局面后立即返回，之后非阻塞地轮询结果
+"""
+import inspect
+import multiprocessing
+import queue
+import time
+from typing import Optional, Tuple
+
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.OpeningBook import OpeningBook
+from python.engine.PositionCache import PositionCache
+from python.models.GameModels import GameSettings, Player, SearchResult
+from python.util.Logger import logger
+
+
+class EngineWorker:
+    """引擎工作进程类
+    
+    工作进程持有一个引擎实例，按顺序处理请求队列中的搜索请求，并把(请求编号, 结果)放入结果队列。
+    引擎在多次搜索间保留（置换表和跨步启发信息继续有效），reset_search_state()把清空请求排入队列。
+    
+    同一时刻只有一个有效请求: 提交新请求或调用cancel()都会作废当前请求。
+    作废时设置共享的停止事件（引擎有stop_event属性时搜索会尽快结束）并记录作废的编号，
+    工作进程开始处理请求前先清除停止事件再检查编号，因此作废的请求不会被执行或其结果被丢弃。
+    
+    后台思考: ponder()提交的请求与普通请求相同，只是工作进程在搜索前保存引擎跨步保留的状态
+    （引擎提供save_search_state时）。对手走出预测的局面时调用finish()取用这次搜索的结果；
+    否则后台思考被作废（cancel或提交新请求），工作进程恢复思考前的状态（引擎不能保存时清空），
+    使下一次搜索仍是引擎上一次正式搜索的延续。
+    
+    search()提交请求并阻塞等待结果，time_limit为引擎的默认时间预算，
+    因此工作进程也可以作为GameLogic.set_engine的引擎使用（支持后台思考）。
+    
+    使用spawn方式启动进程: 调用方通常是持有图形上下文并运行着MCP服务器线程的窗口进程，
+    在多线程进程中fork并不安全。进程启动需要导入引擎模块，可以提前调用start()。
+    """
+    
+    # 关闭时等待工作进程退出的时间（秒），超时后强制结束
+    CLOSE_TIMEOUT = 2.0
+    
+    def __init__(self, engine_class: type = AlphaBetaEngine, **engine_options):
+        """
+        初始化工作进程（不立即启动）
+        
+        Args:
+            engine_class: 引擎类，在工作进程中以engine_options构造，需要提供search(board, time_limit)
+            engine_options: 引擎构造参数（需要可以pickle），opening_book和position_cache可以给出
+                开局库和局面缓存的文件路径，由工作进程打开并在结束时关闭
+        """
+        self.engine_class = engine_class
+        self.engine_options = engine_options
+        # 引擎的默认时间预算（未给出时取引擎构造参数的默认值）
+        parameter = inspect.signature(engine_class).parameters.get("time_limit")
+        self.time_limit = engine_options.get("time_limit", parameter.default if parameter is not None else None)
+        
+        context = multiprocessing.get_context("spawn")
+        self._context = context
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._stop = context.Event()
+        # 已作废的最大请求编号
+        self._cancelled = context.Value("q", -1)
+        self._process: Optional[multiprocessing.Process] = None
+        
+        self._next_id = 0
+        # 等待结果的请求编号，None表示空闲
+        self._pending: Optional[int] = None
+        # 最近一次请求是否为后台思考（作废时需要恢复引擎状态）
+        self._pondering = False
+    
+    @property
+    def busy(self) -> bool:
+        """是否有等待结果的请求"""
+        return self._pending is not None
+    
+    def start(self):
+        """启动工作进程（已启动时忽略）"""
+        if self._process is not None and self._process.is_alive():
+            return
+        self._process = self._context.Process(
+            target=EngineWorker._run,
+            args=(self.engine_class, self.engine_options, self._requests, self._results, self._stop,
+                  self._cancelled),
+            name="EngineWorker",
+        )
+        self._process.start()
+        logger.info(f"引擎工作进程已启动: {self.engine_class.__name__}, pid {self._process.pid}")
+    
+    def submit(self, board: Board, time_limit: Optional[float] = None) -> int:
+        """
+        提交搜索请求（作废尚未完成的请求）
+        
+        Args:
+            board: 棋盘（只读取落子序列，提交后可以继续修改）
+            time_limit: 时间预算（秒），None表示使用引擎的默认值
+        
+        Returns:
+            请求编号
+        """
+        return self._submit(board, time_limit, False)
+    
+    def ponder(self, board: Board, time_limit: float) -> int:
+        """
+        提交后台思考请求（作废尚未完成的请求），之后用finish()取用结果，或由cancel()作废并恢复引擎状态
+        
+        Args:
+            board: 预测的对手应着之后的局面（或对手当前的局面）
+            time_limit: 后台思考的时间上限（秒）
+        
+        Returns:
+            请求编号
+        """
+        return self._submit(board, time_limit, True)
+    
+    def _submit(self, board: Board, time_limit: Optional[float], ponder: bool) -> int:
+        """提交请求"""
+        self.start()
+        self.cancel()
+        request_id = self._next_id
+        self._next_id += 1
+        moves = tuple((cell, player.value) for cell, player in
+                      zip(board.move_history.cells, (player for player, _ in board.move_history)))
+        self._requests.put(("search", request_id, board.settings, moves, board.current_player.value, time_limit,
+                            ponder))
+        self._pending = request_id
+        self._pondering = ponder
+        return request_id
+    
+    def search(self, board: Board, time_limit: Optional[float] = None) -> Optional[SearchResult]:
+        """
+        提交搜索请求并等待结果
+        
+        Returns:
+            搜索结果，搜索出错时返回None
+        """
+        self.submit(board, time_limit)
+        return self.wait()
+    
+    def poll(self) -> Optional[SearchResult]:
+        """
+        非阻塞地取回当前请求的结果（丢弃已作废请求的结果）
+        
+        Returns:
+            搜索结果，还没有完成时返回None；搜索出错时同样返回None，之后busy变为False
+        """
+        return self.wait(0.0)
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[SearchResult]:
+        """
+        等待当前请求的结果（丢弃已作废请求的结果）
+        
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+        
+        Returns:
+            搜索结果，超时或没有请求时返回None；搜索出错时同样返回None，之后busy变为False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending is not None:
+            try:
+                if deadline is None:
+                    request_id, result = self._results.get()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        request_id, result = self._results.get(timeout=remaining)
+                    else:
+                        request_id, result = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            if request_id == self._pending:
+                self._pending = None
+                self._pondering = False
+                return result
+        return None
+    
+    def finish(self, timeout: float) -> Optional[SearchResult]:
+        """
+        后台思考命中时取用其结果: 最多再等待timeout秒，仍未结束时通知停止并取回当前最好的结果
+        
+        Args:
+            timeout: 最长等待时间（秒）
+        
+        Returns:
+            搜索结果，没有请求或搜索出错时返回None
+        """
+        self._pondering = False
+        result = self.wait(timeout)
+        if result is None and self._pending is not None:
+            self._stop.set()
+            result = self.wait()
+        return result
+    
+    def cancel(self):
+        """作废当前请求并通知工作进程停止搜索，作废的是后台思考时恢复引擎思考前的状态"""
+        if self._pondering:
+            self._requests.put(("restore",))
+            self._pondering = False
+        if self._pending is None:
+            return
+        # 先记录作废编号再设置停止事件，与工作进程中先清除事件再检查编号的顺序配合
+        self._cancelled.value = self._pending
+        self._stop.set()
+        self._pending = None
+    
+    def reset_search_state(self):
+        """作废当前请求并清空引擎跨步保留的搜索状态（悔棋或开始新对局时调用）"""
+        self.cancel()
+        if self._process is not None:
+            self._requests.put(("reset",))
+    
+    def close(self):
+        """停止当前搜索并结束工作进程"""
+        self.cancel()
+        process = self._process
+        if process is None:
+            return
+        self._requests.put(None)
+        process.join(self.CLOSE_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        self._process = None
+        logger.info("引擎工作进程已结束")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def _open_resources(engine_options: dict) -> list:
+        """在工作进程中把以路径给出的开局库和局面缓存换成打开的实例（无法打开时为None），返回需要关闭的资源"""
+        resources = []
+        for name, opener in (("opening_book", OpeningBook.open_optional),
+                             ("position_cache", PositionCache.open_optional)):
+            path = engine_options.get(name)
+            if isinstance(path, str):
+                resource = opener(path)
+                engine_options[name] = resource
+                if resource is not None:
+                    resources.append(resource)
+        return resources
+    
+    @staticmethod
+    def _run(engine_class: type, engine_options: dict, requests, results, stop, cancelled):
+        """工作进程主循环"""
+        resources = EngineWorker._open_resources(engine_options)
+        engine = engine_class(**engine_options)
+        if hasattr(engine, "stop_event"):
+            engine.stop_event = stop
+        # 最近一次请求是否为后台思考，以及思考前保存的引擎状态
+        pondered, saved = False, None
+        try:
+            while True:
+                message = requests.get()
+                if message is None:
+                    break
+                if message[0] == "reset":
+                    EngineWorker._restore_search_state(engine, None)
+                    pondered, saved = False, None
+                    continue
+                if message[0] == "restore":
+                    if pondered:
+                        EngineWorker._restore_search_state(engine, saved)
+                    pondered, saved = False, None
+                    continue
+                _, request_id, settings, moves, current_player, time_limit, ponder = message
+                stop.clear()
+                if request_id <= cancelled.value:
+                    continue
+                save = getattr(engine, "save_search_state", None)
+                pondered, saved = ponder, save() if ponder and save is not None else None
+                result = None
+                try:
+                    result = EngineWorker._search(engine, settings, moves, current_player, time_limit)
+                except Exception as e:
+                    logger.error(f"引擎工作进程搜索出错: {e}", exc_info=True)
+                results.put((request_id, result))
+        finally:
+            close = getattr(engine, "close", None)
+            if close is not None:
+                close()
+            for resource in resources:
+                resource.close()
+    
+    @staticmethod
+    def _restore_search_state(engine, saved):
+        """恢复引擎保存的跨步状态，没有保存的状态时清空（引擎不支持时忽略）"""
+        if saved is not None:
+            engine.restore_search_state(saved)
+            return
+        reset = getattr(engine, "reset_search_state", None)
+        if reset is not None:
+            reset()
+    
+    @staticmethod
+    def _search(engine, settings: GameSettings, moves: Tuple[Tuple[int, int], ...], current_player: int,
+                time_limit: Optional[float]) -> SearchResult:
+        """重建棋盘并搜索"""
+        board = BoardFactory.create_board(settings)
+        for cell, player in moves:
+            board.current_player = Player(player)
+            board.push(cell)
+        board.current_player = Player(current_player)
+        if time_limit is None:
+            return engine.search(board)
+        return engine.search(board, time_limit)
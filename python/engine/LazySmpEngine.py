@@ -0,0 +1,224 @@
+"""
+多进程并行搜索引擎（Lazy SMP）
+多个工作进程以不同的起始深度和根节点着法顺序搜索同一局面，通过共享内存中的置换表互相利用搜索结果
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional, Tuple
+
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.PositionCache import PositionCache
+from python.engine.TranspositionTable import TranspositionTable
+from python.models.GameModels import GameSettings, Player, SearchResult
+from python.util.Logger import logger
+
+
+class LazySmpEngine:
+    """多进程并行搜索引擎类
+    
+    与AlphaBetaEngine接口相同，可以直接传给GameLogic.set_engine。
+    每个工作进程持有一个AlphaBetaEngine，它们的置换表都附加到同一块共享内存上，写入不加锁
+    （置换表的异或校验会丢弃并发写入撕裂的条目）。第0号进程按常规方式搜索并运行威胁空间求解器，
+    其余进程交替从第1、2层开始迭代加深，并循环移动根节点的候选着法顺序，使各进程搜索不同的子树，
+    再通过置换表把结果传给彼此。
+    
+    各进程搜索到截止时间或最大深度为止；某个进程找到胜负，或外部设置了stop_event（如后台思考被停止）时，
+    主进程通知其他进程停止。主进程收集所有结果，取找到胜负的或完成深度最深的一个（深度相同时优先第0号进程）。
+    进程池和共享置换表在第一次搜索时创建，不再使用时应调用close()（或使用with语句）。
+    进程池与EngineWorker一样使用spawn方式启动。
+    """
+    
+    # 主进程等待工作进程时检查stop_event的间隔（秒）
+    POLL_INTERVAL = 0.02
+    
+    # 工作进程内的引擎（由进程池的初始化函数创建，每个进程一个）
+    _worker_engine: Optional[AlphaBetaEngine] = None
+    
+    def __init__(self, time_limit: float = 1.0, workers: Optional[int] = None, max_depth: int = 10,
+                 candidate_radius: int = 2, max_candidates: int = 12, table_size_mb: float = 64,
+                 position_cache: Optional[PositionCache] = None):
+        """
+        初始化引擎
+        
+        Args:
+            time_limit: 每步的默认时间预算（秒）
+            workers: 工作进程数，None表示每个CPU核心一个，1表示在当前进程内单线程搜索
+            max_depth: 迭代加深的最大深度
+            candidate_radius: 候选着法与已有棋子的最大切比雪夫距离
+            max_candidates: 每个节点最多搜索的候选着法数
+            table_size_mb: 共享置换表的内存上限（MB）
+            position_cache: 持久化局面缓存，由主进程在分发搜索前查询、收集结果后写回
+        """
+        self.time_limit = time_limit
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_depth = max_depth
+        self.candidate_radius = candidate_radius
+        self.max_candidates = max_candidates
+        self.table_size_mb = table_size_mb
+        self.position_cache = position_cache
+        
+        # 累计统计（所有进程合计）
+        self.total_nodes = 0
+        self.total_time = 0.0
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._table: Optional[TranspositionTable] = None
+        self._stop = None
+        # 外部停止信号（与AlphaBetaEngine.stop_event相同），设置后尽快结束本次搜索
+        self.stop_event = None
+        # 单进程模式下直接使用的引擎
+        self._local_engine: Optional[AlphaBetaEngine] = None
+    
+    @property
+    def nodes_per_second(self) -> float:
+        """累计平均每秒搜索节点数（所有进程合计）"""
+        return self.total_nodes / self.total_time if self.total_time > 0 else 0.0
+    
+    def close(self):
+        """关闭工作进程池并释放共享置换表"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._table is not None:
+            self._table.unlink()
+            self._table = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def search(self, board: Board, time_limit: Optional[float] = None) -> SearchResult:
+        """
+        为当前玩家搜索最佳着法
+        
+        Args:
+            board: 棋盘（不会被修改）
+            time_limit: 本次搜索的时间预算（秒），默认为构造时的time_limit
+        
+        Returns:
+            搜索结果，nodes为所有进程的节点数之和；游戏已结束时position为None
+        """
+        budget = self.time_limit if time_limit is None else time_limit
+        if self.workers == 1:
+            if self._local_engine is None:
+                self._local_engine = AlphaBetaEngine(max_depth=self.max_depth, candidate_radius=self.candidate_radius,
+                                                     max_candidates=self.max_candidates,
+                                                     transposition_table=TranspositionTable(self.table_size_mb),
+                                                     position_cache=self.position_cache)
+            self._local_engine.stop_event = self.stop_event
+            result = self._local_engine.search(board, budget)
+            self.total_nodes += result.nodes
+            self.total_time += result.elapsed
+            return result
+        
+        start = time.perf_counter()
+        if self.position_cache is not None and not board.is_game_over:
+            cached = self.position_cache.get(board)
+            if (cached is not None and cached.position is not None
+                    and board.is_valid_move(cached.position.row, cached.position.col)
+                    and (abs(cached.score) >= AlphaBetaEngine.MATE_THRESHOLD
+                         or cached.depth >= AlphaBetaEngine.CACHE_MIN_DEPTH)):
+                return SearchResult(cached.position, cached.score, cached.depth, 0, time.perf_counter() - start,
+                                    cached.principal_variation)
+        self._ensure_pool()
+        self._table.new_search()
+        moves = tuple((cell, player.value) for cell, player in
+                      zip(board.move_history.cells, (player for player, _ in board.move_history)))
+        # 各进程的时钟不同，使用墙钟时间作为共同的截止时间
+        deadline = time.time() + budget
+        futures = [
+            self._executor.submit(LazySmpEngine._worker_search, board.settings, moves, board.current_player.value,
+                                  deadline, index, self._table.generation)
+            for index in range(self.workers)
+        ]
+        self._wait_workers(futures)
+        results = [future.result() for future in futures]
+        self._stop.clear()
+        
+        best_index = max(range(len(results)), key=self._result_rank(results))
+        best = results[best_index]
+        nodes = sum(result.nodes for result in results)
+        elapsed = time.perf_counter() - start
+        self.total_nodes += nodes
+        self.total_time += elapsed
+        
+        result = SearchResult(best.position, best.score, best.depth, nodes, elapsed, best.principal_variation)
+        if self.position_cache is not None and result.position is not None:
+            proven = abs(best.score) >= AlphaBetaEngine.MATE_THRESHOLD
+            if proven or best.depth >= AlphaBetaEngine.CACHE_MIN_DEPTH:
+                self.position_cache.put(board, result.position, best.score, best.depth, proven)
+        if result.position is not None:
+            logger.info(f"并行搜索完成: 最佳 ({result.position.row}, {result.position.col}), 评分 {best.score}, "
+                        f"深度 {best.depth}（进程 {best_index}）, 各进程深度 {[r.depth for r in results]}, "
+                        f"节点 {nodes}, {result.nodes_per_second:.0f} 节点/秒")
+        return result
+    
+    def _wait_workers(self, futures):
+        """等待所有工作进程结束；有进程找到胜负或外部请求停止时通知其余进程停止"""
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if self._stop.is_set():
+                continue
+            proven = any(future.exception() is None and future.result().position is not None
+                         and abs(future.result().score) >= AlphaBetaEngine.MATE_THRESHOLD for future in done)
+            if proven or self.stop_event is not None and self.stop_event.is_set():
+                self._stop.set()
+    
+    @staticmethod
+    def _result_rank(results):
+        """结果的排序键: 找到胜负的优先（按分值，即更快的胜利或更慢的失败），其次完成深度更深，最后进程编号更小"""
+        def rank(index: int):
+            result = results[index]
+            mate = abs(result.score) >= AlphaBetaEngine.MATE_THRESHOLD
+            return result.position is not None, mate, result.score if mate else 0, result.depth, -index
+        return rank
+    
+    def _ensure_pool(self):
+        """创建共享置换表、停止信号和工作进程池"""
+        if self._executor is not None:
+            return
+        self._table = TranspositionTable(self.table_size_mb, shared=True)
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=LazySmpEngine._init_worker,
+            initargs=(self._table.name, self.table_size_mb, self._stop,
+                      (self.max_depth, self.candidate_radius, self.max_candidates)),
+        )
+    
+    @staticmethod
+    def _init_worker(table_name: str, table_size_mb: float, stop, options: Tuple[int, int, int]):
+        """工作进程初始化: 附加共享置换表并创建引擎"""
+        max_depth, candidate_radius, max_candidates = options
+        table = TranspositionTable(table_size_mb, shared=True, name=table_name)
+        engine = AlphaBetaEngine(max_depth=max_depth, candidate_radius=candidate_radius,
+                                 max_candidates=max_candidates, transposition_table=table)
+        engine.stop_event = stop
+        LazySmpEngine._worker_engine = engine
+    
+    @staticmethod
+    def _worker_search(settings: GameSettings, moves: Tuple[Tuple[int, int], ...], current_player: int,
+                       deadline: float, index: int, generation: int) -> SearchResult:
+        """工作进程入口: 重建棋盘并按进程编号错开起始深度和根节点着法顺序"""
+        board = BoardFactory.create_board(settings)
+        for cell, player in moves:
+            board.current_player = Player(player)
+            board.push(cell)
+        board.current_player = Player(current_player)
+        
+        engine = LazySmpEngine._worker_engine
+        engine.use_threat_solver = index == 0
+        engine.start_depth = 1 + index % 2
+        engine.root_rotation = index // 2
+        # search开始时会递增世代，使所有进程的世代与主进程一致
+        engine.transposition_table.generation = (generation - 1) & 0xFF
+        return engine.search(board, max(0.0, deadline - time.time()))
@@ -0,0 +1,429 @@
+"""
+蒙特卡洛树搜索引擎
+UCT选择、邻近候选着法扩展和快速随机走子，支持把模拟分散到多个进程的根并行模式
+"""
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings, Player, Position, SearchResult
+from python.util.Logger import logger
+
+
+class MctsEngine:
+    """蒙特卡洛树搜索引擎类
+    
+    每次模拟从根节点按UCT选择到叶节点，扩展一个候选着法，再用快速走子下完整盘并回传胜负。
+    候选着法限制在已有棋子周围candidate_radius格以内；一方可以直接获胜时只扩展获胜点，
+    对方可以直接获胜时只扩展封堵点。快速走子同样优先成五和封堵，其余随机选择邻近空位。
+    
+    workers大于1时使用根并行: 每个工作进程在各自的棋盘副本上独立建树，
+    结束后按根节点着法合并访问次数和胜场。各进程之间没有任何共享状态，
+    因此模拟速度随进程数近似线性增长。进程池在第一次搜索时创建并在多次搜索间复用，
+    不再使用时应调用close()（或使用with语句）。进程池与EngineWorker一样使用spawn方式启动，
+    调用方进程中通常已经有界面线程和MCP服务器线程，fork并不安全。
+    
+    搜索结束后保留搜索树: 下一次搜索的局面是上次局面的延续时（同一局对局中又走了若干步），
+    沿实际走出的着法找到对应子树作为新的根节点，其中已有的访问和胜场继续参与选择；
+    找不到或不是延续（悔棋、新对局）时重新建树。根并行时每个工作进程各自保留自己的树。
+    """
+    
+    # 按player.value索引的对手
+    _OPPONENTS = (Player.NONE, Player.WHITE, Player.BLACK)
+    
+    # 按(棋盘大小, 半径)缓存的邻域表
+    _neighbourhoods: Dict[Tuple[int, int], Tuple[Tuple[int, ...], ...]] = {}
+    
+    # 工作进程中的引擎（每个进程一个，在多次搜索间保留搜索树）
+    _worker_engine: Optional["MctsEngine"] = None
+    
+    class _Node:
+        """搜索树节点，wins从走出move的一方的视角累计（和棋计0.5）"""
+        __slots__ = ("move", "player", "parent", "children", "untried", "visits", "wins", "winner")
+        
+        def __init__(self, move: int, player: Player, parent: Optional["MctsEngine._Node"]):
+            self.move = move
+            self.player = player
+            self.parent = parent
+            self.children: List["MctsEngine._Node"] = []
+            # 尚未扩展的着法，None表示还没有生成
+            self.untried: Optional[List[int]] = None
+            self.visits = 0
+            self.wins = 0.0
+            # 终局节点的胜者（和棋为Player.NONE），非终局为None
+            self.winner: Optional[Player] = None
+    
+    def __init__(self, time_limit: float = 1.0, workers: Optional[int] = None, exploration: float = 1.4,
+                 candidate_radius: int = 1, seed: Optional[int] = None):
+        """
+        初始化引擎
+        
+        Args:
+            time_limit: 每步的默认时间预算（秒）
+            workers: 并行进程数，None表示每个CPU核心一个，1表示在当前进程内搜索
+            exploration: UCT探索常数
+            candidate_radius: 扩展和快速走子时候选着法与已有棋子的最大切比雪夫距离
+            seed: 随机种子，None表示每次使用不同的随机序列
+        """
+        self.time_limit = time_limit
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.exploration = exploration
+        self.candidate_radius = candidate_radius
+        self.seed = seed
+        
+        # 累计统计
+        self.total_playouts = 0
+        self.total_time = 0.0
+        
+        self._random = random.Random(seed)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._board: Optional[Board] = None
+        self._neighbours: Tuple[Tuple[int, ...], ...] = ()
+        self._max_depth = 0
+        
+        # 跨步保留的搜索树: 上次搜索的根节点、根局面的落子序列和棋盘大小
+        self._root: Optional[MctsEngine._Node] = None
+        self._root_cells: List[int] = []
+        self._root_size = 0
+        # 根并行时工作进程最近一次服务的搜索编号，同一次搜索的多个任务落到同一进程时不重复累计
+        self._search_id = -1
+        self._next_search_id = 0
+        # 最近一次搜索的复用统计: reused（是否复用了子树）、reused_visits（复用子树已有的访问次数，各进程合计）
+        self.last_reuse: Dict[str, int] = {}
+    
+    @property
+    def playouts_per_second(self) -> float:
+        """累计平均每秒模拟次数（所有进程合计）"""
+        return self.total_playouts / self.total_time if self.total_time > 0 else 0.0
+    
+    def close(self):
+        """关闭工作进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def reset_search_state(self):
+        """丢弃保留的搜索树（悔棋或开始新对局时调用）；工作进程中的树在下一次搜索发现局面不连续时丢弃"""
+        self._root = None
+        self._root_cells = []
+        self._root_size = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @classmethod
+    def _neighbourhood(cls, size: int, radius: int) -> Tuple[Tuple[int, ...], ...]:
+        """获取每个格子radius以内（不含自身）的格子索引"""
+        key = (size, radius)
+        table = cls._neighbourhoods.get(key)
+        if table is None:
+            cells = []
+            for row in range(size):
+                for col in range(size):
+                    cells.append(tuple(
+                        r * size + c
+                        for r in range(max(0, row - radius), min(size, row + radius + 1))
+                        for c in range(max(0, col - radius), min(size, col + radius + 1))
+                        if r != row or c != col
+                    ))
+            table = tuple(cells)
+            cls._neighbourhoods[key] = table
+        return table
+    
+    def search(self, board: Board, time_limit: Optional[float] = None, playouts: Optional[int] = None) -> SearchResult:
+        """
+        为当前玩家搜索着法
+        
+        Args:
+            board: 棋盘（不会被修改）
+            time_limit: 本次搜索的时间预算（秒），默认为构造时的time_limit
+            playouts: 模拟次数上限（所有进程合计），给出时先达到的限制生效
+        
+        Returns:
+            搜索结果: position为访问次数最多的着法，score为其胜率换算的分值（-1000~1000），
+            depth为树的最大深度，nodes为模拟次数，distribution为根节点各着法的访问比例；
+            没有完成任何模拟（playouts=0）时position为一个候选着法，score为0；
+            游戏已结束时position为None
+        """
+        start = time.perf_counter()
+        budget = self.time_limit if time_limit is None else time_limit
+        
+        self.last_reuse = {"reused": 0, "reused_visits": 0}
+        if board.is_game_over or board.empty_count == 0:
+            return SearchResult(None, 0, 0, 0, 0.0)
+        if board.empty_count == board.size * board.size:
+            center = Position.at(board.size // 2, board.size // 2)
+            return SearchResult(center, 0, 0, 0, time.perf_counter() - start, (center,), ((center, 1.0),))
+        
+        if self.workers == 1:
+            results = [self._search_tree(board.clone(), budget, playouts)]
+        else:
+            results = self._search_parallel(board, budget, playouts)
+        
+        # 合并各棵树根节点的统计
+        visits: Dict[int, int] = {}
+        wins: Dict[int, float] = {}
+        total, depth = 0, 0
+        for tree_visits, tree_wins, tree_playouts, tree_depth, _, tree_reused in results:
+            for cell, count in tree_visits.items():
+                visits[cell] = visits.get(cell, 0) + count
+                wins[cell] = wins.get(cell, 0.0) + tree_wins[cell]
+            total += tree_playouts
+            depth = max(depth, tree_depth)
+            if tree_reused:
+                self.last_reuse["reused"] = 1
+                self.last_reuse["reused_visits"] += tree_reused
+        if not visits:
+            position = Position.from_index(self._fallback_move(board), board.size)
+            return SearchResult(position, 0, 0, 0, time.perf_counter() - start, (position,))
+        best = max(visits, key=lambda cell: (visits[cell], wins[cell]))
+        # 主变例取最佳着法访问次数最多的那棵树（各棵树的首选都不同时只有最佳着法本身）
+        lines = [result for result in results if result[4] and result[4][0] == best]
+        line = max(lines, key=lambda result: result[0][best])[4] if lines else [best]
+        
+        elapsed = time.perf_counter() - start
+        self.total_playouts += total
+        self.total_time += elapsed
+        
+        positions = Position.index_table(board.size)
+        visit_sum = sum(visits.values())
+        distribution = tuple((positions[cell], visits[cell] / visit_sum)
+                             for cell in sorted(visits, key=visits.get, reverse=True))
+        score = round(1000 * (2 * wins[best] / visits[best] - 1))
+        result = SearchResult(positions[best], score, depth, total, elapsed,
+                              tuple(positions[cell] for cell in line), distribution)
+        logger.info(f"MCTS搜索完成: 最佳 ({result.position.row}, {result.position.col}), "
+                    f"访问比例 {distribution[0][1]:.1%}, 评分 {score}, 模拟 {total} 次, 进程 {len(results)}, "
+                    f"{total / elapsed if elapsed > 0 else 0:.0f} 次/秒, 复用访问 {self.last_reuse['reused_visits']} 次")
+        return result
+    
+    def _fallback_move(self, board: Board) -> int:
+        """没有任何模拟结果时使用的着法: 候选着法中的第一个（优先成五和封堵）"""
+        self._board = board
+        self._neighbours = self._neighbourhood(board.size, self.candidate_radius)
+        try:
+            return self._candidates()[0]
+        finally:
+            self._board = None
+    
+    def _search_parallel(self, board: Board, budget: float, playouts: Optional[int]) -> list:
+        """把搜索分发到工作进程，返回各进程的根节点统计"""
+        if playouts is not None and playouts <= 0:
+            return []
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        moves = tuple((cell, player.value) for cell, player in
+                      zip(board.move_history.cells, (player for player, _ in board.move_history)))
+        shares = [None] * self.workers
+        if playouts is not None:
+            # 每个进程至少一次模拟，模拟次数少于进程数时总数会略多于playouts
+            shares = [max(1, playouts // self.workers + (index < playouts % self.workers))
+                      for index in range(self.workers)]
+        search_id = self._next_search_id
+        self._next_search_id += 1
+        futures = [
+            self._executor.submit(MctsEngine._worker_search, board.settings, moves, board.current_player.value,
+                                  budget, shares[index], self.exploration, self.candidate_radius,
+                                  self._random.getrandbits(64), search_id)
+            for index in range(self.workers)
+        ]
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def _worker_search(settings: GameSettings, moves: Tuple[Tuple[int, int], ...], current_player: int,
+                       budget: float, playouts: Optional[int], exploration: float, candidate_radius: int,
+                       seed: int, search_id: int) -> tuple:
+        """工作进程入口: 重建棋盘，在本进程保留的树上继续建树"""
+        board = BoardFactory.create_board(settings)
+        for cell, player in moves:
+            board.current_player = Player(player)
+            board.push(cell)
+        board.current_player = Player(current_player)
+        engine = MctsEngine._worker_engine
+        if engine is None or engine.candidate_radius != candidate_radius:
+            engine = MctsEngine(workers=1, candidate_radius=candidate_radius)
+            MctsEngine._worker_engine = engine
+        elif engine._search_id == search_id:
+            # 本进程已经为这次搜索建过树，继续在上面模拟会把同一批访问重复计入合并结果
+            engine.reset_search_state()
+        engine._search_id = search_id
+        engine.exploration = exploration
+        engine._random.seed(seed)
+        return engine._search_tree(board, budget, playouts)
+    
+    def _search_tree(self, board: Board, budget: float, playouts: Optional[int]) -> tuple:
+        """
+        在棋盘上建树直到时间或模拟次数用尽（棋盘结束时恢复原状）
+        
+        Returns:
+            (根节点着法访问次数, 根节点着法胜场, 模拟次数, 最大深度, 主变例格子索引列表, 复用子树的访问次数)
+        """
+        deadline = time.perf_counter() + budget
+        self._board = board
+        self._neighbours = self._neighbourhood(board.size, self.candidate_radius)
+        self._max_depth = 0
+        root = self._reuse_root(board)
+        reused_visits = root.visits
+        
+        count = 0
+        while playouts is None or count < playouts:
+            # 至少完成一次模拟，保证根节点有可返回的着法
+            if count and time.perf_counter() > deadline:
+                break
+            with board.simulation():
+                self._simulate(root)
+            count += 1
+        self._board = None
+        self._root = root
+        
+        line = []
+        node = root
+        while node.children:
+            node = max(node.children, key=lambda child: child.visits)
+            line.append(node.move)
+        return ({child.move: child.visits for child in root.children},
+                {child.move: child.wins for child in root.children},
+                count, self._max_depth, line, reused_visits)
+    
+    def _reuse_root(self, board: Board) -> "MctsEngine._Node":
+        """局面是上次搜索的延续时沿走出的着法取出对应子树作为根节点，否则新建根节点"""
+        cells = list(board.move_history.cells)
+        last = self._root_cells
+        node = self._root
+        if node is not None and board.size == self._root_size and cells[:len(last)] == last:
+            for cell in cells[len(last):]:
+                node = next((child for child in node.children if child.move == cell), None)
+                if node is None:
+                    break
+        else:
+            node = None
+        self._root_cells = cells
+        self._root_size = board.size
+        if node is None or node.winner is not None or node.player == board.current_player:
+            return self._Node(-1, self._OPPONENTS[board.current_player.value], None)
+        # 断开与旧树的连接，使旧的根节点和其他分支可以被回收
+        node.parent = None
+        return node
+    
+    def _candidates(self) -> List[int]:
+        """生成扩展用的候选着法（随机顺序）"""
+        board = self._board
+        player = board.current_player
+        forced = board.winning_cell_indices(player) or board.winning_cell_indices(self._OPPONENTS[player.value])
+        if forced:
+            return sorted(forced)
+        free = board.free_mask
+        near = 0
+        neighbours = self._neighbours
+        for cell in board.move_history.cells:
+            for neighbour in neighbours[cell]:
+                near |= 1 << neighbour
+        bits = near & free or free
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(low.bit_length() - 1)
+            bits ^= low
+        self._random.shuffle(cells)
+        return cells
+    
+    def _simulate(self, root: "MctsEngine._Node"):
+        """一次模拟: 选择、扩展、快速走子、回传"""
+        board = self._board
+        node = root
+        depth = 0
+        # 选择: 节点已完全扩展时按UCT进入子节点
+        while node.winner is None:
+            if node.untried is None:
+                node.untried = self._candidates()
+            if node.untried:
+                # 扩展一个新的子节点
+                cell = node.untried.pop()
+                child = self._Node(cell, board.current_player, node)
+                if board.push(cell):
+                    child.winner = child.player
+                elif board.empty_count == 0:
+                    child.winner = Player.NONE
+                node.children.append(child)
+                node = child
+                depth += 1
+                break
+            log_visits = math.log(node.visits)
+            exploration = self.exploration
+            node = max(node.children, key=lambda child: child.wins / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            board.push(node.move)
+            depth += 1
+        if depth > self._max_depth:
+            self._max_depth = depth
+        
+        winner = node.winner if node.winner is not None else self._rollout()
+        # 回传
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1.0
+            elif winner == Player.NONE:
+                node.wins += 0.5
+            node = node.parent
+    
+    def _rollout(self) -> Player:
+        """快速走子到终局，返回胜者（和棋为Player.NONE）"""
+        board = self._board
+        rng = self._random
+        neighbours = self._neighbours
+        free = board.free_mask
+        
+        # 候选区: 已有棋子周围的空位，随机取出后与末尾交换删除
+        near = 0
+        for cell in board.move_history.cells:
+            for neighbour in neighbours[cell]:
+                near |= 1 << neighbour
+        bits = near & free
+        frontier = []
+        while bits:
+            low = bits & -bits
+            frontier.append(low.bit_length() - 1)
+            bits ^= low
+        seen = near
+        
+        while True:
+            player = board.current_player
+            wins = board.winning_cell_indices(player)
+            if wins:
+                return player
+            threats = board.winning_cell_indices(self._OPPONENTS[player.value])
+            if threats:
+                cell = min(threats)
+            else:
+                cell = -1
+                free = board.free_mask
+                while frontier:
+                    index = rng.randrange(len(frontier))
+                    candidate = frontier[index]
+                    frontier[index] = frontier[-1]
+                    frontier.pop()
+                    if free >> candidate & 1:
+                        cell = candidate
+                        break
+                if cell < 0:
+                    if not free:
+                        return Player.NONE
+                    # 候选区用尽时随机选择任一空位
+                    cell = rng.choice([index for index in range(board.size * board.size) if free >> index & 1])
+            if board.push(cell):
+                return player
+            for neighbour in neighbours[cell]:
+                if not seen >> neighbour & 1:
+                    seen |= 1 << neighbour
+                    frontier.append(neighbour)
@@ -0,0 +1,258 @@
+"""
+开局库
+以8种棋盘对称下的规范局面哈希为键，保存在按键排序的定长记录二进制文件中，通过mmap二分查找
+"""
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from python.core.Board import Board
+from python.core.ZobristTable import ZobristTable
+from python.models.GameModels import BookMove, Player, Position
+from python.util.Logger import logger
+
+
+class OpeningBook:
+    """开局库类
+    
+    文件由一个文件头和若干条按(键, 着法)升序排列的定长记录组成，每条记录保存一个规范局面下
+    一个着法的对局数和得分。打开时只映射文件不读取内容，查询对记录做二分查找，
+    因此启动开销和内存占用都与开局库大小无关，只有实际访问到的页面会被读入。
+    
+    规范局面: 对当前局面分别做8种对称变换（旋转和翻转）计算Zobrist哈希，取最小值作为键，
+    记录中的着法也以对应变换后的格子索引保存，查询时再变换回原局面的坐标。
+    白方走棋时键额外异或一个常数，以区分落子数相同但轮到不同玩家的局面。
+    """
+    
+    # 文件头: 魔数, 格式版本, 棋盘大小, 获胜连子数, 收录的最大步数, 记录数
+    HEADER = struct.Struct("<4sHHHHQ")
+    # 记录: 规范局面键, 规范坐标下的着法格子索引, 保留, 对局数, 得分（半分制: 胜2和1负0）
+    RECORD = struct.Struct("<QHHII")
+    MAGIC = b"GMKB"
+    FORMAT_VERSION = 1
+    
+    # 白方走棋时异或到键上的常数
+    WHITE_TO_MOVE = 0x9E37_79B9_7F4A_7C15
+    
+    # 默认开局库目录（项目根目录下的.cache/books）
+    BOOK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            ".cache", "books")
+    
+    # 按棋盘大小缓存的对称变换表: (正变换, 逆变换)，每个都是8个格子索引置换
+    _symmetries: Dict[int, Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...]]] = {}
+    
+    _KEY = struct.Struct("<Q")
+    
+    def __init__(self, path: str):
+        """
+        打开开局库
+        
+        Args:
+            path: 开局库文件路径
+        
+        Raises:
+            ValueError: 文件格式不正确
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"开局库文件为空: {path}")
+        if len(self._mmap) < self.HEADER.size:
+            self.close()
+            raise ValueError(f"开局库文件过短: {path}")
+        magic, version, self.board_size, self.win_count, self.max_plies, self.record_count = \
+            self.HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC or version != self.FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不支持的开局库格式: {path}")
+        if len(self._mmap) < self.HEADER.size + self.record_count * self.RECORD.size:
+            self.close()
+            raise ValueError(f"开局库文件不完整: {path}")
+    
+    @classmethod
+    def default_path(cls, board_size: int = 15, win_count: int = 5) -> str:
+        """获取指定规则的默认开局库路径"""
+        return os.path.join(cls.BOOK_DIR, f"opening_s{board_size}_k{win_count}_v{cls.FORMAT_VERSION}.bin")
+    
+    @classmethod
+    def open_default(cls, board_size: int = 15, win_count: int = 5) -> Optional["OpeningBook"]:
+        """
+        打开默认开局库
+        
+        Returns:
+            开局库，文件不存在或无法使用时返回None
+        """
+        return cls.open_optional(cls.default_path(board_size, win_count))
+    
+    @classmethod
+    def open_optional(cls, path: str) -> Optional["OpeningBook"]:
+        """
+        打开可选的开局库: 文件不存在时静默返回None，文件无法读取或格式不正确时记录警告后返回None
+        
+        Args:
+            path: 开局库文件路径
+        
+        Returns:
+            开局库或None
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            book = cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"无法使用开局库 {path}: {e}")
+            return None
+        logger.info(f"已打开开局库 {path}: {book.record_count} 条记录")
+        return book
+    
+    def close(self):
+        """关闭文件映射"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self) -> int:
+        return self.record_count
+    
+    @classmethod
+    def symmetries(cls, size: int) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...]]:
+        """
+        获取棋盘的8种对称变换
+        
+        Returns:
+            (正变换, 逆变换)，transforms[i][cell]为cell在第i种变换下的格子索引，inverses[i]为其逆置换
+        """
+        table = cls._symmetries.get(size)
+        if table is None:
+            last = size - 1
+            maps = (
+                lambda r, c: (r, c),
+                lambda r, c: (c, last - r),
+                lambda r, c: (last - r, last - c),
+                lambda r, c: (last - c, r),
+                lambda r, c: (r, last - c),
+                lambda r, c: (last - r, c),
+                lambda r, c: (c, r),
+                lambda r, c: (last - c, last - r),
+            )
+            transforms = []
+            inverses = []
+            for transform in maps:
+                forward = [0] * (size * size)
+                for cell in range(size * size):
+                    row, col = transform(*divmod(cell, size))
+                    forward[cell] = row * size + col
+                inverse = [0] * (size * size)
+                for cell, target in enumerate(forward):
+                    inverse[target] = cell
+                transforms.append(tuple(forward))
+                inverses.append(tuple(inverse))
+            table = (tuple(transforms), tuple(inverses))
+            cls._symmetries[size] = table
+        return table
+    
+    @classmethod
+    def canonical_key(cls, board: Board) -> Tuple[int, int]:
+        """
+        计算局面的规范键
+        
+        Args:
+            board: 棋盘
+        
+        Returns:
+            (规范键, 取得该键的对称变换编号)
+        """
+        transforms = cls.symmetries(board.size)[0]
+        keys = ZobristTable.for_size(board.size).keys
+        stones = [(keys[player.value], position.to_index(board.size)) for player, position in board.move_history]
+        side = cls.WHITE_TO_MOVE if board.current_player == Player.WHITE else 0
+        best_key, best_index = -1, 0
+        for index, transform in enumerate(transforms):
+            key = side
+            for player_keys, cell in stones:
+                key ^= player_keys[transform[cell]]
+            if best_key < 0 or key < best_key:
+                best_key, best_index = key, index
+        return best_key, best_index
+    
+    def _key_at(self, index: int) -> int:
+        """读取第index条记录的键"""
+        return self._KEY.unpack_from(self._mmap, self.HEADER.size + index * self.RECORD.size)[0]
+    
+    def probe(self, board: Board) -> List[BookMove]:
+        """
+        查询当前局面的开局库着法
+        
+        Args:
+            board: 棋盘
+        
+        Returns:
+            按对局数降序排列的着法，局面不在开局库中时返回空列表
+        """
+        if (board.size != self.board_size or board.win_count != self.win_count
+                or len(board.move_history) >= self.max_plies or not self.record_count):
+            return []
+        key, symmetry = self.canonical_key(board)
+        
+        # 二分查找第一条键不小于key的记录
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        
+        inverse = self.symmetries(self.board_size)[1][symmetry]
+        positions = Position.index_table(self.board_size)
+        moves = []
+        record = self.RECORD
+        offset = self.HEADER.size + low * record.size
+        end = self.HEADER.size + self.record_count * record.size
+        while offset < end:
+            record_key, move, _, games, points = record.unpack_from(self._mmap, offset)
+            if record_key != key:
+                break
+            if games:
+                moves.append(BookMove(positions[inverse[move]], games, points / (2 * games)))
+            offset += record.size
+        moves.sort(key=lambda book_move: book_move.games, reverse=True)
+        return moves
+    
+    def best_move(self, board: Board, min_games: int = 4) -> Optional[BookMove]:
+        """
+        获取当前局面得分最高的开局库着法
+        
+        Args:
+            board: 棋盘
+            min_games: 着法至少需要的对局数，对局数更少的着法统计不可靠，不予采用
+        
+        Returns:
+            着法，没有满足条件的着法时返回None
+        """
+        candidates = [book_move for book_move in self.probe(board) if book_move.games >= min_games]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda book_move: (book_move.score, book_move.games))
+    
+    def records(self) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        按文件顺序遍历所有记录
+        
+        Yields:
+            (规范局面键, 规范坐标下的着法格子索引, 对局数, 得分（半分制）)
+        """
+        for key, move, _, games, points in self.RECORD.iter_unpack(
+                self._mmap[self.HEADER.size:self.HEADER.size + self.record_count * self.RECORD.size]):
+            yield key, move, games, points
@@ -0,0 +1,152 @@
+"""
+开局库生成器
+从对局记录或引擎自对弈中统计前若干步的着法胜负，生成或扩充开局库文件
+
+运行方式（在项目根目录）:
+    python -m python.engine.OpeningBookBuilder
+"""
+import logging
+import os
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.OpeningBook import OpeningBook
+from python.models.GameModels import GameSettings, Player, Position
+from python.util.Logger import logger
+
+
+class OpeningBookBuilder:
+    """开局库生成器类
+    
+    统计保存在内存中，键为(规范局面键, 规范坐标下的着法)。每局对局只统计前max_plies步，
+    每一步为走棋一方记一局并按最终结果计分。write按键排序后原子地写出文件，
+    load可以先读入已有的开局库，从而在其基础上继续扩充。
+    """
+    
+    def __init__(self, settings: Optional[GameSettings] = None, max_plies: int = 12):
+        """
+        初始化生成器
+        
+        Args:
+            settings: 游戏设置（只使用棋盘大小和获胜连子数），为None时使用默认设置
+            max_plies: 每局统计的最大步数
+        """
+        settings = settings or GameSettings()
+        self.settings = GameSettings(board_size=settings.board_size, win_count=settings.win_count)
+        self.max_plies = max_plies
+        self.games = 0
+        # (规范局面键, 规范着法) -> [对局数, 得分（半分制）]
+        self._stats: Dict[Tuple[int, int], List[int]] = {}
+        self._board = BoardFactory.create_board(self.settings)
+    
+    def __len__(self) -> int:
+        return len(self._stats)
+    
+    def load(self, path: str):
+        """
+        合并已有开局库中的统计
+        
+        Args:
+            path: 开局库文件路径
+        
+        Raises:
+            ValueError: 开局库的棋盘规则与生成器不一致
+        """
+        with OpeningBook(path) as book:
+            if book.board_size != self.settings.board_size or book.win_count != self.settings.win_count:
+                raise ValueError(f"开局库规则不一致: {book.board_size}x{book.board_size}, 获胜连子数 {book.win_count}")
+            for key, move, games, points in book.records():
+                entry = self._stats.setdefault((key, move), [0, 0])
+                entry[0] += games
+                entry[1] += points
+        logger.info(f"已合并开局库 {path}: {len(self._stats)} 条记录")
+    
+    def add_game(self, moves: Sequence[Position], winner: Player):
+        """
+        统计一局对局
+        
+        Args:
+            moves: 按顺序的落子位置（黑方先手，双方交替）
+            winner: 胜者，和棋为Player.NONE
+        """
+        board = self._board
+        board.reset()
+        transforms = OpeningBook.symmetries(board.size)[0]
+        for position in moves[:self.max_plies]:
+            player = board.current_player
+            key, symmetry = OpeningBook.canonical_key(board)
+            cell = position.to_index(board.size)
+            entry = self._stats.setdefault((key, transforms[symmetry][cell]), [0, 0])
+            entry[0] += 1
+            entry[1] += 2 if winner == player else 1 if winner == Player.NONE else 0
+            if board.push(cell):
+                break
+        self.games += 1
+    
+    def add_self_play(self, engine, games: int, random_plies: int = 4, seed: Optional[int] = None):
+        """
+        用引擎自对弈生成对局并统计
+        
+        Args:
+            engine: 提供search(board)的引擎
+            games: 对局数
+            random_plies: 每局开头在中心区域随机落子的步数，使对局分散到不同开局
+            seed: 随机种子
+        """
+        rng = random.Random(seed)
+        board = BoardFactory.create_board(self.settings)
+        center = board.size // 2
+        for game in range(games):
+            board.reset()
+            while not board.is_game_over and board.empty_count:
+                if len(board.move_history) < random_plies:
+                    free = [position for position in board.get_available_moves()
+                            if abs(position.row - center) <= 2 and abs(position.col - center) <= 2]
+                    position = rng.choice(free)
+                else:
+                    position = engine.search(board).position
+                board.make_move(position.row, position.col)
+            self.add_game([position for _, position in board.move_history], board.winner)
+            logger.info(f"自对弈 {game + 1}/{games}: {len(board.move_history)} 步, 胜者 {board.winner.name}")
+    
+    def write(self, path: Optional[str] = None) -> str:
+        """
+        写出开局库文件（先写临时文件再替换，读取中的旧文件不受影响）
+        
+        Args:
+            path: 输出路径，为None时写到默认开局库路径
+        
+        Returns:
+            实际写出的路径
+        """
+        path = path or OpeningBook.default_path(self.settings.board_size, self.settings.win_count)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        record = OpeningBook.RECORD
+        with open(temp_path, "wb") as f:
+            f.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.FORMAT_VERSION, self.settings.board_size,
+                                            self.settings.win_count, self.max_plies, len(self._stats)))
+            for (key, move), (games, points) in sorted(self._stats.items()):
+                f.write(record.pack(key, move, 0, min(games, 0xFFFF_FFFF), min(points, 0xFFFF_FFFF)))
+        os.replace(temp_path, path)
+        logger.info(f"开局库已写出 {path}: {len(self._stats)} 条记录, 累计 {self.games} 局")
+        return path
+
+
+def main():
+    """用AlphaBetaEngine自对弈扩充默认开局库"""
+    logger.get_logger().setLevel(logging.WARNING)
+    builder = OpeningBookBuilder()
+    path = OpeningBook.default_path()
+    if os.path.exists(path):
+        builder.load(path)
+    builder.add_self_play(AlphaBetaEngine(time_limit=0.2), games=50)
+    print(f"开局库 {builder.write(path)}: {len(builder)} 条记录")
+
+
+if __name__ == "__main__":
+    main()
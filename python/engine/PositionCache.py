@@ -0,0 +1,347 @@
+"""
+持久化局面结果缓存
+把已证明的胜负和深度搜索的结果追加写入日志文件，重启后重建索引继续使用
+"""
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Optional
+
+from python.core.Board import Board
+from python.engine.OpeningBook import OpeningBook
+from python.models.GameModels import Position, SearchResult
+from python.util.Logger import logger
+
+
+class PositionCache:
+    """持久化局面结果缓存类
+    
+    键为规范局面哈希（与开局库相同的8种对称规范化）加上棋盘大小和获胜连子数，
+    值为最佳着法（规范坐标）、分值、完成深度和是否已证明胜负。
+    
+    存储为只追加的日志: 每条记录定长并带CRC校验，启动时顺序扫描日志重建内存索引
+    （键 -> 记录偏移），遇到写了一半的尾部记录时截断。同一局面再次写入只追加新记录，
+    旧记录成为垃圾；条目数超过max_entries时按最近最少使用的顺序从索引中淘汰。
+    日志中的垃圾记录超过有效记录的compact_ratio倍时，在后台线程中把有效记录按LRU顺序
+    重写到新文件再原子替换，压缩期间的读写不受影响。
+    
+    写入和压缩由同一把锁保护，可以在多个线程中使用；不支持多个进程同时写同一个文件，
+    同时运行的进程（如窗口的引擎工作进程和MCP服务器）应通过default_path(name)各用一个文件。
+    """
+    
+    # 日志文件头: 魔数, 格式版本
+    HEADER = struct.Struct("<4sI")
+    # 记录: 规范局面键, 棋盘大小, 获胜连子数, 规范坐标下的着法（0xFFFF表示没有）, 深度, 是否已证明, 分值, CRC
+    RECORD = struct.Struct("<QBBHHBxiI")
+    MAGIC = b"GMKC"
+    FORMAT_VERSION = 1
+    NO_MOVE = 0xFFFF
+    
+    # 默认缓存目录（项目根目录下的.cache/positions）
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             ".cache", "positions")
+    
+    # 日志记录少于此数时不压缩
+    MIN_COMPACT_RECORDS = 1024
+    # 启动时每次读入的字节数
+    _SCAN_CHUNK = RECORD.size * 65536
+    
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1_000_000, compact_ratio: float = 2.0,
+                 background: bool = True):
+        """
+        打开缓存（文件不存在时新建）
+        
+        Args:
+            path: 日志文件路径，为None时使用默认路径
+            max_entries: 最多保留的局面数
+            compact_ratio: 日志记录数超过有效条目数的多少倍时触发压缩
+            background: 是否在后台线程中压缩，为False时在写入的线程中同步压缩
+        """
+        self.path = path or self.default_path()
+        self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
+        self.background = background
+        
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.compactions = 0
+        
+        # 索引键 -> 记录在日志中的偏移，字典顺序即LRU顺序（最近使用的在末尾）
+        self._index: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._record_count = 0
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._open()
+    
+    @classmethod
+    def default_path(cls, name: str = "positions") -> str:
+        """获取默认缓存目录下指定名称的日志路径（不同进程应使用不同的名称）"""
+        return os.path.join(cls.CACHE_DIR, f"{name}_v{cls.FORMAT_VERSION}.log")
+    
+    @classmethod
+    def open_default(cls, name: str = "positions", **options) -> Optional["PositionCache"]:
+        """
+        打开默认缓存目录下的缓存
+        
+        Args:
+            name: 缓存名称，同时运行的进程各用一个名称
+            options: 其他构造参数
+        
+        Returns:
+            缓存，无法打开时返回None
+        """
+        return cls.open_optional(cls.default_path(name), **options)
+    
+    @classmethod
+    def open_optional(cls, path: str, **options) -> Optional["PositionCache"]:
+        """
+        打开可选的缓存: 目录无法创建、文件无法读写或格式不正确时记录警告后返回None
+        
+        Args:
+            path: 日志文件路径
+            options: 其他构造参数
+        
+        Returns:
+            缓存或None
+        """
+        try:
+            return cls(path, **options)
+        except (OSError, ValueError) as e:
+            logger.warning(f"无法使用局面缓存 {path}: {e}")
+            return None
+    
+    def _open(self):
+        """打开日志并重建索引"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.HEADER.size:
+            with open(self.path, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION))
+        self._log = open(self.path, "r+b")
+        magic, version = self.HEADER.unpack(self._log.read(self.HEADER.size))
+        if magic != self.MAGIC or version != self.FORMAT_VERSION:
+            self._log.close()
+            raise ValueError(f"不支持的局面缓存格式: {self.path}")
+        
+        record = self.RECORD
+        body_size = record.size - 4
+        offset = self.HEADER.size
+        index: Dict[int, int] = {}
+        count = 0
+        while True:
+            chunk = self._log.read(self._SCAN_CHUNK)
+            usable = len(chunk) - len(chunk) % record.size
+            valid = True
+            for start in range(0, usable, record.size):
+                key, size, win_count, _, _, _, _, crc = record.unpack_from(chunk, start)
+                if zlib.crc32(chunk[start:start + body_size]) != crc:
+                    valid = False
+                    break
+                index_key = self._index_key(key, size, win_count)
+                index.pop(index_key, None)
+                index[index_key] = offset
+                offset += record.size
+                count += 1
+            if not valid or usable < len(chunk) or len(chunk) < self._SCAN_CHUNK:
+                break
+        # 截断写了一半或校验失败的尾部
+        self._log.truncate(offset)
+        self._log.seek(offset)
+        self._index = index
+        self._record_count = count
+        self._evict()
+        logger.info(f"局面缓存已加载 {self.path}: {len(self._index)} 个局面, {count} 条日志记录")
+    
+    @staticmethod
+    def _index_key(key: int, size: int, win_count: int) -> int:
+        """把规范局面键和棋盘规则合成一个索引键"""
+        return key ^ (size << 56) ^ (win_count << 48)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def close(self):
+        """等待后台压缩结束并关闭日志"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            if not self._log.closed:
+                self._log.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _read(self, offset: int) -> tuple:
+        """读取指定偏移的记录（调用方持有锁）"""
+        self._log.seek(offset)
+        return self.RECORD.unpack(self._log.read(self.RECORD.size))
+    
+    def get(self, board: Board) -> Optional[SearchResult]:
+        """
+        查询局面
+        
+        Args:
+            board: 棋盘
+        
+        Returns:
+            命中时返回缓存的结果（position已换算回当前局面的坐标，nodes和elapsed为0），否则返回None
+        """
+        key, symmetry = OpeningBook.canonical_key(board)
+        index_key = self._index_key(key, board.size, board.win_count)
+        with self._lock:
+            offset = self._index.pop(index_key, None)
+            if offset is None:
+                self.misses += 1
+                return None
+            self._index[index_key] = offset
+            record_key, size, win_count, move, depth, _, score, _ = self._read(offset)
+        if (record_key, size, win_count) != (key, board.size, board.win_count):
+            self.misses += 1
+            return None
+        self.hits += 1
+        position = None
+        if move != self.NO_MOVE:
+            inverse = OpeningBook.symmetries(board.size)[1][symmetry]
+            position = Position.index_table(board.size)[inverse[move]]
+        return SearchResult(position, score, depth, 0, 0.0, (position,) if position is not None else ())
+    
+    def put(self, board: Board, position: Optional[Position], score: int, depth: int, proven: bool = False):
+        """
+        写入局面结果（已有更深或已证明的结果时忽略）
+        
+        Args:
+            board: 棋盘
+            position: 最佳着法
+            score: 分值
+            depth: 完成的搜索深度
+            proven: 分值是否为已证明的胜负
+        """
+        key, symmetry = OpeningBook.canonical_key(board)
+        index_key = self._index_key(key, board.size, board.win_count)
+        move = self.NO_MOVE
+        if position is not None:
+            move = OpeningBook.symmetries(board.size)[0][symmetry][position.to_index(board.size)]
+        body = self.RECORD.pack(key, board.size, board.win_count, move, min(depth, 0xFFFF), proven, score, 0)[:-4]
+        data = body + struct.pack("<I", zlib.crc32(body))
+        
+        with self._lock:
+            offset = self._index.get(index_key)
+            if offset is not None:
+                old = self._read(offset)
+                old_proven, old_depth = old[5], old[4]
+                if old[:3] == (key, board.size, board.win_count) and (old_proven > proven
+                                                                      or old_proven == proven and old_depth > depth):
+                    return
+            offset = self._log.seek(0, os.SEEK_END)
+            self._log.write(data)
+            self._log.flush()
+            self._index.pop(index_key, None)
+            self._index[index_key] = offset
+            self._record_count += 1
+            self.writes += 1
+            self._evict()
+            if (self._record_count >= self.MIN_COMPACT_RECORDS
+                    and self._record_count > self.compact_ratio * len(self._index)):
+                self._start_compaction()
+    
+    def _evict(self):
+        """淘汰最久未使用的局面直到不超过上限（调用方持有锁或在初始化中）"""
+        while len(self._index) > self.max_entries:
+            del self._index[next(iter(self._index))]
+            self.evictions += 1
+    
+    def _start_compaction(self):
+        """启动压缩（调用方持有锁）"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if not self.background:
+            self.compact()
+            return
+        self._compactor = threading.Thread(target=self.compact, name="PositionCacheCompactor", daemon=True)
+        self._compactor.start()
+    
+    def compact(self):
+        """
+        压缩日志: 按LRU顺序重写有效记录并原子替换日志文件
+        
+        只在开始和结束时短暂持有锁，中间复制记录时其他线程仍可读写；
+        期间追加的记录在替换前整体复制到新文件末尾。
+        """
+        with self._lock:
+            if self._log.closed:
+                return
+            snapshot = list(self._index.items())
+            snapshot_end = self._log.seek(0, os.SEEK_END)
+            source = open(self.path, "rb")
+        
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        record_size = self.RECORD.size
+        moved: Dict[int, int] = {}
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION))
+                offset = self.HEADER.size
+                for index_key, old_offset in snapshot:
+                    source.seek(old_offset)
+                    f.write(source.read(record_size))
+                    moved[old_offset] = offset
+                    offset += record_size
+                
+                with self._lock:
+                    # 复制压缩期间追加的记录，并按当前的索引（含其间的读写和淘汰）重建偏移
+                    end = self._log.seek(0, os.SEEK_END)
+                    tail_base = offset
+                    if end > snapshot_end:
+                        source.seek(snapshot_end)
+                        f.write(source.read(end - snapshot_end))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    index = {}
+                    for index_key, old_offset in self._index.items():
+                        if old_offset >= snapshot_end:
+                            index[index_key] = tail_base + old_offset - snapshot_end
+                        elif old_offset in moved:
+                            index[index_key] = moved[old_offset]
+                    # 替换前关闭旧文件的所有句柄（Windows不能替换打开中的文件）
+                    source.close()
+                    self._log.close()
+                    os.replace(temp_path, self.path)
+                    self._log = open(self.path, "r+b")
+                    self._log.seek(0, os.SEEK_END)
+                    self._index = index
+                    self._record_count = len(snapshot) + (end - snapshot_end) // record_size
+                    self.compactions += 1
+        finally:
+            source.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        logger.info(f"局面缓存已压缩: {len(snapshot)} 个局面")
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        获取统计信息
+        
+        Returns:
+            entries、hits、misses、hit_rate、writes、evictions、compactions和log_records
+        """
+        probes = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+            "log_records": self._record_count,
+        }
@@ -0,0 +1,192 @@
+"""
+威胁空间搜索
+只搜索冲四（VCF）或冲四与活三（VCT）的连续攻击，判断当前玩家是否存在强制获胜的着法序列
+"""
+import time
+from typing import Dict, List, Optional
+
+from python.core.Board import Board
+from python.models.GameModels import PatternShape, Player, Position
+
+
+class ThreatSolver:
+    """威胁空间搜索类
+    
+    进攻方（当前玩家）每一手都必须是威胁: VCF只允许冲四，VCT还允许活三。
+    防守方面对冲四只能封堵成五点；面对活三时可以封堵进攻方差两子的窗口中的任一空位，
+    或者走出自己的冲四反击。进攻方必须对所有防守都能继续取胜才算找到强制获胜序列。
+    
+    搜索通过push/pop在传入的棋盘上进行，返回前棋盘恢复原状；VCT需要棋型评估器判断活三，
+    棋盘没有挂载评估器时会临时挂载并在结束时卸载。因此不要对其他线程正在读取的棋盘直接求解，
+    应先调用Board.clone()。
+    """
+    
+    VCF = "vcf"
+    VCT = "vct"
+    
+    # 按player.value索引的对手
+    _OPPONENTS = (Player.NONE, Player.WHITE, Player.BLACK)
+    
+    class _BudgetExceeded(Exception):
+        """节点预算用尽"""
+    
+    def __init__(self, node_budget: int = 20000, max_depth: int = 16):
+        """
+        初始化求解器
+        
+        Args:
+            node_budget: 每次求解最多访问的节点数
+            max_depth: 最大搜索层数（进攻和防守各算一层）
+        """
+        self.node_budget = node_budget
+        self.max_depth = max_depth
+        
+        # 最近一次求解的统计
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.budget_exhausted = False
+        
+        self._board: Optional[Board] = None
+        self._attacker = Player.NONE
+        self._defender = Player.NONE
+        self._mode = self.VCF
+        # 已证明进攻方无法强制获胜的局面哈希 -> 证明时的剩余层数
+        self._failed: Dict[int, int] = {}
+    
+    def find_vcf(self, board: Board) -> Optional[List[Position]]:
+        """查找连续冲四获胜序列，见solve"""
+        return self.solve(board, self.VCF)
+    
+    def find_vct(self, board: Board) -> Optional[List[Position]]:
+        """查找连续冲四、活三获胜序列，见solve"""
+        return self.solve(board, self.VCT)
+    
+    def solve(self, board: Board, mode: str = VCF) -> Optional[List[Position]]:
+        """
+        为当前玩家查找强制获胜序列
+        
+        Args:
+            board: 棋盘（求解结束后恢复原状）
+            mode: ThreatSolver.VCF 或 ThreatSolver.VCT
+        
+        Returns:
+            进攻方与防守方交替的着法序列（以进攻方成五结束），
+            不存在或超出节点预算时返回None（后者budget_exhausted为True）
+        """
+        if mode not in (self.VCF, self.VCT):
+            raise ValueError(f"不支持的求解模式: {mode}")
+        start = time.perf_counter()
+        self.nodes = 0
+        self.budget_exhausted = False
+        self._failed = {}
+        self._board = board
+        self._mode = mode
+        self._attacker = board.current_player
+        self._defender = self._OPPONENTS[self._attacker.value]
+        
+        attached = mode == self.VCT and board.evaluator is None
+        if attached:
+            board.attach_evaluator()
+        depth = len(board.move_history)
+        line = None
+        try:
+            # 迭代加深: 先找最短的获胜序列，避免在很深的无效分支中耗尽预算
+            for max_depth in range(1, self.max_depth + 1, 2):
+                if board.is_game_over:
+                    break
+                line = self._attack(max_depth)
+                if line is not None:
+                    break
+        except self._BudgetExceeded:
+            self.budget_exhausted = True
+        finally:
+            while len(board.move_history) > depth:
+                board.pop()
+            if attached:
+                board.detach_evaluator()
+            self._board = None
+            self.elapsed = time.perf_counter() - start
+        
+        if line is None:
+            return None
+        positions = Position.index_table(board.size)
+        return [positions[cell] for cell in line]
+    
+    def _count_node(self):
+        """计数并检查节点预算"""
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise self._BudgetExceeded()
+    
+    def _attack_moves(self, defender_wins: set) -> List[int]:
+        """生成进攻方的威胁着法: 冲四在前，VCT模式下再加上活三"""
+        board = self._board
+        attacker = self._attacker
+        fours = board.live_window_cells(attacker, board.win_count - 2)
+        if defender_wins:
+            # 对方已有冲四时只能封堵，且封堵本身必须是冲四才能保持先手
+            return sorted(defender_wins & fours)
+        moves = sorted(fours)
+        if self._mode == self.VCT:
+            evaluator = board.evaluator
+            threes = [cell for cell in board.live_window_cells(attacker, board.win_count - 3) - fours
+                      if max(evaluator.move_shapes(cell, attacker)) >= PatternShape.OPEN_THREE]
+            # 同时形成多个威胁的着法最先尝试
+            threes.sort(key=lambda cell: evaluator.move_score(cell, attacker), reverse=True)
+            moves.extend(threes)
+        return moves
+    
+    def _attack(self, depth: int) -> Optional[List[int]]:
+        """进攻方走棋，返回获胜序列或None"""
+        self._count_node()
+        board = self._board
+        wins = board.winning_cell_indices(self._attacker)
+        if wins:
+            return [min(wins)]
+        defender_wins = board.winning_cell_indices(self._defender)
+        if len(defender_wins) >= 2 or depth <= 0 or board.empty_count == 0:
+            return None
+        key = board.zobrist_hash
+        if self._failed.get(key, -1) >= depth:
+            return None
+        
+        for cell in self._attack_moves(defender_wins):
+            board.push(cell)
+            line = self._defend(depth - 1)
+            board.pop()
+            if line is not None:
+                return [cell] + line
+        self._failed[key] = depth
+        return None
+    
+    def _defend(self, depth: int) -> Optional[List[int]]:
+        """防守方应对，进攻方对所有防守都能获胜时返回其中一条序列，否则返回None"""
+        self._count_node()
+        board = self._board
+        if board.winning_cell_indices(self._defender):
+            # 防守方可以直接成五
+            return None
+        threats = board.winning_cell_indices(self._attacker)
+        if len(threats) >= 2:
+            # 活四或双四，无法同时封堵: 封堵其中一点，进攻方在另一点成五
+            first, second = sorted(threats)[:2]
+            return [first, second]
+        if threats:
+            defenses = threats
+        else:
+            # 活三: 封堵进攻方差两子窗口中的空位，或者以冲四反击
+            attacker_threes = board.live_window_cells(self._attacker, board.win_count - 2)
+            if not attacker_threes:
+                return None
+            defenses = attacker_threes | board.live_window_cells(self._defender, board.win_count - 2)
+        
+        principal = None
+        for cell in sorted(defenses):
+            board.push(cell)
+            line = self._attack(depth - 1)
+            board.pop()
+            if line is None:
+                return None
+            if principal is None:
+                principal = [cell] + line
+        return principal
@@ -0,0 +1,219 @@
+"""
+置换表
+以局面哈希为键缓存搜索结果，使用预分配的并行数组存储，容量由内存上限决定
+"""
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+
+class TranspositionTable:
+    """置换表类
+    
+    每个条目占两个64位整数: data为打包后的(着法, 深度, 边界类型, 世代, 分值)，
+    check为 key ^ data。读取时只有 check ^ data == key 才视为命中，
+    这样条目的两个字在并发写入时被撕裂也只会表现为未命中。
+    
+    条目按两个一组分桶: 第0槽深度优先，只有更深、同一局面或已过期时才替换；
+    否则写入第1槽（总是替换）。每次新搜索开始时调用new_search递增世代，
+    旧世代的条目在深度优先槽中也可以被直接替换。
+    
+    shared为True时条目放在multiprocessing.shared_memory中，供多个进程同时读写。
+    写入不加锁，依靠上面的异或校验丢弃被撕裂的条目；统计计数和世代仍是每个进程各自的。
+    创建共享表的进程负责调用unlink()释放共享内存，其他进程用name附加并在结束时调用close()。
+    """
+    
+    # 边界类型（0表示空条目）
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+    
+    # 每个条目占用的字节数（两个64位整数）
+    ENTRY_BYTES = 16
+    # 每个桶的条目数
+    BUCKET_SIZE = 2
+    
+    # data中各字段的位置和宽度: 着法+1(16位) | 深度(8位) | 边界(2位) | 世代(8位) | 分值(30位)
+    _DEPTH_SHIFT = 16
+    _BOUND_SHIFT = 24
+    _GENERATION_SHIFT = 26
+    _SCORE_SHIFT = 34
+    _SCORE_OFFSET = 1 << 29
+    _MASK64 = (1 << 64) - 1
+    
+    def __init__(self, size_mb: float = 16, shared: bool = False, name: Optional[str] = None):
+        """
+        初始化置换表
+        
+        Args:
+            size_mb: 内存上限（MB），实际桶数为不超过上限的最大2的幂
+            shared: 是否把条目放在共享内存中
+            name: 要附加的已有共享内存名称（附加时size_mb必须与创建时相同），为None时新建
+        """
+        if size_mb <= 0:
+            raise ValueError("置换表大小必须为正数")
+        bucket_bytes = self.ENTRY_BYTES * self.BUCKET_SIZE
+        bucket_count = 1
+        while bucket_count * 2 * bucket_bytes <= size_mb * 1024 * 1024:
+            bucket_count *= 2
+        self.bucket_count = bucket_count
+        self.capacity = bucket_count * self.BUCKET_SIZE
+        self._bucket_mask = bucket_count - 1
+        
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._views: Tuple[memoryview, ...] = ()
+        if shared:
+            if name is None:
+                self._shm = shared_memory.SharedMemory(create=True, size=self.size_bytes)
+                self._shm.buf[:] = bytes(self.size_bytes)
+            else:
+                self._shm = shared_memory.SharedMemory(name=name)
+                if self._shm.size < self.size_bytes:
+                    self._shm.close()
+                    raise ValueError(f"共享内存 {name} 小于置换表所需的 {self.size_bytes} 字节")
+            words = self._shm.buf[:self.size_bytes].cast("Q")
+            self._checks = words[:self.capacity]
+            self._data = words[self.capacity:]
+            # 关闭共享内存前必须释放所有视图
+            self._views = (self._data, self._checks, words)
+        else:
+            self._checks = array("Q", bytes(8 * self.capacity))
+            self._data = array("Q", bytes(8 * self.capacity))
+        self.generation = 0
+        
+        # 统计计数
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+    
+    @property
+    def size_bytes(self) -> int:
+        """实际占用的条目内存（字节）"""
+        return self.capacity * self.ENTRY_BYTES
+    
+    @property
+    def name(self) -> Optional[str]:
+        """共享内存名称，不是共享表时为None"""
+        return self._shm.name if self._shm is not None else None
+    
+    def close(self):
+        """断开与共享内存的连接（不是共享表时无操作）"""
+        if self._shm is not None:
+            for view in self._views:
+                view.release()
+            self._views = ()
+            self._checks = self._data = array("Q")
+            self._shm.close()
+            self._shm = None
+    
+    def unlink(self):
+        """断开并释放共享内存（由创建共享表的进程调用）"""
+        if self._shm is not None:
+            shm = self._shm
+            self.close()
+            shm.unlink()
+    
+    def new_search(self):
+        """开始新的一次搜索（递增世代，旧条目变为可替换）"""
+        self.generation = (self.generation + 1) & 0xFF
+    
+    def clear(self):
+        """清空所有条目和统计"""
+        if self._shm is not None:
+            self._shm.buf[:self.size_bytes] = bytes(self.size_bytes)
+        else:
+            self._checks = array("Q", bytes(8 * self.capacity))
+            self._data = array("Q", bytes(8 * self.capacity))
+        self.generation = 0
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """清零统计计数"""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+    
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        查询局面
+        
+        Args:
+            key: 64位局面哈希
+        
+        Returns:
+            命中时返回(深度, 边界类型, 分值, 最佳着法格子索引或-1)，否则返回None
+        """
+        self.probes += 1
+        slot = (key & self._bucket_mask) << 1
+        data = self._data[slot]
+        if self._checks[slot] ^ data != key or not data:
+            slot += 1
+            data = self._data[slot]
+            if self._checks[slot] ^ data != key or not data:
+                return None
+        self.hits += 1
+        return (
+            (data >> self._DEPTH_SHIFT) & 0xFF,
+            (data >> self._BOUND_SHIFT) & 0x3,
+            (data >> self._SCORE_SHIFT) - self._SCORE_OFFSET,
+            (data & 0xFFFF) - 1,
+        )
+    
+    def store(self, key: int, depth: int, bound: int, score: int, move: int = -1):
+        """
+        写入局面
+        
+        Args:
+            key: 64位局面哈希
+            depth: 剩余搜索深度（超过255时截断）
+            bound: 边界类型（EXACT/LOWER/UPPER）
+            score: 分值（绝对值须小于2**29）
+            move: 最佳着法格子索引，-1表示没有
+        """
+        self.stores += 1
+        depth = min(depth, 0xFF) if depth > 0 else 0
+        data = ((move + 1) | depth << self._DEPTH_SHIFT | bound << self._BOUND_SHIFT
+                | self.generation << self._GENERATION_SHIFT | (score + self._SCORE_OFFSET) << self._SCORE_SHIFT)
+        
+        slot = (key & self._bucket_mask) << 1
+        old = self._data[slot]
+        old_key = self._checks[slot] ^ old
+        if (not old or old_key == key
+                or (old >> self._GENERATION_SHIFT) & 0xFF != self.generation
+                or depth >= (old >> self._DEPTH_SHIFT) & 0xFF):
+            # 同一局面的旧条目没有给出着法时保留原着法
+            if old and old_key == key and move < 0:
+                data |= old & 0xFFFF
+        else:
+            slot += 1
+            old = self._data[slot]
+            old_key = self._checks[slot] ^ old
+        if old and old_key != key and (old >> self._GENERATION_SHIFT) & 0xFF == self.generation:
+            self.collisions += 1
+        self._data[slot] = data
+        self._checks[slot] = (key ^ data) & self._MASK64
+    
+    def hashfull(self) -> int:
+        """估算当前世代条目所占的千分比（抽样前1000个条目）"""
+        sample = min(1000, self.capacity)
+        used = sum(1 for data in self._data[:sample]
+                   if data and (data >> self._GENERATION_SHIFT) & 0xFF == self.generation)
+        return used * 1000 // sample
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        获取统计信息
+        
+        Returns:
+            probes、hits、hit_rate、stores、collisions和hashfull
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "collisions": self.collisions,
+            "hashfull": self.hashfull(),
+        }
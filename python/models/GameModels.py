@@ -2,9 +2,11 @@
 游戏数据模型
 定义游戏中的核心数据结构和枚举
 """
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
-from enum import Enum
-from typing import List, Tuple
+from enum import Enum, IntEnum
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 class Player(Enum):
@@ -42,16 +44,43 @@ class GameState(Enum):
     PAUSED = "paused"
 
 
-@dataclass
+class PatternShape(IntEnum):
+    """棋型枚举（单条线上，按强度递增）"""
+    NONE = 0
+    TWO = 1          # 眠二: 再下一手可成眠三
+    OPEN_TWO = 2     # 活二: 再下一手可成活三
+    THREE = 3        # 眠三: 再下一手可成冲四
+    OPEN_THREE = 4   # 活三: 再下一手可成活四
+    FOUR = 5         # 冲四: 只有一个成五点
+    OPEN_FOUR = 6    # 活四: 至少两个成五点
+    FIVE = 7         # 成五（含长连）
+
+
 class Position:
-    """棋盘位置"""
-    row: int
-    col: int
+    """棋盘位置
+    
+    位置是不可变的。热路径上应使用Position.at或Position.from_index获取预先构建的共享实例，
+    它们不做参数校验；直接构造Position(row, col)时仍会校验类型。
+    """
+    __slots__ = ("row", "col")
     
-    def __post_init__(self):
+    # 共享实例网格: _grid[row][col]，只随index_table按棋盘大小扩展，已创建的实例保持不变
+    _grid: List[List["Position"]] = []
+    # 按棋盘大小缓存的格子索引表: _index_tables[size][row * size + col]
+    _index_tables: Dict[int, Tuple["Position", ...]] = {}
+    
+    def __init__(self, row: int, col: int):
         """验证位置有效性"""
-        if not isinstance(self.row, int) or not isinstance(self.col, int):
+        if not isinstance(row, int) or not isinstance(col, int):
             raise ValueError("行和列必须是整数")
+        object.__setattr__(self, "row", row)
+        object.__setattr__(self, "col", col)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Position是不可变对象")
+    
+    def __reduce__(self):
+        return (Position, (self.row, self.col))
     
     def __eq__(self, other):
         if not isinstance(other, Position):
@@ -61,6 +90,66 @@ class Position:
     def __hash__(self):
         return hash((self.row, self.col))
     
+    def __repr__(self):
+        return f"Position(row={self.row}, col={self.col})"
+    
+    @classmethod
+    def _ensure_grid(cls, size: int):
+        """确保共享实例网格至少覆盖size x size"""
+        old_size = len(cls._grid)
+        if size <= old_size:
+            return
+        grid = [row + [cls(r, c) for c in range(old_size, size)] for r, row in enumerate(cls._grid)]
+        grid.extend([cls(r, c) for c in range(size)] for r in range(old_size, size))
+        cls._grid = grid
+    
+    @classmethod
+    def at(cls, row: int, col: int) -> 'Position':
+        """
+        获取共享的位置实例（不校验类型）
+        
+        共享网格只覆盖已创建过索引表的棋盘大小；超出网格或为负数的坐标返回新构造的实例，
+        不会扩展网格，也不会按负下标取到其他格子的实例。
+        
+        Args:
+            row: 行号
+            col: 列号
+        
+        Returns:
+            共享的Position实例，坐标超出网格时为新实例
+        """
+        grid = cls._grid
+        if 0 <= row < len(grid) and 0 <= col < len(grid):
+            return grid[row][col]
+        return cls(row, col)
+    
+    @classmethod
+    def index_table(cls, size: int) -> Tuple['Position', ...]:
+        """
+        获取指定棋盘大小的格子索引表
+        
+        Args:
+            size: 棋盘大小
+        
+        Returns:
+            下标为 row * size + col 的共享Position元组
+        """
+        table = cls._index_tables.get(size)
+        if table is None:
+            cls._ensure_grid(size)
+            table = tuple(cls._grid[row][col] for row in range(size) for col in range(size))
+            cls._index_tables[size] = table
+        return table
+    
+    @classmethod
+    def from_index(cls, index: int, size: int) -> 'Position':
+        """从格子索引获取共享的位置实例"""
+        return cls.index_table(size)[index]
+    
+    def to_index(self, size: int) -> int:
+        """转换为格子索引"""
+        return self.row * size + self.col
+    
     def to_tuple(self) -> Tuple[int, int]:
         """转换为元组"""
         return (self.row, self.col)
@@ -71,24 +160,46 @@ class Position:
         return cls(row=pos_tuple[0], col=pos_tuple[1])
 
 
-@dataclass
 class Move:
     """走棋记录"""
-    player: Player
-    position: Position
-    move_number: int
+    __slots__ = ("player", "position", "move_number")
+    
+    def __init__(self, player: Player, position: Position, move_number: int):
+        self.player = player
+        self.position = position
+        self.move_number = move_number
+    
+    def __eq__(self, other):
+        if not isinstance(other, Move):
+            return NotImplemented
+        return (self.player, self.position, self.move_number) == (other.player, other.position, other.move_number)
+    
+    def __repr__(self):
+        return f"Move(player={self.player}, position={self.position!r}, move_number={self.move_number})"
     
     def __str__(self):
         return f"Move {self.move_number}: {self.player.name} at ({self.position.row}, {self.position.col})"
 
 
-@dataclass
 class GameResult:
     """游戏结果"""
-    winner: Player
-    winning_positions: List[Position]
-    total_moves: int
-    is_draw: bool = False
+    __slots__ = ("winner", "winning_positions", "total_moves", "is_draw")
+    
+    def __init__(self, winner: Player, winning_positions: List[Position], total_moves: int, is_draw: bool = False):
+        self.winner = winner
+        self.winning_positions = winning_positions
+        self.total_moves = total_moves
+        self.is_draw = is_draw
+    
+    def __eq__(self, other):
+        if not isinstance(other, GameResult):
+            return NotImplemented
+        return ((self.winner, self.winning_positions, self.total_moves, self.is_draw) ==
+                (other.winner, other.winning_positions, other.total_moves, other.is_draw))
+    
+    def __repr__(self):
+        return (f"GameResult(winner={self.winner}, winning_positions={self.winning_positions!r}, "
+                f"total_moves={self.total_moves}, is_draw={self.is_draw})")
     
     def __str__(self):
         if self.is_draw:
@@ -96,6 +207,190 @@ class GameResult:
         return f"{self.winner.name} 获胜"
 
 
+class SearchResult:
+    """引擎搜索结果"""
+    __slots__ = ("position", "score", "depth", "nodes", "elapsed", "principal_variation", "distribution")
+    
+    def __init__(self, position: Optional[Position], score: int, depth: int, nodes: int, elapsed: float,
+                 principal_variation: Tuple[Position, ...] = (),
+                 distribution: Tuple[Tuple[Position, float], ...] = ()):
+        self.position = position
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.principal_variation = principal_variation
+        # 各候选着法的访问比例（按比例降序，MCTS引擎给出）
+        self.distribution = distribution
+    
+    @property
+    def nodes_per_second(self) -> float:
+        """每秒搜索的节点数"""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def __repr__(self):
+        return (f"SearchResult(position={self.position!r}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, elapsed={self.elapsed:.3f}, nps={self.nodes_per_second:.0f})")
+
+
+class BookMove:
+    """开局库中的一个着法"""
+    __slots__ = ("position", "games", "score")
+    
+    def __init__(self, position: Position, games: int, score: float):
+        self.position = position
+        # 该局面下走出此着法的对局数
+        self.games = games
+        # 走出此着法一方的平均得分（胜1，和0.5，负0）
+        self.score = score
+    
+    def __repr__(self):
+        return f"BookMove(position={self.position!r}, games={self.games}, score={self.score:.3f})"
+
+
+class MoveHistory(Sequence):
+    """落子历史
+    
+    以紧凑的array保存每一步的格子索引和玩家，对外仍表现为(Player, Position)元组序列。
+    """
+    __slots__ = ("board_size", "_cells", "_players")
+    
+    # 按value排列的玩家枚举，避免在热路径上调用Player(value)
+    _PLAYERS = tuple(Player)
+    
+    def __init__(self, board_size: int):
+        """
+        初始化落子历史
+        
+        Args:
+            board_size: 棋盘大小
+        """
+        self.board_size = board_size
+        self._cells = array("H" if board_size * board_size <= 0xFFFF else "I")
+        self._players = array("B")
+    
+    def append(self, move: Tuple[Player, Position]):
+        """追加一步（与list.append兼容）"""
+        player, position = move
+        self._cells.append(position.row * self.board_size + position.col)
+        self._players.append(player.value)
+    
+    def push(self, cell: int, player: Player):
+        """按格子索引追加一步"""
+        self._cells.append(cell)
+        self._players.append(player.value)
+    
+    def pop(self) -> Tuple[Player, Position]:
+        """移除并返回最后一步"""
+        cell = self._cells.pop()
+        return self._PLAYERS[self._players.pop()], Position.from_index(cell, self.board_size)
+    
+    def pop_cell(self) -> Tuple[int, Player]:
+        """移除最后一步并返回(格子索引, 玩家)，不构造Position"""
+        return self._cells.pop(), self._PLAYERS[self._players.pop()]
+    
+    def clear(self):
+        """清空历史"""
+        del self._cells[:]
+        del self._players[:]
+    
+    @property
+    def cells(self) -> array:
+        """按顺序排列的格子索引（只读使用）"""
+        return self._cells
+    
+    def __len__(self) -> int:
+        return len(self._cells)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._cells)))]
+        return self._PLAYERS[self._players[index]], Position.from_index(self._cells[index], self.board_size)
+    
+    def __iter__(self) -> Iterator[Tuple[Player, Position]]:
+        players = self._PLAYERS
+        table = Position.index_table(self.board_size)
+        for player_value, cell in zip(self._players, self._cells):
+            yield players[player_value], table[cell]
+    
+    def __eq__(self, other):
+        if isinstance(other, MoveHistory):
+            return self._cells == other._cells and self._players == other._players
+        return list(self) == other
+    
+    def __repr__(self):
+        return f"MoveHistory({list(self)!r})"
+
+
+class BoardSnapshot:
+    """棋盘只读快照
+    
+    由Board.get_snapshot生成并按版本号共享，创建后不可修改，可在线程之间安全传递。
+    cells为按行优先排列的player.value字节串，rows为按需生成并缓存的二维Player元组，
+    to_compact()把cells编码为每格一个字符的字符串（SYMBOLS，空位/黑/白为"."/"X"/"O"）。
+    """
+    __slots__ = ("version", "size", "cells", "current_player", "move_count",
+                 "winner", "is_game_over", "winning_positions", "zobrist_hash", "_rows")
+    
+    # 按value排列的玩家枚举
+    _PLAYERS = tuple(Player)
+    # 紧凑编码中按value排列的棋子字符
+    SYMBOLS = ".XO"
+    _SYMBOL_TABLE = bytes.maketrans(bytes(range(len(SYMBOLS))), SYMBOLS.encode("ascii"))
+    
+    def __init__(self, version: int, size: int, cells: bytes, current_player: Player, move_count: int,
+                 winner: Player, is_game_over: bool, winning_positions: Tuple[Position, ...], zobrist_hash: int):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "size", size)
+        object.__setattr__(self, "cells", cells)
+        object.__setattr__(self, "current_player", current_player)
+        object.__setattr__(self, "move_count", move_count)
+        object.__setattr__(self, "winner", winner)
+        object.__setattr__(self, "is_game_over", is_game_over)
+        object.__setattr__(self, "winning_positions", winning_positions)
+        object.__setattr__(self, "zobrist_hash", zobrist_hash)
+        object.__setattr__(self, "_rows", None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardSnapshot是不可变对象")
+    
+    @property
+    def rows(self) -> Tuple[Tuple[Player, ...], ...]:
+        """二维棋盘状态（只读元组，与get_board_state的下标方式相同）"""
+        rows = self._rows
+        if rows is None:
+            players = self._PLAYERS
+            size = self.size
+            rows = tuple(
+                tuple(players[value] for value in self.cells[row * size:(row + 1) * size])
+                for row in range(size)
+            )
+            # 并发生成的结果相同，重复赋值无害
+            object.__setattr__(self, "_rows", rows)
+        return rows
+    
+    def get_cell(self, row: int, col: int) -> Player:
+        """获取指定位置的棋子"""
+        return self._PLAYERS[self.cells[row * self.size + col]]
+    
+    def to_compact(self) -> str:
+        """紧凑编码: 按行优先排列、每格一个SYMBOLS字符的字符串（长度size*size）"""
+        return self.cells.translate(self._SYMBOL_TABLE).decode("ascii")
+    
+    def to_board_state(self) -> List[List[Player]]:
+        """转换为可修改的二维列表（与Board.get_board_state格式相同）"""
+        return [list(row) for row in self.rows]
+
+
+@dataclass(frozen=True)
+class GameView:
+    """游戏的只读视图: 同一时刻的棋盘快照和游戏状态（由GameActor整体发布，读取时不需要加锁）"""
+    snapshot: BoardSnapshot
+    game_state: GameState
+    # 发布序号，每次发布加1
+    revision: int = 0
+
+
 @dataclass
 class GameSettings:
     """游戏设置"""
@@ -103,6 +398,10 @@ class GameSettings:
     win_count: int = 5
     allow_undo: bool = True
     max_undo_steps: int = 1000
+    board_backend: str = "list"  # 棋盘存储后端: "list"、"bitboard" 或 "numpy"（需安装numpy）
+    
+    # 支持的棋盘存储后端
+    BOARD_BACKENDS = ("list", "bitboard", "numpy")
     
     def validate(self):
         """验证设置有效性"""
@@ -113,4 +412,6 @@ class GameSettings:
         if self.win_count > self.board_size:
             raise ValueError("获胜连子数不能大于棋盘大小")
         if self.max_undo_steps < 0:
-            raise ValueError("最大悔棋步数不能为负数")
\ No newline at end of file
+            raise ValueError("最大悔棋步数不能为负数")
+        if self.board_backend not in self.BOARD_BACKENDS:
+            raise ValueError(f"不支持的棋盘后端: {self.board_backend}")
\ No newline at end of file
@@ -2,29 +2,78 @@
 MCP服务器管理器
 管理MCP服务器的生命周期和与游戏逻辑的交互
 """
+import asyncio
 import threading
 import time
-from typing import Any, Dict
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from fastmcp import FastMCP
 
-from python.models.GameModels import GameState, Player
+from python.core.GameActor import GameActor
+from python.core.GameLogic import GameLogic
+from python.core.SessionManager import SessionManager
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.EnginePool import EnginePool
+from python.engine.OpeningBook import OpeningBook
+from python.engine.PositionCache import PositionCache
+from python.models.GameModels import BoardSnapshot, GameSettings, GameState, Player, Position
 from python.util.Config import config
 from python.util.Logger import logger
 from python.util.PortFinder import PortFinder
 
 
 class McpServer:
-    """MCP服务器管理器"""
+    """MCP服务器管理器
     
-    def __init__(self, game_logic=None):
+    工具在FastMCP的服务器线程中执行，对游戏逻辑的访问都经过GameActor: 修改通过命令队列串行执行，
+    读取使用执行器发布的视图，因此不会与界面线程的点击和绘制相互干扰。
+    
+    带game_id的工具（create_game、join_game、game_move、game_state、resign_game）操作会话管理器中的
+    多局对局，与窗口中的对局无关，一个服务器进程可以同时进行数百局LLM对局。
+    同一局的请求按到达顺序依次执行（每局一个asyncio锁，锁按等待顺序交出），
+    执行时在线程池中锁定会话，不同对局之间没有全局锁。
+    引擎的应着在单独的引擎线程池中搜索（SessionManager.play_engine），搜索期间不持有会话锁和每局的asyncio锁，
+    对局工具的线程池只执行不涉及搜索的短命令，不会被引擎搜索占满。
+    
+    状态默认以紧凑格式返回（见_state_dict），verbose=True时使用原来的二维名称列表；
+    带since_version的请求只返回该版本之后的落子，版本未变时只返回unchanged；
+    每个响应都带有game_state，认输等不落子的状态变化同样推进棋盘版本。
+    """
+    
+    def __init__(self, game_logic=None, session_manager: Optional[SessionManager] = None):
         """
         初始化MCP服务器
         
         Args:
-            game_logic: 游戏逻辑实例（可选，可以稍后设置）
+            game_logic: 游戏逻辑执行器或游戏逻辑实例（可选，可以稍后设置）
+            session_manager: 多局对局的会话管理器（可选，默认创建一个带引擎池的会话管理器，引擎使用默认开局库和局面缓存）
         """
-        self.game_logic = game_logic
+        self.game_actor: Optional[GameActor] = None
+        if game_logic:
+            self.game_actor = self._as_actor(game_logic)
+        # 默认会话管理器的引擎池及其共用的开局库和局面缓存，close()时关闭
+        self._engine_resources = []
+        if session_manager is None:
+            settings = GameSettings()
+            book = OpeningBook.open_default(settings.board_size, settings.win_count)
+            # 与窗口的引擎工作进程使用不同的缓存文件
+            cache = PositionCache.open_default("mcp_server")
+            time_limit = float(config.get("engine_time_limit", 3.0))
+            engines = EnginePool(lambda: AlphaBetaEngine(time_limit=time_limit, opening_book=book,
+                                                         position_cache=cache),
+                                 int(config.get("mcp_engine_pool_size", 2)))
+            self._engine_resources = [resource for resource in (engines, book, cache) if resource is not None]
+            session_manager = SessionManager(settings, engines=engines)
+        self.session_manager = session_manager
+        # 每局一个asyncio锁（只在服务器的事件循环中访问），没有请求引用时自动回收
+        self._game_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._game_executor = ThreadPoolExecutor(thread_name_prefix="McpGame")
+        # 引擎搜索的线程池，线程数与引擎池大小相同（更多线程只会等待空闲引擎）
+        engines = session_manager.engines
+        self._engine_executor = ThreadPoolExecutor(max_workers=engines.size if engines is not None else 1,
+                                                   thread_name_prefix="McpEngine")
         self.mcp = None
         self.server_thread = None
         self.server_running = False
@@ -42,11 +91,11 @@ class McpServer:
         # 从配置获取设置
         min_port = config.get("mcp_server_min_port", 60000)
         max_port = config.get("mcp_server_max_port", 65535)
-
+        
         # 自动查找可用端口
         logger.info(f"自动查找可用端口，范围: {min_port}-{max_port}")
         available_port = PortFinder.find_available_port(min_port, max_port)
-
+        
         if available_port is not None:
             logger.info(f"找到可用端口: {available_port}")
             return available_port
@@ -55,72 +104,79 @@ class McpServer:
             return -1
     
     def _register_tools(self):
-        """注册MCP工具"""
+        """注册MCP工具
+        
+        修改游戏的工具把整个操作（检查、修改和读取结果）作为一条命令提交到执行器并在协程中等待，
+        多个客户端并发调用时命令按顺序执行；只读工具直接读取执行器发布的视图。
+        """
         # 创建FastMCP实例
         self.mcp = FastMCP("GomokuGame", version="1.0.0")
+        self._register_game_tools()
         
         # 注册工具：获取游戏状态
         @self.mcp.tool()
-        def get_game_state() -> Dict[str, Any]:
-            """获取当前游戏状态"""
+        async def get_game_state(since_version: int = -1, verbose: bool = False) -> Dict[str, Any]:
+            """获取当前游戏状态
+            
+            board为按行优先排列的字符串，每格一个字符: "."空位（即可落子位置）、"X"黑、"O"白，
+            第row行第col列是board[row * board_size + col]。
+            since_version为之前返回的board_version时只返回之后的落子moves（[行, 列, 棋子]），
+            版本未变时返回unchanged（认输也会推进版本，此时moves为空，game_state为结果）；
+            verbose为True时返回二维名称列表和available_moves。
+            """
             try:
-                game_state = self.game_logic.get_game_state()
-                current_player = self.game_logic.get_current_player()
-                board_state = self.game_logic.get_board_state()
-                available_moves = self.game_logic.get_available_moves()
+                view = self.game_actor.view
+                if since_version < 0 or since_version == view.snapshot.version:
+                    # 不需要增量或版本未变时直接读取视图
+                    moves = [] if since_version >= 0 else None
+                    return self._state_dict(view.snapshot, view.game_state, verbose, since_version, moves)
                 
-                # 转换棋盘状态为可序列化的格式
-                board_serializable = []
-                for row in board_state:
-                    board_serializable.append([player.name for player in row])
+                def command(game_logic) -> Dict[str, Any]:
+                    return self._state_dict(game_logic.get_snapshot(), game_logic.get_game_state(), verbose,
+                                            since_version, game_logic.get_moves_since(since_version))
                 
-                # 转换可用位置
-                moves_serializable = [(pos.row, pos.col) for pos in available_moves]
-                
-                return {
-                    "game_state": game_state.value,
-                    "current_player": current_player.name,
-                    "board_size": len(board_state),
-                    "board": board_serializable,
-                    "available_moves": moves_serializable,
-                    "move_count": len(self.game_logic.board.move_history)
-                }
+                return await self.game_actor.run(command)
             except Exception as e:
                 logger.error(f"获取游戏状态失败: {e}")
                 return {"error": str(e)}
         
         # 注册工具：落子
         @self.mcp.tool()
-        def make_move(row: int, col: int) -> Dict[str, Any]:
-            """在指定位置落子"""
-            try:
+        async def make_move(row: int, col: int, verbose: bool = False) -> Dict[str, Any]:
+            """在指定位置落子（位置无效时verbose为True才附带available_moves，否则可落子位置即棋盘中的"."）"""
+            def command(game_logic) -> Dict[str, Any]:
                 # 检查位置是否有效
-                if not self.game_logic.is_position_valid(row, col):
-                    return {
+                if not game_logic.is_position_valid(row, col):
+                    result = {
                         "success": False,
                         "error": f"无效的位置: ({row}, {col})",
-                        "available_moves": [(pos.row, pos.col) for pos in self.game_logic.get_available_moves()]
+                        "board_version": game_logic.board.version
                     }
+                    if verbose:
+                        result["available_moves"] = [(pos.row, pos.col) for pos in game_logic.get_available_moves()]
+                    return result
                 
                 # 执行落子
-                success = self.game_logic.make_move(row, col)
+                player = game_logic.get_current_player()
+                success = game_logic.make_move(row, col)
                 
                 if success:
                     # 获取更新后的状态
-                    game_state = self.game_logic.get_game_state()
-                    current_player = self.game_logic.get_current_player()
+                    game_state = game_logic.get_game_state()
+                    current_player = game_logic.get_current_player()
                     
                     # 检查游戏是否结束
-                    game_result = self.game_logic.get_game_result()
+                    game_result = game_logic.get_game_result()
                     is_game_over = game_state in [GameState.BLACK_WIN, GameState.WHITE_WIN, GameState.DRAW]
                     
                     result = {
                         "success": True,
                         "position": (row, col),
-                        "player": Player.BLACK.name if self.game_logic.get_current_player() == Player.WHITE else Player.WHITE.name,
+                        "player": player.name,
                         "game_state": game_state.value,
                         "current_player": current_player.name,
-                        "is_game_over": is_game_over
+                        "is_game_over": is_game_over,
+                        "board_version": game_logic.board.version
                     }
                     
                     if is_game_over and game_result:
@@ -135,9 +191,11 @@ class McpServer:
                     return {
                         "success": False,
                         "error": "落子失败",
-                        "game_state": self.game_logic.get_game_state().value
+                        "game_state": game_logic.get_game_state().value
                     }
-                    
+            
+            try:
+                return await self.game_actor.run(command)
             except Exception as e:
                 logger.error(f"落子失败: {e}")
                 return {"success": False, "error": str(e)}
@@ -147,7 +205,7 @@ class McpServer:
         def get_available_moves() -> Dict[str, Any]:
             """获取所有可用的落子位置"""
             try:
-                available_moves = self.game_logic.get_available_moves()
+                available_moves = self.game_actor.get_available_moves()
                 moves = [(pos.row, pos.col) for pos in available_moves]
                 
                 return {
@@ -160,16 +218,17 @@ class McpServer:
         
         # 注册工具：开始新游戏
         @self.mcp.tool()
-        def start_new_game() -> Dict[str, Any]:
+        async def start_new_game() -> Dict[str, Any]:
             """开始新游戏"""
             try:
-                self.game_logic.start_game()
+                await self.game_actor.run(lambda game_logic: game_logic.start_game())
+                view = self.game_actor.view
                 
                 return {
                     "success": True,
                     "message": "新游戏已开始",
-                    "game_state": self.game_logic.get_game_state().value,
-                    "current_player": self.game_logic.get_current_player().name
+                    "game_state": view.game_state.value,
+                    "current_player": view.snapshot.current_player.name
                 }
             except Exception as e:
                 logger.error(f"开始新游戏失败: {e}")
@@ -177,16 +236,17 @@ class McpServer:
         
         # 注册工具：重新开始游戏
         @self.mcp.tool()
-        def restart_game() -> Dict[str, Any]:
+        async def restart_game() -> Dict[str, Any]:
             """重新开始游戏"""
             try:
-                self.game_logic.restart_game()
+                await self.game_actor.run(lambda game_logic: game_logic.restart_game())
+                view = self.game_actor.view
                 
                 return {
                     "success": True,
                     "message": "游戏已重新开始",
-                    "game_state": self.game_logic.get_game_state().value,
-                    "current_player": self.game_logic.get_current_player().name
+                    "game_state": view.game_state.value,
+                    "current_player": view.snapshot.current_player.name
                 }
             except Exception as e:
                 logger.error(f"重新开始游戏失败: {e}")
@@ -194,37 +254,39 @@ class McpServer:
         
         # 注册工具：悔棋
         @self.mcp.tool()
-        def undo_move() -> Dict[str, Any]:
+        async def undo_move() -> Dict[str, Any]:
             """悔棋一步"""
-            try:
-                success = self.game_logic.undo_move()
+            def command(game_logic) -> Dict[str, Any]:
+                success = game_logic.undo_move()
                 
                 if success:
                     return {
                         "success": True,
                         "message": "悔棋成功",
-                        "game_state": self.game_logic.get_game_state().value,
-                        "current_player": self.game_logic.get_current_player().name
+                        "game_state": game_logic.get_game_state().value,
+                        "current_player": game_logic.get_current_player().name
                     }
                 else:
                     return {
                         "success": False,
                         "error": "悔棋失败",
-                        "game_state": self.game_logic.get_game_state().value
+                        "game_state": game_logic.get_game_state().value
                     }
+            
+            try:
+                return await self.game_actor.run(command)
             except Exception as e:
                 logger.error(f"悔棋失败: {e}")
                 return {"success": False, "error": str(e)}
         
         # 注册工具：获取游戏信息
         @self.mcp.tool()
-        def get_game_info() -> Dict[str, Any]:
+        async def get_game_info() -> Dict[str, Any]:
             """获取游戏详细信息"""
-            try:
-                game_state = self.game_logic.get_game_state()
-                current_player = self.game_logic.get_current_player()
-                board_state = self.game_logic.get_board_state()
-                move_history = self.game_logic.board.move_history
+            def command(game_logic) -> Dict[str, Any]:
+                game_state = game_logic.get_game_state()
+                snapshot = game_logic.get_snapshot()
+                move_history = game_logic.board.move_history
                 
                 # 转换历史记录
                 history = []
@@ -239,18 +301,305 @@ class McpServer:
                     "game_name": "五子棋",
                     "version": "1.0.0",
                     "game_state": game_state.value,
-                    "current_player": current_player.name,
-                    "board_size": len(board_state),
+                    "current_player": snapshot.current_player.name,
+                    "board_size": snapshot.size,
                     "total_moves": len(move_history),
                     "move_history": history,
-                    "available_moves_count": len(self.game_logic.get_available_moves())
+                    "available_moves_count": snapshot.size * snapshot.size - snapshot.move_count,
+                    "board_version": snapshot.version
                 }
+            
+            try:
+                return await self.game_actor.run(command)
             except Exception as e:
                 logger.error(f"获取游戏信息失败: {e}")
                 return {"error": str(e)}
         
         logger.info("MCP工具注册完成")
     
+    async def _run_in_game(self, game_id: str, command: Callable[[GameLogic], Any]) -> Any:
+        """
+        在指定对局中执行命令: 同一局的命令按到达顺序依次执行，在线程池中锁定会话后调用
+        
+        Args:
+            game_id: 对局ID
+            command: 以对局的GameLogic为参数调用的函数
+        
+        Returns:
+            command的返回值
+        
+        Raises:
+            KeyError: 对局不存在或已过期
+        """
+        lock = self._game_locks.get(game_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._game_locks[game_id] = lock
+        async with lock:
+            return await asyncio.get_running_loop().run_in_executor(self._game_executor, self._call_in_game,
+                                                                    game_id, command)
+    
+    def _call_in_game(self, game_id: str, command: Callable[[GameLogic], Any]) -> Any:
+        """锁定会话并执行命令（线程池中调用）"""
+        with self.session_manager.acquire(game_id) as game_logic:
+            return command(game_logic)
+    
+    async def _play_engine(self, game_id: str) -> bool:
+        """
+        对局由引擎执棋时，在引擎线程池中搜索并落下引擎的应着（不是引擎的回合时直接返回）
+        
+        Returns:
+            引擎是否落子
+        """
+        if self.session_manager.get_engine_player(game_id) == Player.NONE:
+            return False
+        return await asyncio.get_running_loop().run_in_executor(self._engine_executor,
+                                                                self.session_manager.play_engine, game_id)
+    
+    async def _try_play_engine(self, game_id: str) -> Optional[str]:
+        """
+        同_play_engine，但搜索失败时只记录日志（引擎的回合保留，之后的game_state调用会重试）
+        
+        Returns:
+            搜索失败时的错误信息，否则为None
+        
+        Raises:
+            KeyError: 对局不存在或已过期
+        """
+        try:
+            await self._play_engine(game_id)
+        except KeyError:
+            raise
+        except Exception as e:
+            logger.error(f"对局 {game_id} 引擎搜索失败: {e}")
+            return str(e)
+        return None
+    
+    @staticmethod
+    def _state_dict(snapshot: BoardSnapshot, game_state: GameState, verbose: bool = False, since_version: int = -1,
+                    moves: Optional[List[Tuple[Player, Position]]] = None) -> Dict[str, Any]:
+        """
+        序列化游戏状态
+        
+        Args:
+            snapshot: 棋盘快照
+            game_state: 游戏状态
+            verbose: 完整状态是否使用二维名称列表并附带available_moves（默认为紧凑字符串，空位即可用位置）
+            since_version: 客户端已知的棋盘版本
+            moves: since_version之后的落子，None表示返回完整状态
+        
+        Returns:
+            游戏状态、当前玩家、落子数和棋盘版本（增量响应同样带有），以及完整棋盘、增量落子moves或unchanged之一
+        """
+        result = {
+            "game_state": game_state.value,
+            "current_player": snapshot.current_player.name,
+            "move_count": snapshot.move_count,
+            "board_version": snapshot.version
+        }
+        if moves is not None:
+            if since_version == snapshot.version:
+                result["unchanged"] = True
+            else:
+                # 版本变化但没有新落子（如认输）时moves为空，game_state给出对局结果
+                symbols = BoardSnapshot.SYMBOLS
+                result["since_version"] = since_version
+                result["moves"] = [[position.row, position.col, symbols[player.value]] for player, position in moves]
+            return result
+        
+        result["board_size"] = snapshot.size
+        if verbose:
+            result["board"] = [[player.name for player in row] for row in snapshot.rows]
+            # 对局结束（含认输）后没有可用位置
+            result["available_moves"] = [divmod(cell, snapshot.size) for cell, value in enumerate(snapshot.cells)
+                                         if value == 0 and not snapshot.is_game_over]
+        else:
+            result["board"] = snapshot.to_compact()
+        return result
+    
+    def _game_state_dict(self, game_id: str, game_logic: GameLogic, since_version: int = -1,
+                         verbose: bool = False) -> Dict[str, Any]:
+        """对局状态（持有会话锁时调用），格式见_state_dict，完整状态附带玩家和引擎执棋方"""
+        moves = game_logic.get_moves_since(since_version) if since_version >= 0 else None
+        result = {"game_id": game_id}
+        result.update(self._state_dict(game_logic.get_snapshot(), game_logic.get_game_state(), verbose,
+                                       since_version, moves))
+        if moves is None:
+            result["players"] = {seat.name: name for seat, name in self.session_manager.get_players(game_id).items()}
+            result["engine_player"] = self.session_manager.get_engine_player(game_id).name
+        return result
+    
+    @staticmethod
+    def _parse_player(name: str) -> Player:
+        """解析执棋方名称（BLACK、WHITE，空字符串或NONE表示任意）"""
+        name = (name or "NONE").upper()
+        if name not in Player.__members__:
+            raise ValueError(f"无效的执棋方: {name}")
+        return Player[name]
+    
+    def _register_game_tools(self):
+        """注册带game_id的多局对局工具"""
+        
+        # 注册工具：创建对局
+        @self.mcp.tool()
+        async def create_game(player_name: str = "", play_as: str = "BLACK", vs_engine: bool = False) -> Dict[str, Any]:
+            """创建一局新对局并返回game_id；给出player_name时以play_as一方加入，vs_engine为True时由内置引擎执另一方"""
+            def create() -> Tuple[str, Player]:
+                player = self._parse_player(play_as)
+                engine_player = Player.NONE
+                if vs_engine:
+                    engine_player = player.opposite() if player != Player.NONE else Player.WHITE
+                game_id = self.session_manager.create(engine_player=engine_player)
+                seat = self.session_manager.join(game_id, player_name, player) if player_name else Player.NONE
+                return game_id, seat
+            
+            try:
+                game_id, seat = await asyncio.get_running_loop().run_in_executor(self._game_executor, create)
+                # 引擎执黑时先落子
+                await self._play_engine(game_id)
+                result = {"success": True, "player": seat.name}
+                result.update(await self._run_in_game(game_id,
+                                                      lambda game_logic: self._game_state_dict(game_id, game_logic)))
+                return result
+            except Exception as e:
+                logger.error(f"创建对局失败: {e}")
+                return {"success": False, "error": str(e)}
+        
+        # 注册工具：加入对局
+        @self.mcp.tool()
+        async def join_game(game_id: str, player_name: str, play_as: str = "") -> Dict[str, Any]:
+            """以player_name加入对局，play_as为空时分配任意空座位"""
+            def command(game_logic) -> Dict[str, Any]:
+                seat = self.session_manager.join(game_id, player_name, self._parse_player(play_as))
+                result = {"success": True, "player": seat.name}
+                result.update(self._game_state_dict(game_id, game_logic))
+                return result
+            
+            try:
+                return await self._run_in_game(game_id, command)
+            except KeyError as e:
+                return {"success": False, "error": e.args[0]}
+            except Exception as e:
+                logger.error(f"加入对局失败: {e}")
+                return {"success": False, "error": str(e)}
+        
+        # 注册工具：在对局中落子
+        @self.mcp.tool()
+        async def game_move(game_id: str, player_name: str, row: int, col: int, since_version: int = -1,
+                            verbose: bool = False) -> Dict[str, Any]:
+            """以player_name在对局中落子（须轮到其执棋方），与引擎对局时同时返回引擎的应着
+            
+            返回的状态格式同game_state；给出since_version时只返回该版本之后的落子。
+            """
+            def move(game_logic) -> Tuple[Dict[str, Any], int]:
+                player = game_logic.get_current_player()
+                if self.session_manager.get_players(game_id).get(player) != player_name:
+                    return {
+                        "success": False,
+                        "error": f"现在轮到 {player.name}，{player_name} 不能落子",
+                        "game_state": game_logic.get_game_state().value
+                    }, -1
+                if not game_logic.is_position_valid(row, col):
+                    return {
+                        "success": False,
+                        "error": f"无效的位置: ({row}, {col})",
+                        "game_state": game_logic.get_game_state().value
+                    }, -1
+                
+                move_count = len(game_logic.board.move_history)
+                if not game_logic.make_move(row, col):
+                    return {
+                        "success": False,
+                        "error": "落子失败",
+                        "game_state": game_logic.get_game_state().value
+                    }, -1
+                return {"success": True, "position": (row, col), "player": player.name}, move_count
+            
+            def finish(game_logic) -> Dict[str, Any]:
+                history = list(game_logic.board.move_history)
+                if len(history) > move_count + 1:
+                    engine_player, engine_position = history[move_count + 1]
+                    result["engine_move"] = {"player": engine_player.name,
+                                             "position": (engine_position.row, engine_position.col)}
+                result.update(self._game_state_dict(game_id, game_logic, since_version, verbose))
+                game_result = game_logic.get_game_result()
+                if game_logic.get_game_state() in (GameState.BLACK_WIN, GameState.WHITE_WIN, GameState.DRAW) \
+                        and game_result:
+                    result["game_result"] = {
+                        "winner": game_result.winner.name,
+                        "is_draw": game_result.is_draw,
+                        "total_moves": game_result.total_moves
+                    }
+                return result
+            
+            try:
+                result, move_count = await self._run_in_game(game_id, move)
+                if not result["success"]:
+                    return result
+                # 引擎的应着在引擎线程池中搜索，之后再读取包含应着的状态；搜索失败时落子仍然有效
+                engine_error = await self._try_play_engine(game_id)
+                if engine_error is not None:
+                    result["engine_error"] = engine_error
+                return await self._run_in_game(game_id, finish)
+            except KeyError as e:
+                return {"success": False, "error": e.args[0]}
+            except Exception as e:
+                logger.error(f"对局落子失败: {e}")
+                return {"success": False, "error": str(e)}
+        
+        # 注册工具：获取对局状态
+        @self.mcp.tool()
+        async def game_state(game_id: str, since_version: int = -1, verbose: bool = False) -> Dict[str, Any]:
+            """获取对局状态
+            
+            board为按行优先排列的字符串，每格一个字符: "."空位（即可落子位置）、"X"黑、"O"白，
+            第row行第col列是board[row * board_size + col]。
+            since_version为之前返回的board_version时只返回之后的落子moves（[行, 列, 棋子]），
+            版本未变时返回unchanged（认输也会推进版本，此时moves为空，game_state为结果）；
+            verbose为True时返回二维名称列表和available_moves。
+            之前的引擎搜索失败、仍轮到引擎时先重试引擎的应着，失败时返回engine_error。
+            """
+            try:
+                engine_error = await self._try_play_engine(game_id)
+                result = await self._run_in_game(
+                    game_id, lambda game_logic: self._game_state_dict(game_id, game_logic, since_version, verbose))
+                if engine_error is not None:
+                    result["engine_error"] = engine_error
+                return result
+            except KeyError as e:
+                return {"error": e.args[0]}
+            except Exception as e:
+                logger.error(f"获取对局状态失败: {e}")
+                return {"error": str(e)}
+        
+        # 注册工具：认输
+        @self.mcp.tool()
+        async def resign_game(game_id: str, player_name: str) -> Dict[str, Any]:
+            """player_name认输，对手获胜"""
+            def command(game_logic) -> Dict[str, Any]:
+                seats = [seat for seat, name in self.session_manager.get_players(game_id).items() if name == player_name]
+                if not seats:
+                    return {"success": False, "error": f"{player_name} 没有加入对局"}
+                # 同一玩家执双方时，由当前执棋方认输
+                player = game_logic.get_current_player() if len(seats) > 1 else seats[0]
+                if not game_logic.resign(player):
+                    return {
+                        "success": False,
+                        "error": "认输失败",
+                        "game_state": game_logic.get_game_state().value
+                    }
+                result = {"success": True, "player": player.name}
+                result.update(self._game_state_dict(game_id, game_logic))
+                return result
+            
+            try:
+                return await self._run_in_game(game_id, command)
+            except KeyError as e:
+                return {"success": False, "error": e.args[0]}
+            except Exception as e:
+                logger.error(f"认输失败: {e}")
+                return {"success": False, "error": str(e)}
+    
     def _run_server(self):
         """运行MCP服务器（在独立线程中）"""
         try:
@@ -258,7 +607,7 @@ class McpServer:
             
             # 运行MCP服务器
             self.mcp.run(transport="sse", port=self.server_port, host=config.get("mcp_server_host", "0.0.0.0"))
-            
+        
         except Exception as e:
             logger.error(f"MCP服务器运行失败: {e}")
         finally:
@@ -271,6 +620,10 @@ class McpServer:
             logger.warning("MCP服务器已经在运行")
             return
         
+        # 没有设置游戏逻辑时只提供带game_id的多局对局工具
+        if self.mcp is None:
+            self._register_tools()
+        
         # 启动服务器线程
         self.server_thread = threading.Thread(target=self._run_server, daemon=True)
         self.server_thread.start()
@@ -292,17 +645,29 @@ class McpServer:
         self.server_running = False
         logger.info("MCP服务器停止命令已发送")
     
+    def close(self):
+        """停止引擎线程池，关闭默认会话管理器的引擎池、开局库和局面缓存（停止服务器后调用）"""
+        self._engine_executor.shutdown(wait=False, cancel_futures=True)
+        for resource in self._engine_resources:
+            resource.close()
+        self._engine_resources = []
+    
     def is_running(self) -> bool:
         """检查MCP服务器是否在运行"""
         return self.server_running
     
+    @staticmethod
+    def _as_actor(game_logic) -> GameActor:
+        """传入GameLogic时为其创建执行器（与界面共用时应传入同一个执行器）"""
+        return game_logic if isinstance(game_logic, GameActor) else GameActor(game_logic)
+    
     def set_game_logic(self, game_logic):
-        """设置游戏逻辑实例
+        """设置游戏逻辑
         
         Args:
-            game_logic: 游戏逻辑实例
+            game_logic: 游戏逻辑执行器，或游戏逻辑实例（此时为其创建执行器）
         """
-        self.game_logic = game_logic
+        self.game_actor = self._as_actor(game_logic)
         self._register_tools()
         logger.info("游戏逻辑已设置到MCP服务器")
     
@@ -2,10 +2,22 @@
 游戏主窗口
 整合所有UI组件，管理游戏界面和MCP服务器
 """
+import threading
+import time
+from typing import Optional
+
 import arcade
 
-from python.models.GameModels import GameResult, GameState, Position
+from python.core.Board import Board
+from python.core.GameActor import GameActor
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.EngineWorker import EngineWorker
+from python.engine.MctsEngine import MctsEngine
+from python.engine.OpeningBook import OpeningBook
+from python.engine.PositionCache import PositionCache
+from python.models.GameModels import BoardSnapshot, GameResult, GameState, GameView, Player, Position, SearchResult
 from python.server.McpServer import McpServer
+from python.ui.UiEventBus import UiEventBus
 from python.ui.components.BoardView import BoardView
 from python.ui.components.Button import Button
 from python.ui.components.StatusPanel import StatusPanel
@@ -14,13 +26,24 @@ from python.util.Logger import logger
 
 
 class GameWindow(arcade.Window):
-    """游戏主窗口类"""
+    """游戏主窗口类
+    
+    配置了引擎执棋方（engine_player）时，引擎在EngineWorker工作进程中搜索: 轮到引擎时提交局面，
+    on_update每帧非阻塞地轮询结果，搜索期间窗口照常绘制和响应输入，状态面板显示思考中。
+    alphabeta引擎使用当前规则的默认开局库（文件存在时）和工作进程自己的持久化局面缓存。
+    新游戏、重新开始和悔棋会取消进行中的搜索；棋盘在别处（如MCP服务器）被修改时同样取消。
+    配置engine_ponder开启后台思考时，工作进程改由执行器的引擎线程驱动（GameActor.set_engine），
+    提交、后台思考和作废都在引擎线程中进行，界面只显示执行器报告的思考时间。
+    """
+    
+    # 可选的引擎类型
+    ENGINE_TYPES = {"alphabeta": AlphaBetaEngine, "mcts": MctsEngine}
     
     def __init__(self, game_logic, mcp_server: McpServer = None):
         """初始化游戏窗口
         
         Args:
-            game_logic: 游戏逻辑实例
+            game_logic: 游戏逻辑执行器（与MCP服务器共用同一个），也可以传入GameLogic，此时为其创建执行器
             mcp_server: MCP服务器实例（可选）
         """
         # 从配置获取窗口设置
@@ -36,26 +59,46 @@ class GameWindow(arcade.Window):
             title_text = title.format(http_host="", mcp_host=mcp_url)
         
         super().__init__(width, height, title_text)
-
+        
         self.mcp_server = mcp_server
         
-        # 使用外部传入的游戏逻辑
-        self.game_logic = game_logic
-        self.game_logic.set_event_handlers(
+        # 界面事件总线: 执行器发布新视图时标记脏区域，on_update中每帧统一刷新
+        self.ui_events = UiEventBus()
+        
+        # 游戏逻辑只通过执行器修改，界面从执行器发布的视图读取状态
+        self.game_actor = game_logic if isinstance(game_logic, GameActor) else GameActor(game_logic)
+        self.game_actor.on_publish = self._on_view_published
+        self.game_actor.submit(lambda logic: logic.set_event_handlers(
             on_state_change=self._on_game_state_change,
             on_move_made=self._on_move_made,
-            on_game_over=self._on_game_over,
-            on_force_redraw=self._force_redraw
-        )
+            on_game_over=self._on_game_over
+        ))
+        # 棋盘视图当前显示的快照
+        self._board_snapshot = None
+        
+        # 引擎工作进程及其执棋方，执行器线程交给界面线程提交的局面（由锁保护）
+        self.engine_worker: Optional[EngineWorker] = None
+        self._engine_player = Player.NONE
+        self._engine_board: Optional[Board] = None
+        self._engine_lock = threading.Lock()
+        # 工作进程是否由执行器的引擎线程驱动（开启后台思考时）
+        self._engine_in_actor = False
+        # 进行中的搜索所对应的棋盘版本和开始时间（没有搜索时为None）
+        self._engine_version: Optional[int] = None
+        self._engine_start = 0.0
+        # 状态面板上显示的思考时间（0.1秒为单位）
+        self._thinking_tenths = -1
         
         # 字体路径
         self.font_path = config.get("font_path", "resources/HarmonyOS_SansSC_Regular.ttf")
         
         # 初始化UI组件
         self._init_ui()
+        self._init_engine()
         
         # 开始游戏
-        self.game_logic.start_game()
+        self.ui_events.mark(UiEventBus.Region.ALL)
+        self.game_actor.start_game()
         
         logger.info("游戏窗口初始化完成")
     
@@ -79,7 +122,7 @@ class GameWindow(arcade.Window):
             cell_size=cell_size,
             on_cell_click=self._on_board_cell_click
         )
-
+        
         button_width = config.get("button_width", 120)
         button_height = config.get("button_height", 40)
         button_spacing = config.get("button_spacing", 40)
@@ -96,7 +139,7 @@ class GameWindow(arcade.Window):
             width=panel_width,
             height=panel_height
         )
-
+        
         # 创建按钮
         
         # 新游戏按钮
@@ -149,56 +192,194 @@ class GameWindow(arcade.Window):
             self.quit_button
         ]
     
-    def _update_status_panel(self):
+    def _init_engine(self):
+        """按配置创建引擎工作进程并设为异步引擎"""
+        player_name = str(config.get("engine_player", "none")).upper()
+        player = Player.__members__.get(player_name, Player.NONE)
+        if player == Player.NONE:
+            return
+        engine_type = str(config.get("engine_type", "alphabeta")).lower()
+        engine_class = self.ENGINE_TYPES.get(engine_type)
+        if engine_class is None:
+            logger.warning(f"未知的引擎类型 {engine_type}，使用alphabeta")
+            engine_class = AlphaBetaEngine
+        options = {"time_limit": float(config.get("engine_time_limit", 3.0))}
+        if engine_class is AlphaBetaEngine:
+            # 开局库和局面缓存由工作进程打开，开局库文件不存在时不使用
+            settings = self.game_actor.settings
+            options["opening_book"] = OpeningBook.default_path(settings.board_size, settings.win_count)
+            options["position_cache"] = PositionCache.default_path("engine_worker")
+        self.engine_worker = EngineWorker(engine_class, **options)
+        # 提前启动进程，使第一步不需要等待进程启动
+        self.engine_worker.start()
+        self._engine_player = player
+        if config.get("engine_ponder", False):
+            self._engine_in_actor = True
+            self.game_actor.set_engine(self.engine_worker, player, ponder=True)
+            return
+        self.game_actor.submit(lambda logic: logic.set_engine_callback(self._on_engine_turn, player))
+    
+    def _on_engine_turn(self, board: Board):
+        """轮到引擎（在执行器线程中调用）: 只记录局面，由界面线程提交"""
+        with self._engine_lock:
+            self._engine_board = board
+    
+    def _submit_engine(self):
+        """视图已发布到待搜索的局面时把它提交到工作进程"""
+        with self._engine_lock:
+            board = self._engine_board
+            if board is None or board.version > self.game_actor.view.snapshot.version:
+                return
+            self._engine_board = None
+        if board.version < self.game_actor.view.snapshot.version:
+            # 局面已经过期
+            return
+        self._engine_version = board.version
+        self._engine_start = time.perf_counter()
+        self._thinking_tenths = -1
+        self.engine_worker.submit(board)
+        self.ui_events.mark(UiEventBus.Region.STATUS)
+        logger.info(f"引擎开始思考: 第 {len(board.move_history) + 1} 手")
+    
+    def _cancel_engine(self, reset: bool = False):
+        """
+        取消进行中的搜索
+        
+        Args:
+            reset: 是否同时清空引擎跨步保留的搜索状态（新游戏、重新开始和悔棋时）
+        """
+        if self.engine_worker is None or self._engine_in_actor:
+            # 由执行器驱动时GameLogic改写历史后通知引擎线程作废
+            return
+        with self._engine_lock:
+            self._engine_board = None
+        if self._engine_version is not None:
+            logger.info(f"取消引擎搜索（已思考 {time.perf_counter() - self._engine_start:.1f} 秒）")
+        self._engine_version = None
+        if reset:
+            self.engine_worker.reset_search_state()
+        else:
+            self.engine_worker.cancel()
+    
+    def _poll_engine(self):
+        """轮询引擎结果（不阻塞），棋盘已在别处被修改时取消搜索"""
+        if self._engine_in_actor:
+            # 思考开始、结束或计时变化（0.1秒为单位）时刷新状态面板
+            thinking_since = self.game_actor.thinking_since
+            tenths = -1 if thinking_since is None else int((time.perf_counter() - thinking_since) * 10)
+            if tenths != self._thinking_tenths:
+                self.ui_events.mark(UiEventBus.Region.STATUS)
+            return
+        if self._engine_version is None:
+            return
+        if self.game_actor.view.snapshot.version != self._engine_version:
+            self._cancel_engine()
+            self.ui_events.mark(UiEventBus.Region.STATUS)
+            return
+        result = self.engine_worker.poll()
+        if result is not None:
+            version = self._engine_version
+            self._engine_version = None
+            self._apply_engine_result(result, version)
+        elif not self.engine_worker.busy:
+            # 搜索出错，工作进程已记录日志
+            self._engine_version = None
+            logger.warning("引擎没有返回结果")
+            self.ui_events.mark(UiEventBus.Region.STATUS)
+        elif int((time.perf_counter() - self._engine_start) * 10) != self._thinking_tenths:
+            # 思考计时以0.1秒为单位显示，变化时才刷新状态面板
+            self.ui_events.mark(UiEventBus.Region.STATUS)
+    
+    def _apply_engine_result(self, result: SearchResult, version: int):
+        """落下引擎着法（棋盘在此之前被其他命令修改时由游戏逻辑忽略）"""
+        if result.position is not None:
+            logger.info(f"引擎落子: ({result.position.row}, {result.position.col}), 评分 {result.score}, "
+                        f"深度 {result.depth}, 用时 {time.perf_counter() - self._engine_start:.2f} 秒")
+        self.game_actor.apply_engine_move(result, version)
+        self.ui_events.mark(UiEventBus.Region.STATUS)
+    
+    def _flush_ui(self):
+        """应用本帧累积的界面刷新（每帧最多一次，所有区域共用同一个快照）"""
+        regions = self.ui_events.take()
+        if not regions:
+            return
+        view = self.game_actor.view
+        if regions & UiEventBus.Region.BOARD:
+            self._update_board_view(view.snapshot)
+        if regions & UiEventBus.Region.HIGHLIGHTS:
+            self._update_highlights(view.snapshot)
+        if regions & UiEventBus.Region.STATUS:
+            self._update_status_panel(view)
+    
+    def _on_view_published(self, old: GameView, new: GameView):
+        """执行器发布新视图（在执行器线程中调用）: 按变化标记需要刷新的区域"""
+        regions = UiEventBus.Region.NONE
+        if new.snapshot is not old.snapshot:
+            regions |= UiEventBus.Region.BOARD | UiEventBus.Region.STATUS
+        if new.snapshot.winning_positions != old.snapshot.winning_positions:
+            regions |= UiEventBus.Region.HIGHLIGHTS
+        if new.game_state != old.game_state:
+            regions |= UiEventBus.Region.STATUS
+        self.ui_events.mark(regions, move=new.snapshot.move_count > old.snapshot.move_count)
+    
+    def _update_status_panel(self, view: GameView):
         """更新状态面板"""
-        game_state = self.game_logic.get_game_state()
-        current_player = self.game_logic.get_current_player()
-        move_count = len(self.game_logic.board.move_history)
+        status_text = ""
+        thinking_since = self.game_actor.thinking_since if self._engine_in_actor else \
+            self._engine_start if self._engine_version is not None else None
+        if thinking_since is not None:
+            elapsed = time.perf_counter() - thinking_since
+            self._thinking_tenths = int(elapsed * 10)
+            status_text = f"{config.get('text_thinking', '引擎思考中')} {elapsed:.1f}s"
+        else:
+            self._thinking_tenths = -1
         
         self.status_panel.update_status(
-            game_state=game_state,
-            current_player=current_player,
-            move_count=move_count
+            game_state=view.game_state,
+            current_player=view.snapshot.current_player,
+            move_count=view.snapshot.move_count,
+            status_text=status_text
         )
     
-    def _update_board_view(self):
+    def _update_board_view(self, snapshot: BoardSnapshot):
         """更新棋盘视图"""
-        board_state = self.game_logic.get_board_state()
-        self.board_view.update_board_state(board_state)
-        
-        # 如果有获胜连子，高亮显示
-        game_result = self.game_logic.get_game_result()
-        if game_result and game_result.winning_positions:
-            self.board_view.set_highlighted_positions(game_result.winning_positions)
+        if snapshot is self._board_snapshot:
+            # 棋盘版本未变化，无需更新
+            return
+        self._board_snapshot = snapshot
+        self.board_view.update_board_state(snapshot.rows)
+    
+    def _update_highlights(self, snapshot: BoardSnapshot):
+        """如果有获胜连子，高亮显示"""
+        if snapshot.winning_positions:
+            self.board_view.set_highlighted_positions(snapshot.winning_positions)
         else:
             self.board_view.clear_highlights()
     
     def _on_board_cell_click(self, row: int, col: int):
-        """处理棋盘格子点击"""
-        if self.game_logic.make_move(row, col):
-            self._update_board_view()
-            self._update_status_panel()
+        """处理棋盘格子点击（落子排入执行器，界面在视图发布后刷新）"""
+        if self.game_actor.view.snapshot.current_player == self._engine_player:
+            # 轮到引擎执棋方
+            return
+        self.game_actor.make_move(row, col)
     
     def _on_new_game_click(self):
         """处理新游戏按钮点击"""
         logger.info("新游戏按钮点击")
-        self.game_logic.start_game()
-        self._update_board_view()
-        self._update_status_panel()
+        self._cancel_engine(reset=True)
+        self.game_actor.start_game()
     
     def _on_restart_click(self):
         """处理重新开始按钮点击"""
         logger.info("重新开始按钮点击")
-        self.game_logic.restart_game()
-        self._update_board_view()
-        self._update_status_panel()
+        self._cancel_engine(reset=True)
+        self.game_actor.restart_game()
     
     def _on_undo_click(self):
         """处理悔棋按钮点击"""
         logger.info("悔棋按钮点击")
-        if self.game_logic.undo_move():
-            self._update_board_view()
-            self._update_status_panel()
+        self._cancel_engine(reset=True)
+        self.game_actor.undo_move()
     
     def _on_quit_click(self):
         """处理退出按钮点击"""
@@ -206,37 +387,22 @@ class GameWindow(arcade.Window):
         self.close()
     
     def _on_game_state_change(self, game_state: GameState):
-        """处理游戏状态变化"""
+        """处理游戏状态变化（在执行器线程中调用，界面刷新由视图发布触发）"""
         logger.info(f"游戏状态变化: {game_state.value}")
-        self._update_status_panel()
-        # 如果游戏结束，也需要更新棋盘视图以显示高亮
-        if game_state in [GameState.BLACK_WIN, GameState.WHITE_WIN, GameState.DRAW]:
-            self._update_board_view()
-            # 强制重绘窗口
-            self._force_redraw()
     
     def _on_move_made(self, player, position: Position):
-        """处理落子事件"""
+        """处理落子事件（在执行器线程中调用，界面刷新由视图发布触发）"""
         logger.info(f"落子: {player.name} at ({position.row}, {position.col})")
-        # 更新UI以反映游戏状态变化
-        self._update_board_view()
-        self._update_status_panel()
-        # 强制重绘窗口
-        self._force_redraw()
     
     def _on_game_over(self, game_result: GameResult):
-        """处理游戏结束事件"""
+        """处理游戏结束事件（在执行器线程中调用，界面刷新由视图发布触发）"""
         logger.info(f"游戏结束: {game_result}")
-        self._update_board_view()
-        self._update_status_panel()
-        # 强制重绘窗口
-        self._force_redraw()
     
     def on_draw(self):
         """绘制窗口内容"""
         # 清除背景
         arcade.set_background_color(arcade.color.WHITE)
-
+        
         arcade.draw_lbwh_rectangle_filled(
             0,
             0,
@@ -289,25 +455,29 @@ class GameWindow(arcade.Window):
         elif symbol == arcade.key.Z and modifiers & arcade.key.MOD_CTRL:
             self._on_undo_click()
     
-    def _force_redraw(self):
-        """强制窗口重绘"""
-        # 在arcade中，可以通过设置一个标志来触发重绘
-        self._update_board_view()
-        self._update_status_panel()
-    
     def on_update(self, delta_time: float):
-        """更新游戏状态"""
-        # 这里可以添加动画或其他实时更新逻辑
-        pass
+        """更新游戏状态: 提交和轮询引擎搜索，应用本帧累积的界面刷新"""
+        self._submit_engine()
+        self._poll_engine()
+        self._flush_ui()
     
     def on_close(self):
         """窗口关闭时调用"""
         logger.info("游戏窗口正在关闭...")
         
-        # 停止MCP服务器
+        # 停止MCP服务器并释放其引擎资源
         if self.mcp_server and self.mcp_server.is_running():
             self.mcp_server.stop()
             logger.info("MCP服务器已停止")
+        if self.mcp_server:
+            self.mcp_server.close()
+        
+        logger.info(f"界面刷新统计: {self.ui_events.stats()}")
+        
+        # 结束引擎工作进程和游戏逻辑执行器
+        if self.engine_worker is not None:
+            self.engine_worker.close()
+        self.game_actor.close()
         
         # 调用父类的关闭方法
         super().on_close()
@@ -0,0 +1,94 @@
+"""
+界面事件总线
+把游戏逻辑的回调合并为脏区域标记，由界面线程每帧统一应用一次
+"""
+import threading
+from enum import IntFlag
+from typing import Dict
+
+from python.util.Logger import logger
+
+
+class UiEventBus:
+    """界面事件总线类
+    
+    任意线程（界面线程、MCP服务器线程等）都可以调用mark标记需要刷新的区域，只在锁内做一次按位或；
+    界面线程在on_update中调用take取出并清空累积的区域，一帧内的多次标记因此合并为一次刷新。
+    
+    统计: events为标记次数，flushes为实际有区域需要刷新的帧数，updates为各区域的刷新次数；
+    mark(move=True)表示一次落子，updates_per_move为包含落子的帧数与落子数之比（合并后不超过1）。
+    """
+    
+    class Region(IntFlag):
+        """界面区域"""
+        NONE = 0
+        BOARD = 1
+        HIGHLIGHTS = 2
+        STATUS = 4
+        ALL = BOARD | HIGHLIGHTS | STATUS
+    
+    # 需要单独统计的区域
+    _REGIONS = (Region.BOARD, Region.HIGHLIGHTS, Region.STATUS)
+    
+    def __init__(self):
+        """初始化事件总线"""
+        self._lock = threading.Lock()
+        self._dirty = self.Region.NONE
+        # 自上次take以来的落子数
+        self._pending_moves = 0
+        
+        # 统计计数
+        self.events = 0
+        self.moves = 0
+        self.flushes = 0
+        self.move_flushes = 0
+        self.updates: Dict[str, int] = {region.name.lower(): 0 for region in self._REGIONS}
+    
+    def mark(self, regions: "UiEventBus.Region", move: bool = False):
+        """
+        标记需要刷新的区域（可在任意线程调用）
+        
+        Args:
+            regions: 区域
+            move: 是否由落子引起
+        """
+        with self._lock:
+            self._dirty |= regions
+            self.events += 1
+            if move:
+                self._pending_moves += 1
+                self.moves += 1
+    
+    def take(self) -> "UiEventBus.Region":
+        """
+        取出并清空累积的区域（在界面线程每帧调用一次）
+        
+        Returns:
+            需要刷新的区域，没有时为Region.NONE
+        """
+        with self._lock:
+            dirty = self._dirty
+            moves = self._pending_moves
+            self._dirty = self.Region.NONE
+            self._pending_moves = 0
+        if dirty:
+            self.flushes += 1
+            if moves:
+                self.move_flushes += 1
+            for region in self._REGIONS:
+                if dirty & region:
+                    self.updates[region.name.lower()] += 1
+            logger.debug(f"界面刷新: {dirty!r}, 合并 {moves} 次落子")
+        return dirty
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        获取统计信息
+        
+        Returns:
+            events、moves、flushes、各区域的刷新次数（board、highlights、status）和updates_per_move
+        """
+        stats = {"events": self.events, "moves": self.moves, "flushes": self.flushes}
+        stats.update(self.updates)
+        stats["updates_per_move"] = self.move_flushes / self.moves if self.moves else 0.0
+        return stats
@@ -2,7 +2,7 @@
 棋盘视图组件
 负责棋盘的绘制和交互
 """
-from typing import Callable, Optional
+from typing import Callable, Optional, Sequence
 
 import arcade
 
@@ -51,13 +51,13 @@ class BoardView:
         
         logger.info(f"棋盘视图初始化: 位置({x}, {y}), 大小{board_size}x{board_size}, 格子大小{cell_size}")
     
-    def update_board_state(self, board_state: list[list[Player]]):
-        """更新棋盘状态"""
+    def update_board_state(self, board_state: Sequence[Sequence[Player]]):
+        """更新棋盘状态（可以是只读快照的二维元组，视图不会修改它）"""
         self.board_state = board_state
     
-    def set_highlighted_positions(self, positions: list[Position]):
+    def set_highlighted_positions(self, positions: Sequence[Position]):
         """设置高亮位置"""
-        self.highlighted_positions = positions
+        self.highlighted_positions = list(positions)
     
     def clear_highlights(self):
         """清除所有高亮"""
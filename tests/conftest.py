@@ -0,0 +1,10 @@
+"""
+pytest配置
+把项目根目录加入模块搜索路径，使测试可以和main.py一样以python.为根导入
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
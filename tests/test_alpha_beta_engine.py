@@ -0,0 +1,91 @@
+"""
+Alpha-Beta引擎测试
+发现强制获胜、封堵对手的冲四、遵守时间预算且不修改传入的棋盘
+"""
+import time
+from typing import List, Tuple
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.models.GameModels import GameSettings, Player, Position
+
+# 黑方在(7,10)落子同时形成横向和纵向两个冲四（双四），白方只能挡住一个
+DOUBLE_FOUR_BLACK = [(7, 7), (7, 8), (7, 9), (8, 10), (9, 10), (10, 10)]
+DOUBLE_FOUR_WHITE = [(7, 6), (11, 10), (0, 0), (0, 2), (14, 14), (14, 12)]
+DOUBLE_FOUR_WIN = Position.at(7, 10)
+
+
+def setup_board(black: List[Tuple[int, int]], white: List[Tuple[int, int]], backend: str = "list"):
+    """黑白交替落子摆出局面（黑方先行）"""
+    board = BoardFactory.create_board(GameSettings(board_backend=backend))
+    for index in range(max(len(black), len(white))):
+        if index < len(black):
+            assert board.make_move(*black[index])
+        if index < len(white):
+            assert board.make_move(*white[index])
+    return board
+
+
+def test_finds_forced_win():
+    """走出双四并给出必胜分值，不修改传入的棋盘"""
+    board = setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE)
+    before = (board.zobrist_hash, board.version, len(board.move_history))
+    result = AlphaBetaEngine(time_limit=5.0, max_depth=4).search(board)
+    assert result.position == DOUBLE_FOUR_WIN
+    assert result.score >= AlphaBetaEngine.MATE_THRESHOLD
+    assert (board.zobrist_hash, board.version, len(board.move_history)) == before
+
+
+def test_finds_forced_win_without_threat_solver():
+    """不使用威胁求解器时搜索本身也能发现双四"""
+    board = setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE)
+    result = AlphaBetaEngine(time_limit=10.0, max_depth=4, use_threat_solver=False).search(board)
+    assert result.position == DOUBLE_FOUR_WIN
+    assert result.score >= AlphaBetaEngine.MATE_THRESHOLD
+    assert result.principal_variation[0] == DOUBLE_FOUR_WIN
+
+
+def test_blocks_opponent_four():
+    """对手有冲四时必须防守"""
+    # 白方在第3行有被黑方堵住一端的四连，轮到黑方
+    board = setup_board([(3, 3), (7, 7), (8, 8), (12, 1)], [(3, 4), (3, 5), (3, 6), (3, 7)])
+    assert board.current_player == Player.BLACK
+    result = AlphaBetaEngine(time_limit=2.0, max_depth=3).search(board)
+    assert result.position == Position.at(3, 8)
+
+
+def test_respects_time_budget():
+    """局面复杂时在时间预算内返回已完成深度的结果"""
+    board = setup_board([(7, 7), (8, 8), (6, 8), (9, 6)], [(7, 8), (8, 7), (6, 6), (9, 9)])
+    engine = AlphaBetaEngine(time_limit=0.3, max_depth=20, use_threat_solver=False)
+    start = time.perf_counter()
+    result = engine.search(board)
+    assert time.perf_counter() - start < 0.3 + 0.5
+    assert result.position is not None and board.is_valid_move(result.position.row, result.position.col)
+    assert 1 <= result.depth < 20
+
+
+def test_empty_board_and_finished_game():
+    """空棋盘下在中心，对局已结束时没有着法"""
+    engine = AlphaBetaEngine(time_limit=0.5)
+    assert engine.search(BoardFactory.create_board()).position == Position.at(7, 7)
+    board = setup_board([(0, col) for col in range(5)], [(1, col) for col in range(4)])
+    assert board.is_game_over
+    assert engine.search(board).position is None
+
+
+def test_search_state_carries_over_between_moves():
+    """延续上一次搜索的局面时继承主变例，悔棋后清空"""
+    board = setup_board([(7, 7), (8, 8)], [(7, 8)])
+    engine = AlphaBetaEngine(time_limit=5.0, max_depth=4, use_threat_solver=False)
+    first = engine.search(board)
+    assert engine.last_reuse["reused"] == 0
+    board.make_move(first.position.row, first.position.col)
+    reply = first.principal_variation[1]
+    board.make_move(reply.row, reply.col)
+    engine.search(board)
+    assert engine.last_reuse["reused"] == 1 and engine.last_reuse["pv_moves"] > 0
+    
+    engine.reset_search_state()
+    engine.search(board)
+    assert engine.last_reuse["reused"] == 0 and engine.last_reuse["pv_moves"] == 0
@@ -0,0 +1,60 @@
+"""
+批量模拟器测试
+每一局的结果都与在Board上重放同一落子序列的结果一致
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from python.core.BatchSimulator import BatchSimulator
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings, Player
+
+
+def replay(settings: GameSettings, moves) -> tuple:
+    """在Board上重放落子序列，返回(胜者, 步数, 是否结束)"""
+    board = BoardFactory.create_board(settings)
+    for cell in moves.tolist():
+        assert not board.is_game_over
+        assert board.make_move(*divmod(cell, board.size))
+    return board.winner, len(board.move_history), board.is_game_over
+
+
+@pytest.mark.parametrize("policy", BatchSimulator.POLICIES)
+@pytest.mark.parametrize("board_size,win_count", [(15, 5), (6, 4)])
+def test_results_match_board_replay(policy, board_size, win_count):
+    """所有对局都下到结束，胜者、步数和平局与Board重放一致"""
+    settings = GameSettings(board_size=board_size, win_count=win_count)
+    simulator = BatchSimulator(settings, num_games=64, policy=policy, seed=3)
+    results = simulator.run()
+    assert results["done"].all()
+    for game in range(simulator.num_games):
+        winner, move_count, over = replay(settings, simulator.game_moves(game))
+        assert over
+        assert winner.value == results["winners"][game]
+        assert move_count == results["move_counts"][game]
+        assert results["draws"][game] == (winner == Player.NONE)
+    
+    summary = simulator.summary()
+    assert summary["black_win_rate"] + summary["white_win_rate"] + summary["draw_rate"] == pytest.approx(1.0)
+
+
+def test_step_rejects_occupied_cells_and_skips_finished_games():
+    """落在非空位置时报错，-1和已结束的对局不落子"""
+    simulator = BatchSimulator(num_games=2, seed=1)
+    simulator.step(np.array([0, 1]))
+    with pytest.raises(ValueError):
+        simulator.step(np.array([0, 2]))
+    
+    simulator.reset()
+    for col in range(4):
+        simulator.step(np.array([col, -1]))
+        simulator.step(np.array([15 + col, -1]))
+    finished = simulator.step(np.array([4, 100]))
+    assert finished.tolist() == [True, False]
+    assert simulator.winners.tolist() == [Player.BLACK.value, 0]
+    assert simulator.move_counts.tolist() == [9, 1]
+    assert simulator.legal_mask()[0].sum() == 0
+    assert simulator.choose_moves()[0] == -1
+    simulator.step(np.array([5, 101]))
+    assert simulator.move_counts.tolist() == [9, 2]
@@ -0,0 +1,158 @@
+"""
+棋盘测试
+三种棋盘后端的行为一致，空位计数、复制和push/pop与make_move/undo_move一致
+"""
+import random
+
+import pytest
+
+from python.core.BitBoard import BitBoard
+from python.core.Board import Board
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import GameSettings, Player
+
+BACKENDS = ["list", "bitboard", "numpy"]
+
+
+def create_board(backend: str, board_size: int = 15, win_count: int = 5):
+    """创建指定后端的棋盘"""
+    return BoardFactory.create_board(GameSettings(board_size=board_size, win_count=win_count,
+                                                  board_backend=backend))
+
+
+def random_cells(seed: int, board_size: int = 15, count: int = 60):
+    """生成一串不重复的随机格子索引"""
+    return random.Random(seed).sample(range(board_size * board_size), count)
+
+
+def board_summary(board) -> tuple:
+    """汇总棋盘的可观察状态，用于比较不同后端"""
+    return (
+        [[player.value for player in row] for row in board.get_board_state()],
+        board.current_player,
+        board.is_game_over,
+        board.winner,
+        board.empty_count,
+        board.zobrist_hash,
+        sorted(board.winning_cell_indices(Player.BLACK)),
+        sorted(board.winning_cell_indices(Player.WHITE)),
+        [(player, position.to_index(board.size)) for player, position in board.move_history],
+    )
+
+
+def test_default_backend():
+    """默认后端为list，bitboard需要显式选择"""
+    assert type(BoardFactory.create_board()) is Board
+    assert type(create_board("bitboard")) is BitBoard
+    with pytest.raises(ValueError):
+        create_board("unknown")
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backends_agree(seed):
+    """三种后端在同一串落子和悔棋后状态一致"""
+    boards = [create_board(backend) for backend in BACKENDS]
+    for cell in random_cells(seed):
+        if boards[0].is_game_over:
+            break
+        wins = [board.push(cell) for board in boards]
+        assert wins == [wins[0]] * len(boards)
+        summaries = [board_summary(board) for board in boards]
+        assert summaries[1] == summaries[0]
+        assert summaries[2] == summaries[0]
+    
+    while boards[0].move_history:
+        popped = [board.pop() for board in boards]
+        assert popped == [popped[0]] * len(boards)
+        assert board_summary(boards[1]) == board_summary(boards[0])
+        assert board_summary(boards[2]) == board_summary(boards[0])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_win_detection(backend):
+    """四个方向的连子都能判断获胜，获胜连子位置正确"""
+    lines = [
+        [(7, col) for col in range(3, 8)],
+        [(row, 0) for row in range(10, 15)],
+        [(i, i) for i in range(10, 15)],
+        [(i, 14 - i) for i in range(0, 5)],
+    ]
+    for line in lines:
+        board = create_board(backend)
+        filler = [cell for cell in random_cells(99, count=40)
+                  if divmod(cell, 15) not in line][:4]
+        for index, (row, col) in enumerate(line):
+            assert board.make_move(row, col)
+            if index < 4:
+                assert not board.is_game_over
+                assert board.make_move(*divmod(filler[index], 15))
+        assert board.is_game_over and board.winner == Player.BLACK
+        assert sorted((position.row, position.col) for position in board.winning_positions) == sorted(line)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_count_and_draw(backend):
+    """空位计数随落子和悔棋增减，下满且无人获胜时判为平局"""
+    board = create_board(backend, board_size=5, win_count=5)
+    # 任何一行、一列和对角线上都有双方棋子的终局（X为黑，O为白），双方交替落子填满
+    final = ["OXXXX", "XOOXX", "XXOOX", "OXOXO", "OXOOO"]
+    black = [(row, col) for row in range(5) for col in range(5) if final[row][col] == "X"]
+    white = [(row, col) for row in range(5) for col in range(5) if final[row][col] == "O"]
+    order = [cell for pair in zip(black, white) for cell in pair] + black[len(white):]
+    for index, (row, col) in enumerate(order):
+        assert board.empty_count == 25 - index
+        assert not board.is_game_over
+        assert board.make_move(row, col)
+    assert board.empty_count == 0
+    assert board.is_game_over and board.winner == Player.NONE
+    assert board.undo_move()
+    assert board.empty_count == 1 and not board.is_game_over
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_clone_is_independent_and_quiet(backend, caplog):
+    """复制得到相同的局面，修改副本不影响原棋盘，复制时不输出初始化日志"""
+    board = create_board(backend)
+    for cell in random_cells(5, count=12):
+        board.push(cell)
+    summary = board_summary(board)
+    with caplog.at_level("INFO"):
+        caplog.clear()
+        clone = board.clone()
+    assert not caplog.records
+    assert type(clone) is type(board)
+    assert board_summary(clone) == summary
+    assert clone.version == board.version
+    
+    clone.pop()
+    clone.pop()
+    assert board_summary(board) == summary
+    assert clone.empty_count == board.empty_count + 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_push_pop_match_make_move_and_undo(backend):
+    """push/pop与make_move/undo_move得到相同的状态，pop也能撤销结束对局的make_move"""
+    board = create_board(backend)
+    other = create_board(backend)
+    for cell in random_cells(7, count=20):
+        row, col = divmod(cell, board.size)
+        assert board.make_move(row, col)
+        assert not other.push(cell)
+        assert board_summary(board) == board_summary(other)
+    for _ in range(10):
+        assert board.undo_move()
+        assert other.pop() in random_cells(7, count=20)
+        assert board_summary(board) == board_summary(other)
+    
+    board.reset()
+    for cell in (0, 20, 1, 21, 2, 22, 3, 23):
+        board.push(cell)
+    assert board.push(4) and not board.is_game_over
+    board.pop()
+    version = board.version
+    assert board.make_move(0, 4)
+    assert board.is_game_over and board.winner == Player.BLACK
+    assert board.pop() == 4
+    assert not board.is_game_over and board.winner == Player.NONE
+    assert board.current_player == Player.BLACK and board.version > version
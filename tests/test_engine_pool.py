@@ -0,0 +1,87 @@
+"""
+引擎池测试
+同一局优先借回原来的引擎、换局和悔棋时清空跨步状态、引擎数上限和关闭
+"""
+import threading
+import time
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.EnginePool import EnginePool
+
+from test_game_logic import FakeEngine
+
+
+def make_pool(size: int):
+    """创建引擎池，返回(引擎池, 已创建的引擎列表)"""
+    engines = []
+    
+    def factory():
+        engines.append(FakeEngine())
+        return engines[-1]
+    
+    return EnginePool(factory, size), engines
+
+
+def test_same_game_keeps_engine_state():
+    """同一局连续借出同一个引擎且不清空状态，换局时清空"""
+    pool, engines = make_pool(1)
+    board = BoardFactory.create_board()
+    pool.search("a", board)
+    pool.search("a", board)
+    assert engines[0].resets == 0
+    pool.search("b", board)
+    assert engines[0].resets == 1
+    assert pool.stats() == {"engines": 1, "busy": 0, "searches": 3, "resets": 1}
+
+
+def test_reset_clears_game_state():
+    """reset清空为该局保留的状态，之后借给其他局不再重复清空"""
+    pool, engines = make_pool(1)
+    board = BoardFactory.create_board()
+    pool.search("a", board)
+    pool.reset("a")
+    assert engines[0].resets == 1
+    pool.search("b", board)
+    assert engines[0].resets == 1
+
+
+class SlowEngine(FakeEngine):
+    """搜索时停留一段时间并记录同时进行的搜索数"""
+    
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    
+    def search(self, board, time_limit=None):
+        with SlowEngine.lock:
+            SlowEngine.running += 1
+            SlowEngine.peak = max(SlowEngine.peak, SlowEngine.running)
+        time.sleep(0.05)
+        with SlowEngine.lock:
+            SlowEngine.running -= 1
+        return super().search(board, time_limit)
+
+
+def test_concurrent_searches_limited_by_size():
+    """同时进行的搜索数不超过size，超出时等待归还"""
+    pool = EnginePool(SlowEngine, 2)
+    board = BoardFactory.create_board()
+    threads = [threading.Thread(target=pool.search, args=(f"game{index}", board)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert stats["engines"] == 2 and stats["searches"] == 6
+    assert SlowEngine.peak == 2
+
+
+def test_close_closes_engines():
+    """关闭时关闭所有引擎，之后不能再借出"""
+    pool, engines = make_pool(1)
+    pool.close()
+    assert engines[0].closed
+    with pytest.raises(RuntimeError):
+        pool.search("a", BoardFactory.create_board())
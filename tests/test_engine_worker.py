@@ -0,0 +1,66 @@
+"""
+引擎工作进程测试
+在工作进程中搜索、作废后丢弃结果、后台思考的取用，以及以路径给出的开局库
+"""
+import time
+
+import pytest
+
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.EngineWorker import EngineWorker
+
+from test_alpha_beta_engine import DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE, DOUBLE_FOUR_WIN, setup_board
+
+
+@pytest.fixture(scope="module")
+def worker():
+    """模块内共用的工作进程（启动需要导入引擎模块）"""
+    with EngineWorker(AlphaBetaEngine, time_limit=5.0, max_depth=4,
+                      opening_book="missing_opening_book.sqlite") as worker:
+        worker.start()
+        yield worker
+
+
+def test_search_in_worker(worker):
+    """阻塞搜索返回工作进程中的结果，不修改传入的棋盘"""
+    board = setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE)
+    before = (board.zobrist_hash, len(board.move_history))
+    result = worker.search(board)
+    assert result.position == DOUBLE_FOUR_WIN
+    assert (board.zobrist_hash, len(board.move_history)) == before
+    assert not worker.busy
+
+
+def test_poll_until_result(worker):
+    """submit立即返回，poll在结果到达前返回None"""
+    board = setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE)
+    worker.submit(board)
+    assert worker.busy
+    deadline = time.monotonic() + 10.0
+    result = None
+    while result is None and time.monotonic() < deadline:
+        result = worker.poll()
+        time.sleep(0.01)
+    assert result is not None and result.position == DOUBLE_FOUR_WIN
+
+
+def test_cancelled_result_is_dropped(worker):
+    """作废的请求的结果被丢弃，之后的请求正常返回"""
+    board = setup_board([(7, 7), (8, 8)], [(7, 8)])
+    worker.submit(board, 30.0)
+    worker.cancel()
+    assert not worker.busy
+    assert worker.poll() is None
+    start = time.monotonic()
+    result = worker.search(setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE))
+    assert result.position == DOUBLE_FOUR_WIN
+    # 停止事件使被作废的长时间搜索提前结束
+    assert time.monotonic() - start < 10.0
+
+
+def test_ponder_finish(worker):
+    """后台思考命中时finish取用其结果"""
+    worker.ponder(setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE), 30.0)
+    result = worker.finish(5.0)
+    assert result.position == DOUBLE_FOUR_WIN
+    assert not worker.busy
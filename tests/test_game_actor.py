@@ -0,0 +1,199 @@
+"""
+游戏逻辑执行器测试
+命令按提交顺序执行、视图在Future完成前发布，引擎线程搜索的结果按提交时的版本落子，以及引擎线程中的后台思考
+"""
+import threading
+import time
+
+from python.core.GameActor import GameActor
+from python.core.GameLogic import GameLogic
+from python.models.GameModels import GameState, Player, Position, SearchResult
+
+from test_game_logic import FakeEngine, PonderEngine
+
+
+class ProbingEngine:
+    """搜索时在棋盘副本上推演（推进版本号）后按固定顺序落子的引擎"""
+    
+    def __init__(self):
+        self.time_limit = 0.1
+        self.searches = 0
+    
+    def search(self, board, time_limit=None) -> SearchResult:
+        self.searches += 1
+        position = next(Position.at(row, col) for row in range(15) for col in range(15)
+                        if board.is_valid_move(row, col))
+        board.push(position.to_index(board.size))
+        board.pop()
+        return SearchResult(position, 0, 1, 1, 0.0, (position,))
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    """等待条件成立（引擎线程和执行线程异步推进）"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_commands_run_in_order():
+    """命令按提交顺序在同一个执行线程中执行"""
+    actor = GameActor(GameLogic())
+    try:
+        order, threads = [], set()
+        
+        def record(index):
+            def command(logic):
+                order.append(index)
+                threads.add(threading.current_thread().name)
+                return index
+            return command
+        
+        futures = [actor.submit(record(index)) for index in range(20)]
+        assert [future.result(timeout=5) for future in futures] == list(range(20))
+        assert order == list(range(20))
+        assert threads == {"GameActor"}
+    finally:
+        actor.close()
+
+
+def test_view_published_before_future():
+    """命令的Future完成时新视图已经发布"""
+    actor = GameActor(GameLogic())
+    try:
+        actor.start_game().result(timeout=5)
+        assert actor.view.game_state == GameState.PLAYING
+        revision = actor.view.revision
+        assert actor.make_move(7, 7).result(timeout=5)
+        assert actor.view.snapshot.move_count == 1
+        assert actor.view.revision == revision + 1
+        assert actor.get_current_player() == Player.WHITE
+    finally:
+        actor.close()
+
+
+def test_failed_command_reports_exception():
+    """命令抛出的异常由Future传递，执行线程继续执行后续命令"""
+    actor = GameActor(GameLogic())
+    try:
+        future = actor.submit(lambda logic: 1 / 0)
+        try:
+            future.result(timeout=5)
+            assert False, "应抛出异常"
+        except ZeroDivisionError:
+            pass
+        assert actor.submit(lambda logic: 42).result(timeout=5) == 42
+        assert actor.failures == 1
+    finally:
+        actor.close()
+
+
+def test_engine_reply_uses_version_before_search():
+    """引擎搜索时推进了副本的版本号，结果仍按提交时的版本落下"""
+    engine = ProbingEngine()
+    actor = GameActor(GameLogic())
+    try:
+        actor.start_game().result(timeout=5)
+        actor.set_engine(engine, Player.WHITE).result(timeout=5)
+        actor.make_move(7, 7).result(timeout=5)
+        assert wait_for(lambda: actor.view.snapshot.move_count == 2)
+        assert engine.searches == 1
+        assert actor.get_current_player() == Player.BLACK
+    finally:
+        actor.close()
+
+
+def test_stale_engine_reply_is_ignored():
+    """棋盘在搜索期间被修改时忽略过期的结果"""
+    actor = GameActor(GameLogic())
+    try:
+        boards = []
+        actor.start_game().result(timeout=5)
+        actor.submit(lambda logic: logic.set_engine_callback(boards.append, Player.WHITE)).result(timeout=5)
+        actor.make_move(7, 7).result(timeout=5)
+        version = boards[0].version
+        actor.undo_move().result(timeout=5)
+        actor.make_move(7, 8).result(timeout=5)
+        reply = SearchResult(Position.at(0, 0), 0, 1, 1, 0.0)
+        assert not actor.apply_engine_move(reply, version).result(timeout=5)
+        assert actor.apply_engine_move(reply, boards[-1].version).result(timeout=5)
+        assert actor.view.snapshot.move_count == 2
+    finally:
+        actor.close()
+
+
+def start_actor(engine, ponder: bool = True) -> GameActor:
+    """开始一局由engine在引擎线程中执白的对局"""
+    actor = GameActor(GameLogic())
+    actor.start_game().result(timeout=5)
+    actor.set_engine(engine, Player.WHITE, ponder).result(timeout=5)
+    return actor
+
+
+def test_actor_ponder_hit():
+    """经执行器设置的引擎在落子后后台思考，对手走出预测的应着时取用其结果"""
+    engine = PonderEngine()
+    actor = start_actor(engine)
+    try:
+        actor.make_move(7, 7).result(timeout=5)
+        assert wait_for(lambda: engine.pondered)
+        assert engine.pondered == [(7 * 15 + 7, 0, 16)]
+        actor.make_move(1, 1).result(timeout=5)
+        assert wait_for(lambda: actor.view.snapshot.move_count == 4)
+        assert actor.ponder_hits == 1 and engine.finished == 1 and engine.searches == 1
+        assert actor.view.snapshot.rows[14][14] == Player.WHITE
+    finally:
+        actor.close()
+
+
+def test_actor_ponder_miss():
+    """对手没有走出预测的应着时作废后台思考并重新搜索"""
+    engine = PonderEngine()
+    actor = start_actor(engine)
+    try:
+        actor.make_move(7, 7).result(timeout=5)
+        assert wait_for(lambda: engine.pondered)
+        actor.make_move(2, 2).result(timeout=5)
+        assert wait_for(lambda: actor.view.snapshot.move_count == 4)
+        assert actor.ponder_misses == 1 and engine.cancels == 1
+        assert engine.finished == 0 and engine.searches == 2
+    finally:
+        actor.close()
+
+
+def test_actor_ponder_cancelled_on_undo_and_restart():
+    """悔棋和重新开始时引擎线程作废后台思考并清空引擎状态"""
+    engine = PonderEngine()
+    actor = start_actor(engine)
+    try:
+        actor.make_move(7, 7).result(timeout=5)
+        assert wait_for(lambda: engine.pondered)
+        resets = engine.resets
+        assert actor.undo_move().result(timeout=5)
+        assert wait_for(lambda: engine.cancels == 1 and engine.resets == resets + 1)
+        
+        actor.make_move(7, 7).result(timeout=5)
+        assert wait_for(lambda: len(engine.pondered) == 2)
+        actor.restart_game().result(timeout=5)
+        assert wait_for(lambda: engine.cancels == 2 and engine.resets == resets + 2)
+        
+        # 作废后不再取用后台思考的结果
+        actor.make_move(1, 1).result(timeout=5)
+        assert wait_for(lambda: actor.view.snapshot.move_count == 2)
+        assert engine.finished == 0 and actor.ponder_hits == actor.ponder_misses == 0
+    finally:
+        actor.close()
+
+
+def test_actor_ponder_requires_engine_support():
+    """引擎不支持后台思考时照常搜索"""
+    engine = FakeEngine()
+    actor = start_actor(engine)
+    try:
+        actor.make_move(7, 7).result(timeout=5)
+        assert wait_for(lambda: actor.view.snapshot.move_count == 2)
+        assert engine.searches == 1
+    finally:
+        actor.close()
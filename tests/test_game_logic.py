@@ -0,0 +1,216 @@
+"""
+游戏逻辑测试
+引擎执棋方的自动落子、悔棋与引擎回合的衔接、后台思考，以及core包不依赖engine包
+"""
+import subprocess
+import sys
+from typing import List, Optional
+
+from python.core.GameLogic import GameLogic
+from python.models.GameModels import GameState, Player, Position, SearchResult
+
+from conftest import PROJECT_ROOT
+
+
+class FakeEngine:
+    """按固定顺序落子的同步引擎，记录搜索和清空状态的次数"""
+    
+    def __init__(self, moves: Optional[List[Position]] = None):
+        self.time_limit = 0.1
+        self.moves = moves or [Position.at(row, col) for row in range(15) for col in range(15)]
+        self.searches = 0
+        self.resets = 0
+        self.closed = False
+    
+    def search(self, board, time_limit=None) -> SearchResult:
+        self.searches += 1
+        position = next(move for move in self.moves if board.is_valid_move(move.row, move.col))
+        return SearchResult(position, 0, 1, 1, 0.0, (position,))
+    
+    def reset_search_state(self):
+        self.resets += 1
+    
+    def close(self):
+        self.closed = True
+
+
+class PonderEngine(FakeEngine):
+    """支持后台思考的假引擎（接口同EngineWorker）: 主变例预测对手的应着，finish返回固定的应对"""
+    
+    def __init__(self, reply: Position = Position.at(14, 14)):
+        super().__init__()
+        self.reply = reply
+        self.pondered = []
+        self.finished = 0
+        self.cancels = 0
+    
+    def search(self, board, time_limit=None) -> SearchResult:
+        result = super().search(board, time_limit)
+        # 预测对手下在引擎着法的右下方
+        position = result.position
+        return SearchResult(position, 0, 1, 1, 0.0, (position, Position.at(position.row + 1, position.col + 1)))
+    
+    def ponder(self, board, time_limit: float):
+        self.pondered.append(tuple(board.move_history.cells))
+    
+    def finish(self, timeout: float) -> SearchResult:
+        self.finished += 1
+        return SearchResult(self.reply, 0, 3, 1, 0.0, (self.reply,))
+    
+    def cancel(self):
+        self.cancels += 1
+
+
+def start_logic(engine, player: Player, ponder: bool = False) -> GameLogic:
+    """开始一局由engine执player的对局"""
+    logic = GameLogic()
+    logic.start_game()
+    logic.set_engine(engine, player, ponder)
+    return logic
+
+
+def test_core_does_not_import_engine():
+    """导入GameLogic、GameActor和SessionManager不会加载engine包"""
+    code = ("import sys; import python.core.GameLogic; import python.core.GameActor; "
+            "import python.core.SessionManager; sys.exit(any(name.startswith('python.engine') for name in sys.modules))")
+    assert subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT).returncode == 0
+
+
+def test_engine_replies_to_moves():
+    """轮到引擎执棋方时自动搜索并落子，统计计入本局"""
+    engine = FakeEngine()
+    logic = start_logic(engine, Player.WHITE)
+    assert engine.searches == 0
+    assert logic.make_move(7, 7)
+    assert len(logic.board.move_history) == 2
+    assert logic.get_current_player() == Player.BLACK
+    assert logic.get_engine_stats()["searches"] == 1
+
+
+def test_engine_plays_first_as_black():
+    """引擎执黑时设置后立即落子"""
+    engine = FakeEngine()
+    logic = start_logic(engine, Player.BLACK)
+    assert engine.searches == 1
+    assert logic.board.move_history[0] == (Player.BLACK, Position.at(0, 0))
+
+
+def test_undo_removes_engine_reply():
+    """悔棋连同引擎的应着一起撤销，回到玩家回合并清空引擎状态"""
+    engine = FakeEngine()
+    logic = start_logic(engine, Player.WHITE)
+    logic.make_move(7, 7)
+    logic.make_move(7, 8)
+    resets = engine.resets
+    assert logic.undo_move()
+    assert len(logic.board.move_history) == 2
+    assert logic.get_current_player() == Player.BLACK
+    assert engine.resets == resets + 1
+    assert engine.searches == 2
+
+
+def test_undo_engine_first_move_replays_it():
+    """引擎执黑时撤销它唯一的一手，引擎重新落子，对局不会卡在引擎回合"""
+    engine = FakeEngine()
+    logic = start_logic(engine, Player.BLACK)
+    assert logic.undo_move()
+    assert engine.searches == 2
+    assert len(logic.board.move_history) == 1
+    assert logic.get_current_player() == Player.WHITE
+    assert logic.game_state == GameState.PLAYING
+
+
+def test_replaced_engine_is_closed():
+    """替换引擎时关闭旧引擎，取消引擎后不再自动落子"""
+    first = FakeEngine()
+    logic = start_logic(first, Player.WHITE)
+    logic.set_engine(None)
+    assert first.closed
+    assert logic.engine_player == Player.NONE
+    logic.make_move(7, 7)
+    assert len(logic.board.move_history) == 1
+
+
+def test_async_engine_callback():
+    """异步引擎收到棋盘副本，过期的版本被忽略"""
+    boards = []
+    logic = GameLogic()
+    logic.start_game()
+    logic.set_engine_callback(boards.append, Player.WHITE)
+    logic.make_move(7, 7)
+    assert len(boards) == 1 and boards[0] is not logic.board
+    version = boards[0].version
+    reply = SearchResult(Position.at(7, 8), 0, 1, 1, 0.0)
+    assert not logic.apply_engine_move(reply, version + 1)
+    assert logic.apply_engine_move(reply, version)
+    assert logic.get_current_player() == Player.BLACK
+    
+    # 撤销后轮到玩家，不提交新的搜索
+    assert logic.undo_move()
+    assert len(boards) == 1
+
+
+def test_ponder_hit_uses_background_result():
+    """对手走出预测的应着时取用后台思考的结果，不再搜索"""
+    engine = PonderEngine()
+    logic = start_logic(engine, Player.WHITE, ponder=True)
+    logic.make_move(7, 7)
+    # 引擎下(0, 0)，预测对手下(1, 1)
+    assert engine.pondered == [(7 * 15 + 7, 0, 16)]
+    logic.make_move(1, 1)
+    assert logic.ponder_hits == 1 and engine.finished == 1
+    assert engine.searches == 1
+    assert logic.board.move_history[-1] == (Player.WHITE, Position.at(14, 14))
+
+
+def test_ponder_miss_searches_again():
+    """对手没有走出预测的应着时作废后台思考并重新搜索"""
+    engine = PonderEngine()
+    logic = start_logic(engine, Player.WHITE, ponder=True)
+    logic.make_move(7, 7)
+    logic.make_move(2, 2)
+    assert logic.ponder_misses == 1 and engine.cancels == 1
+    assert engine.finished == 0 and engine.searches == 2
+
+
+def test_ponder_cancelled_on_undo_and_restart():
+    """悔棋和重新开始作废后台思考"""
+    engine = PonderEngine()
+    logic = start_logic(engine, Player.WHITE, ponder=True)
+    logic.make_move(7, 7)
+    assert logic.undo_move()
+    assert engine.cancels == 1
+    logic.make_move(7, 7)
+    logic.restart_game()
+    assert engine.cancels == 2
+    assert engine.finished == 0 and logic.ponder_hits == logic.ponder_misses == 0
+
+
+def test_ponder_requires_engine_support():
+    """引擎不支持后台思考时关闭后台思考"""
+    logic = start_logic(FakeEngine(), Player.WHITE, ponder=True)
+    assert not logic.ponder
+
+
+def test_resign_ends_board():
+    """认输时棋盘记录胜方并推进版本，快照与游戏状态一致"""
+    logic = GameLogic()
+    logic.start_game()
+    logic.make_move(7, 7)
+    version = logic.board.version
+    assert logic.resign(Player.WHITE)
+    snapshot = logic.get_snapshot()
+    assert logic.game_state == GameState.BLACK_WIN
+    assert snapshot.is_game_over and snapshot.winner == Player.BLACK
+    assert snapshot.version > version and logic.get_moves_since(version) == []
+    assert logic.get_game_result().winner == Player.BLACK
+    assert not logic.make_move(8, 8)
+
+
+def test_restore_resigned_game():
+    """恢复以认输结束的对局时棋盘同样处于结束状态"""
+    logic = GameLogic()
+    logic.restore_game([7 * 15 + 7], GameState.WHITE_WIN, 10)
+    snapshot = logic.get_snapshot()
+    assert snapshot.is_game_over and snapshot.winner == Player.WHITE
+    assert snapshot.version >= 10
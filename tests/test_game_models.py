@@ -0,0 +1,80 @@
+"""
+数据模型测试
+共享的不可变Position实例、紧凑的落子历史和只读快照
+"""
+import pickle
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.models.GameModels import MoveHistory, Player, Position
+
+
+def test_position_instances_are_shared_and_immutable():
+    """at/from_index返回共享实例，与直接构造的实例相等，不能修改"""
+    table = Position.index_table(15)
+    assert Position.at(3, 4) is table[3 * 15 + 4] is Position.from_index(49, 15)
+    assert Position(3, 4) == Position.at(3, 4) and hash(Position(3, 4)) == hash(Position.at(3, 4))
+    assert Position.at(3, 4).to_index(15) == 49
+    with pytest.raises(AttributeError):
+        Position.at(3, 4).row = 5
+    with pytest.raises(ValueError):
+        Position("3", 4)
+    assert pickle.loads(pickle.dumps(Position.at(3, 4))) == Position.at(3, 4)
+
+
+def test_position_at_outside_grid():
+    """超出共享网格或为负数的坐标得到新实例，不会取到其他格子"""
+    Position.index_table(15)
+    size = len(Position._grid)
+    assert Position.at(-1, 0) == Position(-1, 0)
+    assert Position.at(size, 0) == Position(size, 0)
+    assert len(Position._grid) == size
+
+
+def test_move_history_sequence():
+    """落子历史按(玩家, 位置)序列访问，支持下标、切片、比较和弹出"""
+    history = MoveHistory(15)
+    history.push(0, Player.BLACK)
+    history.append((Player.WHITE, Position.at(1, 2)))
+    history.push(224, Player.BLACK)
+    assert len(history) == 3
+    assert history[1] == (Player.WHITE, Position.at(1, 2))
+    assert history[-1] == (Player.BLACK, Position.at(14, 14))
+    assert history[:2] == [(Player.BLACK, Position.at(0, 0)), (Player.WHITE, Position.at(1, 2))]
+    assert list(history.cells) == [0, 17, 224]
+    assert history == list(history)
+    assert history.pop() == (Player.BLACK, Position.at(14, 14))
+    assert history.pop_cell() == (17, Player.WHITE)
+    history.clear()
+    assert not history
+
+
+
+def test_snapshot_is_shared_per_version():
+    """同一版本共享快照，落子后生成新快照，旧快照不变"""
+    board = BoardFactory.create_board()
+    board.make_move(7, 7)
+    first = board.get_snapshot()
+    assert board.get_snapshot() is first
+    board.make_move(7, 8)
+    second = board.get_snapshot()
+    assert second is not first and second.version > first.version
+    assert first.cells[7 * 15 + 8] == Player.NONE.value
+    assert second.cells[7 * 15 + 8] == Player.WHITE.value
+    compact = second.to_compact()
+    assert compact[7 * 15 + 7] == "X" and compact[7 * 15 + 8] == "O" and compact.count(".") == 223
+
+
+def test_snapshot_is_immutable_and_consistent_with_board():
+    """快照不能修改，各字段与生成时的棋盘一致"""
+    board = BoardFactory.create_board()
+    for row, col in [(7, 7), (0, 0), (7, 8), (0, 1), (7, 9), (0, 2), (7, 10), (0, 3), (7, 11)]:
+        board.make_move(row, col)
+    snapshot = board.get_snapshot()
+    with pytest.raises(AttributeError):
+        snapshot.version = 0
+    assert snapshot.is_game_over and snapshot.winner == Player.BLACK
+    assert snapshot.move_count == 9 and snapshot.zobrist_hash == board.zobrist_hash
+    assert [position.col for position in snapshot.winning_positions] == [7, 8, 9, 10, 11]
+    assert snapshot.rows[7][11] == Player.BLACK
@@ -0,0 +1,54 @@
+"""
+并行搜索测试
+多个工作进程共享置换表搜索，找到强制获胜；外部停止信号提前结束搜索
+"""
+import threading
+import time
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.LazySmpEngine import LazySmpEngine
+from python.models.GameModels import GameSettings, Position
+
+# 黑方在(7,10)落子同时形成横向和纵向两个冲四（双四）
+DOUBLE_FOUR_MOVES = [(7, 7), (7, 6), (7, 8), (11, 10), (7, 9), (0, 0), (8, 10), (0, 2), (9, 10), (14, 14),
+                     (10, 10), (14, 12)]
+
+
+def setup_board(moves=DOUBLE_FOUR_MOVES):
+    """按顺序落子摆出局面"""
+    board = BoardFactory.create_board(GameSettings())
+    for row, col in moves:
+        assert board.make_move(row, col)
+    return board
+
+
+def test_parallel_search_finds_forced_win():
+    """两个工作进程找到双四，进程池和共享置换表在close时释放"""
+    board = setup_board()
+    with LazySmpEngine(time_limit=10.0, workers=2, max_depth=4, table_size_mb=1) as engine:
+        result = engine.search(board)
+        assert result.position == Position.at(7, 10)
+        assert result.score >= AlphaBetaEngine.MATE_THRESHOLD
+        assert engine._table is not None
+    assert engine._executor is None and engine._table is None
+
+
+def test_single_worker_runs_in_process():
+    """workers=1时在当前进程内搜索，不创建进程池"""
+    with LazySmpEngine(time_limit=5.0, workers=1, max_depth=4) as engine:
+        assert engine.search(setup_board()).position == Position.at(7, 10)
+        assert engine._executor is None
+
+
+def test_stop_event_ends_search_early():
+    """设置stop_event后在截止时间之前返回已完成深度的结果"""
+    board = setup_board([(7, 7), (7, 8), (8, 8), (6, 6)])
+    with LazySmpEngine(time_limit=30.0, workers=2, max_depth=30, table_size_mb=1) as engine:
+        engine.search(board, time_limit=0.1)
+        engine.stop_event = threading.Event()
+        threading.Timer(0.5, engine.stop_event.set).start()
+        start = time.perf_counter()
+        result = engine.search(board)
+        assert time.perf_counter() - start < 10.0
+        assert result.position is not None and board.is_valid_move(result.position.row, result.position.col)
@@ -0,0 +1,81 @@
+"""
+连线窗口测试
+由窗口计数维护的成五点和活四与逐格扫描整个棋盘的结果一致
+"""
+import random
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.core.LineWindowIndex import LineWindowIndex
+from python.models.GameModels import GameSettings, Player
+
+SIZE = 15
+
+
+def scan_winning_cells(board, player: Player) -> set:
+    """逐格扫描: 落子后能在任一方向连成win_count子的空位"""
+    state = board.get_board_state()
+    cells = set()
+    for row in range(SIZE):
+        for col in range(SIZE):
+            if state[row][col] != Player.NONE:
+                continue
+            for dr, dc in LineWindowIndex.DIRECTIONS:
+                run = 1
+                for sign in (1, -1):
+                    r, c = row + sign * dr, col + sign * dc
+                    while 0 <= r < SIZE and 0 <= c < SIZE and state[r][c] == player:
+                        run += 1
+                        r, c = r + sign * dr, c + sign * dc
+                if run >= board.win_count:
+                    cells.add(row * SIZE + col)
+                    break
+    return cells
+
+
+def scan_open_fours(board, player: Player) -> list:
+    """逐格扫描: 两端为空的win_count-1个连续棋子"""
+    state = board.get_board_state()
+    length = board.win_count + 1
+    fours = []
+    for dr, dc in LineWindowIndex.DIRECTIONS:
+        for row in range(SIZE):
+            for col in range(SIZE):
+                cells = [(row + dr * i, col + dc * i) for i in range(length)]
+                if not all(0 <= r < SIZE and 0 <= c < SIZE for r, c in cells):
+                    continue
+                values = [state[r][c] for r, c in cells]
+                if values[0] == values[-1] == Player.NONE and all(value == player for value in values[1:-1]):
+                    fours.append((cells[0], cells[-1]))
+    return sorted(fours)
+
+
+def test_window_layout():
+    """每个窗口有win_count个格子，经过每个格子的窗口数不超过4 * win_count"""
+    index = LineWindowIndex.for_size(SIZE, 5)
+    assert LineWindowIndex.for_size(SIZE, 5) is index
+    # 水平和垂直各SIZE * (SIZE - 4)个，两条对角线方向各(SIZE - 4)²个
+    assert index.window_count == 2 * SIZE * (SIZE - 4) + 2 * (SIZE - 4) ** 2
+    assert all(len(cells) == 5 for cells in index.window_cells)
+    assert max(len(windows) for windows in index.cell_windows) == 20
+    assert len(index.cell_windows[0]) == 3
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard", "numpy"])
+@pytest.mark.parametrize("seed", range(4))
+def test_threats_match_full_scan(backend, seed):
+    """随机对局中每一步的成五点和活四都与整盘扫描一致"""
+    board = BoardFactory.create_board(GameSettings(board_backend=backend))
+    rng = random.Random(seed)
+    # 集中在中心区域落子，使局面中出现较多的连子
+    cells = [row * SIZE + col for row in range(4, 11) for col in range(4, 11)]
+    rng.shuffle(cells)
+    for cell in cells:
+        if board.is_game_over:
+            break
+        board.push(cell)
+        for player in (Player.BLACK, Player.WHITE):
+            assert board.winning_cell_indices(player) == scan_winning_cells(board, player)
+            fours = [((first.row, first.col), (last.row, last.col)) for first, last in board.get_open_fours(player)]
+            assert sorted(fours) == scan_open_fours(board, player)
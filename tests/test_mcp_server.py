@@ -0,0 +1,143 @@
+"""
+MCP服务器测试
+带game_id的对局工具: 座位校验、与引擎对局、引擎搜索失败后的重试，以及并发的多局对局
+"""
+import asyncio
+from typing import Any, Dict
+
+import pytest
+from fastmcp import Client
+
+from python.core.GameLogic import GameLogic
+from python.core.SessionManager import SessionManager
+from python.engine.EnginePool import EnginePool
+from python.server.McpServer import McpServer
+
+from test_game_logic import FakeEngine
+from test_session_manager import FailingEngine
+
+
+@pytest.fixture
+def make_server():
+    """创建使用给定引擎的MCP服务器（不启动网络服务），测试结束时关闭"""
+    servers = []
+    
+    def make(engine=None) -> McpServer:
+        engine = engine or FakeEngine()
+        servers.append(McpServer(GameLogic(), SessionManager(engines=EnginePool(lambda: engine, 1))))
+        return servers[-1]
+    
+    yield make
+    for server in servers:
+        server.close()
+        server.game_actor.close()
+
+
+def call(server: McpServer, *calls) -> list:
+    """在内存中的客户端上依次调用工具，返回各次调用的结果"""
+    async def run():
+        results = []
+        async with Client(server.mcp) as client:
+            for name, arguments in calls:
+                result = await client.call_tool(name, arguments(results) if callable(arguments) else arguments)
+                results.append(result.data)
+        return results
+    return asyncio.run(run())
+
+
+def game_id_of(results) -> Dict[str, Any]:
+    """第一个结果（create_game）中的对局ID"""
+    return {"game_id": results[0]["game_id"]}
+
+
+def test_game_move_checks_seat(make_server):
+    """只有轮到的执棋方的玩家可以落子"""
+    server = make_server()
+    results = call(server,
+                   ("create_game", {"player_name": "alice"}),
+                   ("join_game", lambda results: {**game_id_of(results), "player_name": "bob"}),
+                   ("game_move", lambda results: {**game_id_of(results), "player_name": "bob", "row": 7, "col": 7}),
+                   ("game_move", lambda results: {**game_id_of(results), "player_name": "alice", "row": 7, "col": 7}))
+    assert results[1]["player"] == "WHITE"
+    assert not results[2]["success"]
+    assert results[3]["success"] and results[3]["move_count"] == 1
+
+
+def test_game_move_returns_engine_reply(make_server):
+    """与引擎对局时落子的响应带有引擎的应着"""
+    server = make_server()
+    results = call(server,
+                   ("create_game", {"player_name": "alice", "vs_engine": True}),
+                   ("game_move", lambda results: {**game_id_of(results), "player_name": "alice", "row": 7, "col": 7}))
+    assert results[0]["engine_player"] == "WHITE"
+    assert results[1]["engine_move"] == {"player": "WHITE", "position": [0, 0]}
+    assert results[1]["move_count"] == 2 and results[1]["current_player"] == "BLACK"
+
+
+def test_engine_failure_is_retried(make_server):
+    """引擎搜索失败时玩家的落子仍然有效，之后的game_state重试引擎的应着"""
+    server = make_server(FailingEngine())
+    results = call(server,
+                   ("create_game", {"player_name": "alice", "vs_engine": True}),
+                   ("game_move", lambda results: {**game_id_of(results), "player_name": "alice", "row": 7, "col": 7}),
+                   ("game_state", game_id_of))
+    assert results[1]["success"] and "engine_error" in results[1]
+    assert results[1]["move_count"] == 1 and results[1]["current_player"] == "WHITE"
+    assert results[2]["move_count"] == 2 and "engine_error" not in results[2]
+
+
+def test_games_are_independent(make_server):
+    """多局对局各自独立"""
+    server = make_server()
+    
+    async def play(client, row):
+        created = (await client.call_tool("create_game", {"player_name": "alice", "play_as": "BLACK"})).data
+        game_id = created["game_id"]
+        await client.call_tool("game_move", {"game_id": game_id, "player_name": "alice", "row": row, "col": row})
+        return (await client.call_tool("game_state", {"game_id": game_id})).data
+    
+    async def run():
+        async with Client(server.mcp) as client:
+            return await asyncio.gather(*(play(client, row) for row in range(4)))
+    
+    states = asyncio.run(run())
+    assert len({state["game_id"] for state in states}) == 4
+    for row, state in enumerate(states):
+        assert state["move_count"] == 1
+        assert state["board"][row * 15 + row] == "X"
+
+
+def test_state_is_compact_with_deltas(make_server):
+    """状态默认为紧凑字符串，带since_version时只返回之后的落子，版本未变时只返回unchanged"""
+    server = make_server()
+    results = call(server,
+                   ("create_game", {"player_name": "alice", "vs_engine": True}),
+                   ("game_move", lambda results: {**game_id_of(results), "player_name": "alice", "row": 7, "col": 7,
+                                                  "since_version": results[0]["board_version"]}),
+                   ("game_state", lambda results: {**game_id_of(results),
+                                                   "since_version": results[1]["board_version"]}),
+                   ("game_state", lambda results: {**game_id_of(results), "verbose": True}))
+    created, moved, unchanged, verbose = results
+    assert len(created["board"]) == 15 * 15 and set(created["board"]) == {"."}
+    assert moved["moves"] == [[7, 7, "X"], [0, 0, "O"]] and "board" not in moved
+    assert unchanged["unchanged"] and "moves" not in unchanged
+    assert verbose["board"][7][7] == "BLACK" and len(verbose["available_moves"]) == 15 * 15 - 2
+
+
+def test_resign_state_agrees_with_delta(make_server):
+    """认输后完整状态和增量状态给出相同的结果，完整状态没有可用位置"""
+    server = make_server()
+    results = call(server,
+                   ("create_game", {"player_name": "alice", "vs_engine": True}),
+                   ("resign_game", lambda results: {**game_id_of(results), "player_name": "alice"}),
+                   ("game_state", lambda results: {**game_id_of(results),
+                                                   "since_version": results[0]["board_version"]}),
+                   ("game_state", lambda results: {**game_id_of(results), "verbose": True}))
+    created, resigned, delta, full = results
+    assert resigned["success"] and resigned["game_state"] == "white_win"
+    assert delta["moves"] == [] and delta["game_state"] == "white_win"
+    assert delta["board_version"] == full["board_version"] > created["board_version"]
+    assert full["game_state"] == "white_win" and full["available_moves"] == []
+    
+    moved = call(server, ("game_move", {**game_id_of(results), "player_name": "alice", "row": 7, "col": 7}))[0]
+    assert not moved["success"]
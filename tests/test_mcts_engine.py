@@ -0,0 +1,82 @@
+"""
+MCTS引擎测试
+单进程和根并行进程池都能找到成五和封堵点，模拟次数按进程分摊
+"""
+from typing import List, Tuple
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.MctsEngine import MctsEngine
+from python.models.GameModels import GameSettings, Position
+
+# 黑方横向活四，轮到黑方
+OPEN_FOUR_BLACK = [(7, 5), (7, 6), (7, 7), (7, 8)]
+OPEN_FOUR_WHITE = [(0, 0), (0, 2), (14, 14), (14, 12)]
+OPEN_FOUR_WINS = (Position.at(7, 4), Position.at(7, 9))
+
+
+def setup_board(black: List[Tuple[int, int]], white: List[Tuple[int, int]]):
+    """黑白交替落子摆出局面（黑方先行）"""
+    board = BoardFactory.create_board(GameSettings())
+    for index in range(max(len(black), len(white))):
+        if index < len(black):
+            assert board.make_move(*black[index])
+        if index < len(white):
+            assert board.make_move(*white[index])
+    return board
+
+
+def test_completes_open_four_in_process():
+    """单进程模式下直接成五，不修改传入的棋盘"""
+    board = setup_board(OPEN_FOUR_BLACK, OPEN_FOUR_WHITE)
+    before = board.zobrist_hash
+    with MctsEngine(time_limit=5.0, workers=1, seed=1) as engine:
+        result = engine.search(board, playouts=200)
+    assert result.position in OPEN_FOUR_WINS
+    assert result.nodes == 200
+    assert board.zobrist_hash == before
+    assert sum(share for _, share in result.distribution) == pytest.approx(1.0)
+
+
+def test_blocks_opponent_four():
+    """对手差一子成五时只考虑封堵点"""
+    # 白方在第3行有被黑方堵住一端的四连，轮到黑方
+    board = setup_board([(3, 2), (7, 7), (9, 9), (12, 12)], [(3, 3), (3, 4), (3, 5), (3, 6)])
+    with MctsEngine(time_limit=5.0, workers=1, seed=2) as engine:
+        result = engine.search(board, playouts=100)
+    assert result.position == Position.at(3, 7)
+
+
+def test_root_parallel_search():
+    """两个工作进程分摊模拟次数并合并根节点统计"""
+    board = setup_board(OPEN_FOUR_BLACK, OPEN_FOUR_WHITE)
+    with MctsEngine(time_limit=30.0, workers=2, seed=3) as engine:
+        result = engine.search(board, playouts=101)
+        assert result.position in OPEN_FOUR_WINS
+        assert result.nodes == 101
+        # 进程池在多次搜索之间保留
+        executor = engine._executor
+        assert executor is not None
+        assert engine.search(board, playouts=10).nodes == 10
+        assert engine._executor is executor
+    assert engine._executor is None
+
+
+
+
+
+def test_subtree_reuse_between_moves():
+    """对手走出树中已有的应着后复用对应子树，悔棋后丢弃"""
+    board = setup_board([(7, 7), (8, 8)], [(7, 8)])
+    with MctsEngine(time_limit=5.0, workers=1, seed=4) as engine:
+        first = engine.search(board, playouts=300)
+        board.make_move(first.position.row, first.position.col)
+        reply = first.principal_variation[1]
+        board.make_move(reply.row, reply.col)
+        engine.search(board, playouts=50)
+        assert engine.last_reuse["reused"] == 1 and engine.last_reuse["reused_visits"] > 0
+        
+        engine.reset_search_state()
+        engine.search(board, playouts=50)
+        assert engine.last_reuse["reused"] == 0
@@ -0,0 +1,139 @@
+"""
+NumPy棋盘测试
+向量化的连线查找、连子直方图和威胁图与逐格计算的结果一致
+"""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from python.core.LineWindowIndex import LineWindowIndex
+from python.core.NumpyBoard import NumpyBoard
+from python.models.GameModels import Player
+
+SIZE = 15
+PLAYERS = (Player.BLACK, Player.WHITE)
+
+
+def random_array(seed: int, density: float = 0.45) -> np.ndarray:
+    """生成随机棋盘数组（双方棋子数相近）"""
+    rng = random.Random(seed)
+    array = np.zeros((SIZE, SIZE), dtype=np.int8)
+    cells = rng.sample(range(SIZE * SIZE), int(SIZE * SIZE * density))
+    for index, cell in enumerate(cells):
+        array[divmod(cell, SIZE)] = PLAYERS[index % 2].value
+    return array
+
+
+def line_cells(row: int, col: int, direction: int, length: int):
+    """从(row, col)沿方向的length个格子，超出棋盘时返回None"""
+    dr, dc = LineWindowIndex.DIRECTIONS[direction]
+    cells = [(row + dr * i, col + dc * i) for i in range(length)]
+    if all(0 <= r < SIZE and 0 <= c < SIZE for r, c in cells):
+        return cells
+    return None
+
+
+def scan_lines(array: np.ndarray, player: Player, length: int) -> list:
+    """逐格查找连续length个棋子的连线"""
+    found = []
+    for direction in range(4):
+        for row in range(SIZE):
+            for col in range(SIZE):
+                cells = line_cells(row, col, direction, length)
+                if cells and all(array[cell] == player.value for cell in cells):
+                    found.append((direction, row, col))
+    return sorted(found)
+
+
+def scan_histogram(array: np.ndarray, player: Player) -> np.ndarray:
+    """逐格统计各方向的极大连续段长度"""
+    histogram = np.zeros((4, SIZE + 1), dtype=np.intp)
+    for direction, (dr, dc) in enumerate(LineWindowIndex.DIRECTIONS):
+        for row in range(SIZE):
+            for col in range(SIZE):
+                previous = (row - dr, col - dc)
+                if array[row, col] != player.value:
+                    continue
+                if 0 <= previous[0] < SIZE and 0 <= previous[1] < SIZE and array[previous] == player.value:
+                    continue
+                length = 0
+                r, c = row, col
+                while 0 <= r < SIZE and 0 <= c < SIZE and array[r, c] == player.value:
+                    length += 1
+                    r, c = r + dr, c + dc
+                histogram[direction, length] += 1
+    return histogram
+
+
+def scan_threats(array: np.ndarray, player: Player, win_count: int, min_stones: int) -> np.ndarray:
+    """逐个窗口统计覆盖每个空位的活窗口数"""
+    threats = np.zeros((SIZE, SIZE), dtype=np.int16)
+    for direction in range(4):
+        for row in range(SIZE):
+            for col in range(SIZE):
+                cells = line_cells(row, col, direction, win_count)
+                if not cells:
+                    continue
+                values = [array[cell] for cell in cells]
+                if player.opposite().value not in values and values.count(player.value) >= min_stones:
+                    for cell in cells:
+                        if array[cell] == Player.NONE.value:
+                            threats[cell] += 1
+    return threats
+
+
+def test_array_round_trip():
+    """from_array、as_array和array_to_state互相转换一致，导出的视图只读且随棋盘变化"""
+    array = random_array(1)
+    board = NumpyBoard.from_array(array)
+    assert np.array_equal(board.as_array(), array)
+    assert np.array_equal(NumpyBoard.state_to_array(board.get_board_state()), array)
+    assert NumpyBoard.array_to_state(array) == board.get_board_state()
+    # 黑方多一子，轮到白方
+    assert board.current_player == Player.WHITE
+    
+    view = np.asarray(board)
+    with pytest.raises(ValueError):
+        view[0, 0] = 1
+    empty = int(np.flatnonzero(array == 0)[0])
+    board.push(empty)
+    assert view.flat[empty] == board.get_cell(*divmod(empty, SIZE)).value
+    assert bytes(board.to_memoryview()) == board._cells_bytes()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_find_lines_matches_scan(seed):
+    """find_lines与逐格查找的连线相同"""
+    board = NumpyBoard.from_array(random_array(seed, density=0.7))
+    for player in PLAYERS:
+        for length in (2, 3, 5):
+            assert sorted(map(tuple, board.find_lines(player, length).tolist())) == \
+                scan_lines(board.as_array(), player, length)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_run_histogram_matches_scan(seed):
+    """run_histogram与逐格统计的连续段相同，run_lengths只在己方棋子上非零"""
+    board = NumpyBoard.from_array(random_array(seed, density=0.7))
+    for player in PLAYERS:
+        assert np.array_equal(board.run_histogram(player), scan_histogram(board.as_array(), player))
+        runs = board.run_lengths(player)
+        assert np.array_equal(runs.max(axis=0) > 0, board.as_array() == player.value)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_threat_map_matches_scan(seed):
+    """threat_map与逐窗口统计相同，默认阈值下的非零格子就是成五点"""
+    board = NumpyBoard.from_array(random_array(seed))
+    for player in PLAYERS:
+        for min_stones in (2, 3):
+            assert np.array_equal(board.threat_map(player, min_stones),
+                                  scan_threats(board.as_array(), player, board.win_count, min_stones))
+        winning = set(np.flatnonzero(board.threat_map(player)).tolist())
+        assert winning == board.winning_cell_indices(player)
+    
+    analysis = board.analyze()
+    assert set(analysis) == {"BLACK", "WHITE"}
+    assert np.array_equal(analysis["BLACK"]["threat_map"], board.threat_map(Player.BLACK))
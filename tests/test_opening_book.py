@@ -0,0 +1,135 @@
+"""
+开局库测试
+规范局面键在8种对称变换下不变，查询结果换算回当前局面的坐标，文件可以合并和校验
+"""
+from typing import List
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.OpeningBook import OpeningBook
+from python.engine.OpeningBookBuilder import OpeningBookBuilder
+from python.models.GameModels import GameSettings, Player, Position
+
+SIZE = 15
+# 一局不对称的开局（黑方先行）
+GAME = [Position.at(7, 7), Position.at(6, 8), Position.at(8, 8), Position.at(6, 6), Position.at(9, 9),
+        Position.at(5, 7), Position.at(10, 10)]
+
+
+def transform(positions: List[Position], symmetry: int) -> List[Position]:
+    """对一串位置做指定的对称变换"""
+    forward = OpeningBook.symmetries(SIZE)[0][symmetry]
+    return [Position.from_index(forward[position.to_index(SIZE)], SIZE) for position in positions]
+
+
+def board_after(positions: List[Position]):
+    """按顺序落子后的棋盘"""
+    board = BoardFactory.create_board(GameSettings(board_size=SIZE))
+    for position in positions:
+        assert board.make_move(position.row, position.col)
+    return board
+
+
+def same_position(first: List[Position], second: List[Position]) -> bool:
+    """两串落子是否得到对称等价的局面（自身对称的局面中，对称的着法互相等价）"""
+    return OpeningBook.canonical_key(board_after(first))[0] == OpeningBook.canonical_key(board_after(second))[0]
+
+
+def test_symmetries_are_permutations():
+    """每种变换都是格子的置换，且与逆变换互逆"""
+    transforms, inverses = OpeningBook.symmetries(SIZE)
+    assert len(transforms) == 8 and len(set(transforms)) == 8
+    for forward, inverse in zip(transforms, inverses):
+        assert sorted(forward) == list(range(SIZE * SIZE))
+        assert all(inverse[forward[cell]] == cell for cell in range(SIZE * SIZE))
+
+
+@pytest.mark.parametrize("plies", [1, 4, 7])
+def test_canonical_key_is_symmetry_invariant(plies):
+    """同一局面的8种对称形式得到相同的规范键"""
+    keys = {OpeningBook.canonical_key(board_after(transform(GAME[:plies], symmetry)))[0] for symmetry in range(8)}
+    assert len(keys) == 1
+
+
+def test_canonical_key_distinguishes_side_to_move():
+    """棋子相同但轮到不同玩家的局面键不同"""
+    board = board_after(GAME[:1])
+    other = board.clone()
+    other.current_player = Player.BLACK
+    assert board.current_player == Player.WHITE
+    assert OpeningBook.canonical_key(board)[0] == OpeningBook.canonical_key(other)[0] ^ OpeningBook.WHITE_TO_MOVE
+
+
+@pytest.mark.parametrize("symmetry", range(8))
+def test_probe_maps_moves_back(tmp_path, symmetry):
+    """在任意对称形式的局面中查询，返回的着法都位于当前局面的坐标"""
+    builder = OpeningBookBuilder(GameSettings(board_size=SIZE), max_plies=6)
+    for _ in range(4):
+        builder.add_game(GAME, Player.BLACK)
+    path = builder.write(str(tmp_path / "book.bin"))
+    
+    moves = transform(GAME, symmetry)
+    with OpeningBook(path) as book:
+        for ply in range(6):
+            book_moves = book.probe(board_after(moves[:ply]))
+            assert len(book_moves) == 1
+            assert same_position(moves[:ply] + [book_moves[0].position], moves[:ply + 1])
+            assert book_moves[0].games == 4
+            assert book_moves[0].score == (1.0 if ply % 2 == 0 else 0.0)
+        # 超过收录步数的局面不查询
+        assert book.probe(board_after(moves[:6])) == []
+        best = book.best_move(board_after(moves[:2]))
+        assert best is not None and same_position(moves[:2] + [best.position], moves[:3])
+        assert book.best_move(board_after(moves[:2]), min_games=5) is None
+
+
+def test_builder_load_merges_statistics(tmp_path):
+    """生成器读入已有开局库后继续累加统计"""
+    path = str(tmp_path / "book.bin")
+    builder = OpeningBookBuilder(GameSettings(board_size=SIZE))
+    builder.add_game(GAME, Player.WHITE)
+    builder.write(path)
+    
+    merged = OpeningBookBuilder(GameSettings(board_size=SIZE))
+    merged.load(path)
+    merged.add_game(GAME, Player.NONE)
+    merged.write(path)
+    with OpeningBook(path) as book:
+        assert len(book) == len(GAME)
+        assert all(games == 2 for _, _, games, _ in book.records())
+        book_move = book.probe(board_after(GAME[:3]))[0]
+        assert book_move.position == GAME[3]
+        # 白方一胜一和
+        assert book_move.score == 0.75
+
+
+def test_invalid_files(tmp_path):
+    """格式错误的文件抛出ValueError，open_optional对缺失或损坏的文件返回None"""
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"XXXX" + bytes(OpeningBook.HEADER.size))
+    truncated = tmp_path / "truncated.bin"
+    truncated.write_bytes(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.FORMAT_VERSION, SIZE, 5, 12, 3))
+    for path in (empty, bad, truncated):
+        with pytest.raises(ValueError):
+            OpeningBook(str(path))
+        assert OpeningBook.open_optional(str(path)) is None
+    assert OpeningBook.open_optional(str(tmp_path / "missing.bin")) is None
+
+
+def test_engine_plays_book_moves(tmp_path):
+    """引擎在开局库局面中直接走出开局库着法，不搜索"""
+    builder = OpeningBookBuilder(GameSettings(board_size=SIZE))
+    for _ in range(4):
+        builder.add_game(GAME, Player.BLACK)
+    with OpeningBook(builder.write(str(tmp_path / "book.bin"))) as book:
+        engine = AlphaBetaEngine(time_limit=0.2, opening_book=book)
+        moves = transform(GAME, 5)
+        result = engine.search(board_after(moves[:2]))
+        assert result.nodes == 0
+        assert same_position(moves[:2] + [result.position], moves[:3])
+        # 开局库之外的局面照常搜索
+        assert engine.search(board_after([Position.at(0, 0), Position.at(14, 14)])).nodes > 0
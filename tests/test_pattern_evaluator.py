@@ -0,0 +1,68 @@
+"""
+棋型评估测试
+棋型表对典型线段的分类正确，增量更新的评估器与从棋盘重建的评估器一致
+"""
+import random
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.core.PatternEvaluator import PatternEvaluator
+from python.core.PatternTable import PatternTable
+from python.models.GameModels import GameSettings, PatternShape, Player
+
+
+@pytest.mark.parametrize("line,shape", [
+    ("XXXXX....", PatternShape.FIVE),
+    ("...XXXX..", PatternShape.OPEN_FOUR),
+    ("..OXXXX..", PatternShape.FOUR),
+    ("..XXX.X..", PatternShape.FOUR),
+    ("...XXX...", PatternShape.OPEN_THREE),
+    (".X.XX....", PatternShape.OPEN_THREE),
+    ("..OXXX...", PatternShape.THREE),
+    ("...XX....", PatternShape.OPEN_TWO),
+    ("....X....", PatternShape.NONE),
+])
+def test_pattern_table_classifies_shapes(line, shape):
+    """中心格所在线段的棋型"""
+    assert PatternTable.for_win_count(5).parse(line) == shape
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard", "numpy"])
+def test_incremental_evaluator_matches_rebuild(backend):
+    """挂载的评估器随落子和悔棋增量更新，与按当前棋盘重建的评估器一致"""
+    board = BoardFactory.create_board(GameSettings(board_backend=backend))
+    evaluator = board.attach_evaluator()
+    rng = random.Random(11)
+    for cell in rng.sample(range(board.size * board.size), 80):
+        if board.is_game_over:
+            break
+        board.push(cell)
+        # 穿插悔棋，覆盖on_remove
+        if rng.random() < 0.3:
+            board.pop()
+        
+        fresh = PatternEvaluator(board.size, board.win_count)
+        fresh.rebuild(board._cells_bytes())
+        assert evaluator.keys == fresh.keys
+        for player in (Player.BLACK, Player.WHITE):
+            assert evaluator.score(player) == fresh.score(player)
+            assert evaluator.evaluate(player) == -fresh.evaluate(player.opposite())
+    
+    while board.move_history:
+        board.pop()
+    assert evaluator.score(Player.BLACK) == evaluator.score(Player.WHITE) == 0
+
+
+def test_shapes_follow_moves():
+    """落子后的棋型与move_shapes的预测一致"""
+    board = BoardFactory.create_board()
+    evaluator = board.attach_evaluator()
+    for row, col in [(7, 5), (0, 0), (7, 6), (0, 2), (7, 7), (0, 4)]:
+        board.make_move(row, col)
+    cell = 7 * 15 + 8
+    predicted = evaluator.move_shapes(cell, Player.BLACK)
+    assert predicted[0] == PatternShape.OPEN_FOUR
+    board.make_move(7, 8)
+    assert evaluator.shapes_at(cell, Player.BLACK) == predicted
+    assert evaluator.shapes_at(cell, Player.WHITE) == (PatternShape.NONE,) * 4
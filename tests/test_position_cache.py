@@ -0,0 +1,189 @@
+"""
+持久化局面缓存测试
+日志重新打开后重放得到相同的索引，截断写了一半或校验失败的尾部，压缩后条目不变
+"""
+import os
+from typing import List
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.AlphaBetaEngine import AlphaBetaEngine
+from python.engine.OpeningBook import OpeningBook
+from python.engine.PositionCache import PositionCache
+from python.models.GameModels import GameSettings, Position
+
+SIZE = 15
+
+
+def board_after(positions: List[Position]):
+    """按顺序落子后的棋盘"""
+    board = BoardFactory.create_board(GameSettings(board_size=SIZE))
+    for position in positions:
+        assert board.make_move(position.row, position.col)
+    return board
+
+
+def sample_boards(count: int):
+    """生成count个互不对称等价的局面: 中心一子加上对角线下方不同位置的一子"""
+    cells = [(row, col) for row in range(8, SIZE) for col in range(row + 1, SIZE)]
+    return [board_after([Position.at(7, 7), Position.at(row, col)]) for row, col in cells[:count]]
+
+
+def record_offset(index: int) -> int:
+    """第index条日志记录的偏移"""
+    return PositionCache.HEADER.size + index * PositionCache.RECORD.size
+
+
+def test_get_maps_move_to_symmetric_position(tmp_path):
+    """写入的着法在对称等价的局面中按当前坐标返回"""
+    moves = [Position.at(7, 7), Position.at(6, 8), Position.at(8, 8)]
+    with PositionCache(str(tmp_path / "cache.log")) as cache:
+        cache.put(board_after(moves), Position.at(5, 9), 120, 6)
+        forward = OpeningBook.symmetries(SIZE)[0][2]
+        mirrored = [Position.from_index(forward[move.to_index(SIZE)], SIZE) for move in moves]
+        result = cache.get(board_after(mirrored))
+        assert result is not None
+        assert result.position == Position.from_index(forward[Position.at(5, 9).to_index(SIZE)], SIZE)
+        assert (result.score, result.depth) == (120, 6)
+        assert cache.get(board_after(moves[:2])) is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_shallower_results_do_not_replace(tmp_path):
+    """已有更深或已证明的结果时忽略新写入"""
+    board = sample_boards(1)[0]
+    with PositionCache(str(tmp_path / "cache.log")) as cache:
+        cache.put(board, Position.at(0, 0), 10, 8)
+        cache.put(board, Position.at(1, 1), 20, 4)
+        assert cache.get(board).position == Position.at(0, 0)
+        cache.put(board, Position.at(2, 2), -5, 2, proven=True)
+        cache.put(board, Position.at(3, 3), 30, 12)
+        result = cache.get(board)
+        assert (result.position, result.score) == (Position.at(2, 2), -5)
+        cache.put(board, None, 7, 3, proven=True)
+        assert cache.get(board).position is None
+        assert cache.stats()["writes"] == 3
+
+
+def test_log_replay(tmp_path):
+    """关闭后重新打开，重放日志得到每个局面最后一次写入的结果"""
+    path = str(tmp_path / "cache.log")
+    boards = sample_boards(20)
+    with PositionCache(path) as cache:
+        for depth in (1, 2):
+            for index, board in enumerate(boards):
+                cache.put(board, Position.at(index % SIZE, 0), index * depth, depth)
+    
+    with PositionCache(path) as cache:
+        assert len(cache) == len(boards)
+        assert cache.stats()["log_records"] == 2 * len(boards)
+        for index, board in enumerate(boards):
+            result = cache.get(board)
+            assert (result.position, result.score, result.depth) == (Position.at(index % SIZE, 0), index * 2, 2)
+
+
+def test_truncated_tail_is_dropped(tmp_path):
+    """写了一半的尾部记录在打开时被截断，之后的写入接在有效记录之后"""
+    path = str(tmp_path / "cache.log")
+    boards = sample_boards(3)
+    with PositionCache(path) as cache:
+        for board in boards[:2]:
+            cache.put(board, Position.at(0, 0), 1, 1)
+    with open(path, "ab") as f:
+        f.write(bytes(PositionCache.RECORD.size // 2))
+    
+    with PositionCache(path) as cache:
+        assert len(cache) == 2
+        assert os.path.getsize(path) == record_offset(2)
+        cache.put(boards[2], Position.at(0, 0), 1, 1)
+    with PositionCache(path) as cache:
+        assert len(cache) == 3
+        assert all(cache.get(board) is not None for board in boards)
+
+
+def test_corrupted_record_is_dropped(tmp_path):
+    """CRC校验失败的记录及其后的所有记录被丢弃"""
+    path = str(tmp_path / "cache.log")
+    boards = sample_boards(3)
+    with PositionCache(path) as cache:
+        for board in boards:
+            cache.put(board, Position.at(0, 0), 1, 1)
+    with open(path, "r+b") as f:
+        f.seek(record_offset(1) + 1)
+        f.write(b"\xff")
+    
+    with PositionCache(path) as cache:
+        assert len(cache) == 1
+        assert cache.get(boards[0]) is not None
+        assert cache.get(boards[1]) is None and cache.get(boards[2]) is None
+    assert os.path.getsize(path) == record_offset(1)
+
+
+def test_bad_header(tmp_path):
+    """文件头不正确时抛出ValueError，open_optional返回None"""
+    path = tmp_path / "cache.log"
+    path.write_bytes(b"XXXX" + bytes(PositionCache.HEADER.size))
+    with pytest.raises(ValueError):
+        PositionCache(str(path))
+    assert PositionCache.open_optional(str(path)) is None
+
+
+def test_compaction_preserves_entries(tmp_path, monkeypatch):
+    """垃圾记录过多时同步压缩，压缩前后及重新打开后的条目相同"""
+    monkeypatch.setattr(PositionCache, "MIN_COMPACT_RECORDS", 16)
+    path = str(tmp_path / "cache.log")
+    boards = sample_boards(5)
+    with PositionCache(path, compact_ratio=2.0, background=False) as cache:
+        for depth in range(1, 9):
+            for index, board in enumerate(boards):
+                cache.put(board, Position.at(index, depth), depth * 10, depth)
+        stats = cache.stats()
+        assert stats["compactions"] >= 1
+        assert stats["log_records"] <= 2 * len(boards)
+        
+        cache.compact()
+        assert cache.stats()["log_records"] == len(boards)
+        assert os.path.getsize(path) == record_offset(len(boards))
+        cache.put(boards[0], Position.at(9, 9), 90, 9)
+    
+    with PositionCache(path) as cache:
+        assert len(cache) == len(boards)
+        for index, board in enumerate(boards):
+            result = cache.get(board)
+            expected = (Position.at(9, 9), 90, 9) if index == 0 else (Position.at(index, 8), 80, 8)
+            assert (result.position, result.score, result.depth) == expected
+
+
+def test_eviction_is_least_recently_used(tmp_path):
+    """超过max_entries时淘汰最久未使用的局面，重新打开时同样只保留最近的"""
+    path = str(tmp_path / "cache.log")
+    boards = sample_boards(4)
+    with PositionCache(path, max_entries=3) as cache:
+        for board in boards[:3]:
+            cache.put(board, Position.at(0, 0), 1, 1)
+        assert cache.get(boards[0]) is not None
+        cache.put(boards[3], Position.at(0, 0), 1, 1)
+        assert len(cache) == 3
+        assert cache.get(boards[1]) is None
+        assert cache.stats()["evictions"] == 1
+    
+    with PositionCache(path, max_entries=2) as cache:
+        assert len(cache) == 2
+        assert cache.get(boards[3]) is not None
+
+
+def test_engine_reuses_cached_results(tmp_path):
+    """引擎把已证明的结果写入缓存，新引擎对同一局面直接使用缓存结果"""
+    moves = [Position.at(row, col) for row, col in
+             [(7, 7), (7, 6), (7, 8), (11, 10), (7, 9), (0, 0), (8, 10), (0, 2), (9, 10), (14, 14), (10, 10),
+              (14, 12)]]
+    path = str(tmp_path / "cache.log")
+    with PositionCache(path) as cache:
+        first = AlphaBetaEngine(time_limit=5.0, max_depth=4, position_cache=cache).search(board_after(moves))
+        assert first.score >= AlphaBetaEngine.MATE_THRESHOLD and first.nodes > 0
+        assert len(cache) == 1
+    with PositionCache(path) as cache:
+        cached = AlphaBetaEngine(time_limit=5.0, max_depth=4, position_cache=cache).search(board_after(moves))
+    assert cached.nodes == 0
+    assert (cached.position, cached.score) == (first.position, first.score)
@@ -0,0 +1,139 @@
+"""
+会话管理器测试
+空闲会话的压缩与重建、过期删除、引擎池中跨步状态的清空，以及内存统计
+"""
+import pytest
+
+from python.core.SessionManager import SessionManager
+from python.engine.EnginePool import EnginePool
+from python.models.GameModels import GameSettings, GameState, Player
+
+from test_game_logic import FakeEngine
+
+
+def make_manager(**options) -> SessionManager:
+    """创建不自动清理的会话管理器（由测试调用sweep）"""
+    return SessionManager(sweep_interval=3600.0, **options)
+
+
+def test_join_assigns_seats():
+    """先黑后白分配座位，同名玩家再次加入得到原来的座位，满员后拒绝"""
+    manager = make_manager()
+    game_id = manager.create()
+    assert manager.join(game_id, "alice") == Player.BLACK
+    assert manager.join(game_id, "bob") == Player.WHITE
+    assert manager.join(game_id, "alice") == Player.BLACK
+    with pytest.raises(ValueError):
+        manager.join(game_id, "carol")
+
+
+def test_idle_session_compacts_and_restores():
+    """空闲会话压缩为落子序列，重建后局面相同且版本号继续递增"""
+    manager = make_manager(idle_timeout=0.0)
+    game_id = manager.create()
+    with manager.acquire(game_id) as logic:
+        logic.make_move(7, 7)
+        logic.make_move(7, 8)
+        version = logic.board.version
+    assert manager.sweep() == (1, 0)
+    stats = manager.stats()
+    assert stats["idle"] == 1 and stats["idle_session_bytes"] == 4
+    assert not manager.info(game_id)["active"]
+    
+    with manager.acquire(game_id) as logic:
+        assert [cell for cell in logic.board.move_history.cells] == [7 * 15 + 7, 7 * 15 + 8]
+        assert logic.get_game_state() == GameState.PLAYING
+        # 版本号从压缩时的版本之后继续，不会重复使用
+        assert logic.board.version >= version
+        assert logic.make_move(8, 8) and logic.board.version > version
+    assert manager.restores == 1
+
+
+def test_expired_session_is_deleted():
+    """超过ttl的会话被删除，之后访问抛出KeyError"""
+    manager = make_manager(idle_timeout=0.0, ttl=0.0)
+    game_id = manager.create()
+    assert manager.sweep() == (0, 1)
+    assert game_id not in manager
+    with pytest.raises(KeyError):
+        with manager.acquire(game_id):
+            pass
+
+
+def engine_manager():
+    """引擎执白的会话管理器，返回(会话管理器, 对局ID, 引擎)"""
+    engine = FakeEngine()
+    manager = make_manager(engines=EnginePool(lambda: engine, 1))
+    game_id = manager.create(engine_player=Player.WHITE)
+    return manager, game_id, engine
+
+
+def test_engine_plays_through_pool():
+    """轮到引擎时play_engine从引擎池借出引擎搜索并落子"""
+    manager, game_id, engine = engine_manager()
+    assert not manager.play_engine(game_id)
+    with manager.acquire(game_id) as logic:
+        logic.make_move(7, 7)
+    assert manager.play_engine(game_id)
+    with manager.acquire(game_id) as logic:
+        assert len(logic.board.move_history) == 2
+    assert engine.searches == 1
+
+
+def test_undo_and_restart_reset_pool_state():
+    """悔棋和重新开始清空引擎池为本局保留的跨步状态"""
+    manager, game_id, engine = engine_manager()
+    with manager.acquire(game_id) as logic:
+        logic.make_move(7, 7)
+    manager.play_engine(game_id)
+    resets = engine.resets
+    with manager.acquire(game_id) as logic:
+        assert logic.undo_move()
+    assert engine.resets == resets + 1
+    with manager.acquire(game_id) as logic:
+        logic.make_move(7, 7)
+    manager.play_engine(game_id)
+    with manager.acquire(game_id) as logic:
+        logic.restart_game()
+    assert engine.resets == resets + 2
+
+
+def test_live_session_bytes_excludes_shared_tables():
+    """活跃会话的字节数只统计会话自身的对象，结果稳定"""
+    settings = GameSettings()
+    size = SessionManager.live_session_bytes(settings)
+    assert size > settings.board_size * settings.board_size
+    SessionManager._live_bytes.clear()
+    assert SessionManager.live_session_bytes(settings) == size
+    
+    manager = make_manager()
+    manager.create()
+    assert manager.stats()["active_session_bytes"] == size
+
+
+class FailingEngine(FakeEngine):
+    """前failures次搜索抛出异常的引擎"""
+    
+    def __init__(self, failures: int = 1):
+        super().__init__()
+        self.failures = failures
+    
+    def search(self, board, time_limit=None):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("搜索失败")
+        return super().search(board, time_limit)
+
+
+def test_failed_search_keeps_engine_turn():
+    """搜索抛出异常时交还等待搜索的局面，再次调用play_engine可以落子"""
+    engine = FailingEngine()
+    manager = make_manager(engines=EnginePool(lambda: engine, 1))
+    game_id = manager.create(engine_player=Player.WHITE)
+    with manager.acquire(game_id) as logic:
+        logic.make_move(7, 7)
+    with pytest.raises(RuntimeError):
+        manager.play_engine(game_id)
+    assert manager.play_engine(game_id)
+    with manager.acquire(game_id) as logic:
+        assert len(logic.board.move_history) == 2
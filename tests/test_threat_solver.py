@@ -0,0 +1,89 @@
+"""
+威胁空间搜索测试
+VCF/VCT求解器找到强制获胜序列，求解后棋盘恢复原状
+"""
+from typing import List, Tuple
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.engine.ThreatSolver import ThreatSolver
+from python.models.GameModels import GameSettings, Position
+
+# 黑方在(7,10)落子同时形成横向和纵向两个冲四（双四），白方只能挡住一个
+DOUBLE_FOUR_BLACK = [(7, 7), (7, 8), (7, 9), (8, 10), (9, 10), (10, 10)]
+DOUBLE_FOUR_WHITE = [(7, 6), (11, 10), (0, 0), (0, 2), (14, 14), (14, 12)]
+DOUBLE_FOUR_WIN = Position.at(7, 10)
+
+# 黑方横向活四，轮到黑方
+OPEN_FOUR_BLACK = [(7, 5), (7, 6), (7, 7), (7, 8)]
+OPEN_FOUR_WHITE = [(0, 0), (0, 2), (14, 14), (14, 12)]
+
+# 黑方两个相交的活二，(7,9)落子后形成双活三: 只靠冲四不能获胜，需要VCT
+DOUBLE_THREE_BLACK = [(7, 7), (7, 8), (5, 9), (6, 9)]
+DOUBLE_THREE_WHITE = [(0, 0), (0, 2), (14, 14), (14, 12)]
+
+
+def setup_board(black: List[Tuple[int, int]], white: List[Tuple[int, int]], backend: str = "list"):
+    """黑白交替落子摆出局面（黑方先行）"""
+    board = BoardFactory.create_board(GameSettings(board_backend=backend))
+    for index in range(max(len(black), len(white))):
+        if index < len(black):
+            assert board.make_move(*black[index])
+        if index < len(white):
+            assert board.make_move(*white[index])
+    return board
+
+
+def replay_wins(board, line: List[Position]) -> bool:
+    """在棋盘副本上按序列落子，检查最后一手由进攻方获胜"""
+    board = board.clone()
+    attacker = board.current_player
+    for position in line:
+        assert board.make_move(position.row, position.col)
+    return board.is_game_over and board.winner == attacker
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard", "numpy"])
+def test_finds_double_four(backend):
+    """VCF求解器找到双四获胜，求解后棋盘恢复原状"""
+    board = setup_board(DOUBLE_FOUR_BLACK, DOUBLE_FOUR_WHITE, backend)
+    before = (board.zobrist_hash, len(board.move_history), board.current_player)
+    line = ThreatSolver().find_vcf(board)
+    assert line is not None
+    assert line[0] == DOUBLE_FOUR_WIN
+    assert replay_wins(board, line)
+    assert (board.zobrist_hash, len(board.move_history), board.current_player) == before
+
+
+def test_open_four_wins_immediately():
+    """已有活四的局面直接成五"""
+    board = setup_board(OPEN_FOUR_BLACK, OPEN_FOUR_WHITE)
+    line = ThreatSolver().find_vct(board)
+    assert line is not None and len(line) == 1
+    assert replay_wins(board, line)
+    assert board.evaluator is None
+
+
+def test_vct_needs_threes():
+    """双活三只能由VCT找到，VCF找不到"""
+    board = setup_board(DOUBLE_THREE_BLACK, DOUBLE_THREE_WHITE)
+    solver = ThreatSolver(node_budget=200000)
+    assert solver.find_vcf(board) is None
+    line = solver.find_vct(board)
+    assert line is not None
+    assert replay_wins(board, line)
+
+
+def test_no_win_on_quiet_position():
+    """没有威胁的局面不存在获胜序列，节点预算耗尽时如实报告"""
+    board = setup_board([(7, 7)], [(0, 0)])
+    solver = ThreatSolver()
+    assert solver.find_vcf(board) is None
+    assert not solver.budget_exhausted
+    
+    tiny = ThreatSolver(node_budget=1)
+    assert tiny.find_vct(setup_board(DOUBLE_THREE_BLACK, DOUBLE_THREE_WHITE)) is None
+    assert tiny.budget_exhausted
+    with pytest.raises(ValueError):
+        solver.solve(board, "unknown")
@@ -0,0 +1,99 @@
+"""
+置换表测试
+写入后能按键读回，同桶的其他键和被撕裂的条目都不会被误认为命中，共享表在进程间可见
+"""
+import pytest
+
+from python.engine.TranspositionTable import TranspositionTable
+
+KEY = 0x1234_5678_9ABC_DEF0
+
+
+@pytest.fixture(params=[False, True], ids=["local", "shared"])
+def table(request):
+    """本地和共享内存两种置换表"""
+    table = TranspositionTable(size_mb=0.0625, shared=request.param)
+    yield table
+    table.unlink()
+
+
+def same_bucket(table: TranspositionTable, key: int, index: int) -> int:
+    """与key落在同一个桶中的另一个键"""
+    return key ^ ((index + 1) * table.bucket_count)
+
+
+def test_store_probe_round_trip(table):
+    """写入的深度、边界、分值和着法原样读回"""
+    for score in (0, 1234, -1234, (1 << 29) - 1, -(1 << 29) + 1):
+        table.store(KEY, 7, TranspositionTable.LOWER, score, 112)
+        assert table.probe(KEY) == (7, TranspositionTable.LOWER, score, 112)
+    table.store(KEY, 300, TranspositionTable.EXACT, 5)
+    # 深度截断为255，没有新着法时保留原着法
+    assert table.probe(KEY) == (255, TranspositionTable.EXACT, 5, 112)
+    assert table.probe(KEY ^ 1) is None
+
+
+def test_same_bucket_keys_do_not_alias(table):
+    """同一个桶中的不同键各自命中，桶外的第三个键不会误读到它们"""
+    other = same_bucket(table, KEY, 0)
+    third = same_bucket(table, KEY, 1)
+    table.store(KEY, 10, TranspositionTable.EXACT, 1, 1)
+    table.store(other, 2, TranspositionTable.UPPER, 2, 2)
+    assert table.probe(KEY) == (10, TranspositionTable.EXACT, 1, 1)
+    assert table.probe(other) == (2, TranspositionTable.UPPER, 2, 2)
+    assert table.probe(third) is None
+    
+    # 深度更浅的第三个键替换总是替换槽，深度优先槽保留
+    table.store(third, 1, TranspositionTable.EXACT, 3, 3)
+    assert table.probe(KEY) is not None
+    assert table.probe(other) is None
+    assert table.probe(third) == (1, TranspositionTable.EXACT, 3, 3)
+    assert table.stats()["collisions"] == 1
+
+
+def test_torn_entry_is_a_miss(table):
+    """data和check不匹配（并发写入撕裂）的条目视为未命中"""
+    table.store(KEY, 4, TranspositionTable.EXACT, 42, 7)
+    other = same_bucket(table, KEY, 0)
+    slot = (KEY & (table.bucket_count - 1)) << 1
+    # 模拟另一个写入者只写完了data: check仍是旧键的
+    table._data[slot] ^= 1 << 40
+    assert table.probe(KEY) is None
+    assert table.probe(other) is None
+    table._data[slot] ^= 1 << 40
+    assert table.probe(KEY) == (4, TranspositionTable.EXACT, 42, 7)
+
+
+def test_new_search_allows_replacement(table):
+    """旧世代的深条目在新搜索中可以被浅条目替换"""
+    other = same_bucket(table, KEY, 0)
+    table.store(KEY, 20, TranspositionTable.EXACT, 1)
+    table.new_search()
+    table.store(other, 1, TranspositionTable.EXACT, 2)
+    assert table.probe(KEY) is None
+    assert table.probe(other) == (1, TranspositionTable.EXACT, 2, -1)
+    # 当前世代的条目只被不更浅的条目替换
+    table.store(same_bucket(table, KEY, 1), 0, TranspositionTable.EXACT, 3)
+    assert table.probe(other) == (1, TranspositionTable.EXACT, 2, -1)
+
+
+def test_clear(table):
+    """清空后所有键都不命中"""
+    table.store(KEY, 3, TranspositionTable.EXACT, 1)
+    table.clear()
+    assert table.probe(KEY) is None
+    assert table.stats()["stores"] == 0
+
+
+def test_shared_table_is_visible_when_attached():
+    """通过名称附加的共享表能读到创建者写入的条目"""
+    owner = TranspositionTable(size_mb=0.0625, shared=True)
+    try:
+        attached = TranspositionTable(size_mb=0.0625, shared=True, name=owner.name)
+        try:
+            owner.store(KEY, 6, TranspositionTable.UPPER, -9, 30)
+            assert attached.probe(KEY) == (6, TranspositionTable.UPPER, -9, 30)
+        finally:
+            attached.close()
+    finally:
+        owner.unlink()
@@ -0,0 +1,40 @@
+"""
+界面事件总线测试
+一帧内的多次标记合并为一次刷新，以及多线程标记不丢失
+"""
+import threading
+
+from python.ui.UiEventBus import UiEventBus
+
+
+def test_marks_coalesce_per_frame():
+    """一帧内的标记按位合并，take之后清空"""
+    bus = UiEventBus()
+    assert bus.take() == UiEventBus.Region.NONE
+    bus.mark(UiEventBus.Region.BOARD, move=True)
+    bus.mark(UiEventBus.Region.STATUS, move=True)
+    bus.mark(UiEventBus.Region.STATUS)
+    assert bus.take() == UiEventBus.Region.BOARD | UiEventBus.Region.STATUS
+    assert bus.take() == UiEventBus.Region.NONE
+    
+    stats = bus.stats()
+    assert stats["events"] == 3 and stats["moves"] == 2 and stats["flushes"] == 1
+    assert stats["board"] == 1 and stats["status"] == 1 and stats["highlights"] == 0
+    assert stats["updates_per_move"] == 0.5
+
+
+def test_marks_from_many_threads():
+    """多个线程同时标记时计数和区域都不丢失"""
+    bus = UiEventBus()
+    
+    def mark():
+        for _ in range(1000):
+            bus.mark(UiEventBus.Region.HIGHLIGHTS, move=True)
+    
+    threads = [threading.Thread(target=mark) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert bus.take() == UiEventBus.Region.HIGHLIGHTS
+    assert bus.stats()["moves"] == 4000
@@ -0,0 +1,58 @@
+"""
+Zobrist哈希测试
+增量维护的局面哈希始终等于从完整棋盘计算的哈希，且与落子顺序无关
+"""
+import random
+
+import pytest
+
+from python.core.BoardFactory import BoardFactory
+from python.core.ZobristTable import ZobristTable
+from python.models.GameModels import GameSettings, Player
+
+
+def create_board(backend: str, board_size: int = 15):
+    """创建指定后端的棋盘"""
+    return BoardFactory.create_board(GameSettings(board_size=board_size, board_backend=backend))
+
+
+def test_table_is_deterministic():
+    """同一棋盘大小的随机数固定，不同大小互不相同"""
+    assert ZobristTable(15).keys == ZobristTable.for_size(15).keys
+    assert ZobristTable.for_size(15) is ZobristTable.for_size(15)
+    assert ZobristTable.for_size(9).keys[1][:5] != ZobristTable.for_size(15).keys[1][:5]
+    assert not any(ZobristTable.for_size(15).keys[Player.NONE.value])
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard", "numpy"])
+@pytest.mark.parametrize("board_size", [9, 15])
+def test_incremental_hash_matches_full_hash(backend, board_size):
+    """落子、悔棋、复制和重置后zobrist_hash都等于hash_board的结果"""
+    board = create_board(backend, board_size)
+    table = ZobristTable.for_size(board_size)
+    assert board.zobrist_hash == table.hash_board(board.get_board_state()) == 0
+    played = 0
+    for cell in random.Random(board_size).sample(range(board_size * board_size), 40):
+        if board.is_game_over:
+            break
+        board.push(cell)
+        played += 1
+        assert board.zobrist_hash == table.hash_board(board.get_board_state())
+    for _ in range(played // 2):
+        board.undo_move()
+        assert board.zobrist_hash == table.hash_board(board.get_board_state())
+    
+    assert board.clone().zobrist_hash == board.zobrist_hash
+    board.reset()
+    assert board.zobrist_hash == 0
+
+
+def test_hash_is_order_independent():
+    """同样的棋子以不同顺序落下得到相同的哈希"""
+    first = create_board("list")
+    second = create_board("list")
+    for row, col in [(7, 7), (7, 8), (6, 6), (8, 8)]:
+        first.make_move(row, col)
+    for row, col in [(6, 6), (8, 8), (7, 7), (7, 8)]:
+        second.make_move(row, col)
+    assert first.zobrist_hash == second.zobrist_hash